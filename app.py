@@ -3,10 +3,14 @@
 #  All routes live here. ML logic is handled by utils/.
 # ============================================================
 
-from flask import Flask, request, jsonify, render_template
+import io
+import multiprocessing
+import os
+from flask import Flask, Response, g, request, jsonify, render_template, send_file, stream_with_context, url_for
 import config
-from utils import model_loader
-from utils import prediction_service, clustering_service
+from utils import model_loader, artifact_cache, model_registry
+from utils import batch_service, jobs
+from utils.inference_pipeline import pipeline, InputValidationError
 from utils.advisory import get_advisory, get_summary_badge
 
 # ── App Initialisation ───────────────────────────────────────
@@ -15,8 +19,40 @@ app.secret_key          = config.SECRET_KEY
 app.config["DEBUG"]     = config.DEBUG
 app.config["MAX_CONTENT_LENGTH"] = config.MAX_CONTENT_LENGTH
 
-# Load all ML models once at startup
+# Load all ML models once at startup, and build what is derived from them
+# (featurizer, compiled evaluators, KNN index) before the first request.
+# In "lazy" load mode both are deferred to the first request instead.
 model_loader.load_all()
+if config.MODEL_LOAD_MODE != "lazy":
+    model_registry.warm(model_loader.current())
+
+
+def start_background_tasks():
+    """Per-process background threads (model watcher, metrics warm-up)."""
+    # Hot reload: swap in newly trained models/*.pkl without a restart
+    if config.MODEL_WATCH_ENABLED:
+        model_registry.start_watcher()
+
+    if config.METRICS_WARM_ON_STARTUP:
+        import threading
+        from utils.metrics_service import warm_cache
+        threading.Thread(target=warm_cache, name="metrics-warmup", daemon=True).start()
+
+
+# Threads do not survive fork(): under a preloading gunicorn master
+# (gunicorn.conf.py) each worker starts them in post_fork instead.
+# Scoring pool processes (utils/scoring_pool.py) re-import this module
+# when it is the main script: they need no watcher either.
+if not os.environ.get("ACKVISION_PRELOAD") and multiprocessing.parent_process() is None:
+    start_background_tasks()
+
+
+@app.after_request
+def add_model_version(response):
+    """Tags responses that used the models with the version that served them."""
+    if "model_version" in g:
+        response.headers["X-Model-Version"] = g.model_version
+    return response
 
 
 # ── Routes ───────────────────────────────────────────────────
@@ -52,33 +88,34 @@ def predict():
 
     # ── Validate required fields ──────────────────────────────
     # Keys must match what preprocessing.get_feature_array() reads from form_data
-    REQUIRED_KEYS = [
-        "attendance", "study_hours", "assignment_score",
-        "previous_gpa", "participation_level", "internet_usage",
-        "sleep_hours", "family_support", "extra_curricular",
-    ]
-    missing = [k for k in REQUIRED_KEYS if k not in data]
-    if missing:
-        return jsonify({"error": f"Missing fields: {missing}"}), 400
+    try:
+        pipeline.validate(data)
+    except InputValidationError as e:
+        return jsonify({"error": str(e)}), 400
 
     try:
-        # ── Run all predictions ───────────────────────────────
-        exam_score   = prediction_service.predict_exam_score(data)
-        pass_fail    = prediction_service.predict_pass_fail(data)
-        performance  = prediction_service.predict_performance(data)
-        risk_cluster = clustering_service.assign_risk_cluster(data)
+        # ── Run all predictions (featurize once, 4 models) ────
+        # Pinned: a hot reload mid-request cannot mix model versions
+        with model_loader.pinned() as models:
+            g.model_version = models.version
+            result       = pipeline.run(data)
+        exam_score   = result["exam_score"]
+        pass_fail    = result["pass_fail"]
+        performance  = result["performance"]
+        risk_cluster = result["risk_cluster"]
 
         # ── Generate advisory ─────────────────────────────────
         advisory     = get_advisory(exam_score, pass_fail, performance, risk_cluster, data)
         badge        = get_summary_badge(pass_fail, risk_cluster)
 
         return jsonify({
-            "exam_score":   exam_score,
-            "pass_fail":    pass_fail,
-            "performance":  performance,
-            "risk_cluster": risk_cluster,
-            "advisory":     advisory,
-            "badge":        badge,
+            "exam_score":    exam_score,
+            "pass_fail":     pass_fail,
+            "performance":   performance,
+            "risk_cluster":  risk_cluster,
+            "advisory":      advisory,
+            "badge":         badge,
+            "model_version": models.version,
         })
 
     except Exception as e:
@@ -94,7 +131,7 @@ def metrics():
     if request.headers.get("Accept") == "application/json":
         # Return raw JSON for the frontend JS to fetch
         from utils.metrics_service import get_all_metrics
-        return jsonify(get_all_metrics())
+        return _metrics_response(get_all_metrics())
 
     return render_template("metrics.html")
 
@@ -103,7 +140,69 @@ def metrics():
 def api_metrics():
     """JSON-only metrics endpoint for the frontend to fetch."""
     from utils.metrics_service import get_all_metrics
-    return jsonify(get_all_metrics())
+    return _metrics_response(get_all_metrics())
+
+
+def _metrics_response(result: dict):
+    if "model_version" in result:
+        g.model_version = result["model_version"]
+    return jsonify(result)
+
+
+@app.route("/api/stats")
+def api_stats():
+    """JSON-only endpoint exposing in-process cache and batching counters."""
+    from utils import coalescer, prediction_cache, scoring_pool
+    return jsonify({
+        "models":           model_registry.status(),
+        "artifacts":        artifact_cache.stats(),
+        "prediction_cache": prediction_cache.stats(),
+        "coalescer":        coalescer.stats(),
+        "jobs":             jobs.stats(),
+        "scoring_pool":     scoring_pool.stats(),
+    })
+
+
+def _admin_authorized() -> bool:
+    """Admin routes need config.ADMIN_TOKEN in the X-Admin-Token header (disabled when unset)."""
+    import hmac
+    token = request.headers.get("X-Admin-Token", "")
+    return bool(config.ADMIN_TOKEN) and hmac.compare_digest(token, config.ADMIN_TOKEN)
+
+
+@app.route("/admin/models", methods=["GET"])
+def admin_models():
+    """Live model version and recent hot-reload attempts."""
+    if not _admin_authorized():
+        return jsonify({"error": "Forbidden."}), 403
+    return jsonify(model_registry.status())
+
+
+@app.route("/admin/models/reload", methods=["POST"])
+def admin_reload_models():
+    """
+    POST → Load the model files on disk, smoke-test them and swap them in.
+    Also signals the other workers' watchers via MODEL_RELOAD_TRIGGER_PATH.
+
+    ?wait=1  → reload in this request and return its outcome
+               (200 installed/unchanged, 500 failed — old models kept)
+    default  → 202, reload runs in the background
+    ?force=1 → swap even if the files did not change (in every worker)
+    """
+    if not _admin_authorized():
+        return jsonify({"error": "Forbidden."}), 403
+
+    force = request.args.get("force", "").lower() in ("1", "true", "yes")
+    wait  = request.args.get("wait", "").lower() in ("1", "true", "yes")
+    model_registry.touch_trigger(force)
+
+    if wait:
+        outcome = model_registry.reload(reason="admin", force=force)
+        return jsonify(outcome), (500 if outcome["status"] == "failed" else 200)
+
+    if not model_registry.reload_in_background(reason="admin", force=force):
+        return jsonify({"error": "A reload is already running."}), 409
+    return jsonify({"status": "reloading", "version": model_loader.current().version}), 202
 
 
 @app.route("/visualize")
@@ -119,30 +218,29 @@ def api_visualize():
     """
     JSON-only endpoint for chart data.
     Frontend fetches this to render Chart.js plots.
+    Served from a pre-serialized snapshot; supports If-None-Match → 304.
+
+    Query params:
+        max_points → point budget for the cluster scatter (default config.VIZ_MAX_POINTS)
+        mode       → stratified | grid | lttb | full (default config.VIZ_DOWNSAMPLE_MODE)
     """
-    import pandas as pd
+    from utils import visualization_service
 
     try:
-        df = pd.read_csv(config.DATA_PATH)
-
-        cluster_data = clustering_service.get_cluster_data_for_visualization()
-
-        # Use actual CSV column names (Dev 1's headers with spaces)
-        performance_counts = df["Performance Category"].value_counts().to_dict() \
-            if "Performance Category" in df.columns else {}
-
-        pass_fail_counts = df["Pass/Fail"].value_counts().to_dict() \
-            if "Pass/Fail" in df.columns else {}
-
-        return jsonify({
-            "clusters":    cluster_data,
-            "performance": performance_counts,
-            "pass_fail":   pass_fail_counts,
-        })
-
+        blob, etag, g.model_version = visualization_service.get_snapshot(
+            max_points = request.args.get("max_points"),
+            mode       = request.args.get("mode"),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+    response = Response(blob, mimetype="application/json")
+    response.set_etag(etag)
+    response.cache_control.no_cache = True     # always revalidate with the ETag
+    return response.make_conditional(request)
+
 
 @app.route("/advisory", methods=["POST"])
 def advisory():
@@ -169,7 +267,33 @@ def upload():
     """
     POST → Accept a CSV file upload, run predictions on all rows,
            return batch results as JSON.
+
+    ?stream=1 → Streaming mode for large rosters: the CSV is scored in
+                config.UPLOAD_CHUNK_ROWS-row chunks and returned as NDJSON
+                (one result object per line, then a {"count": N} trailer).
+
+    ?async=1  → Background job: returns 202 with a job id at once; poll
+                GET /jobs/<id>, then fetch GET /jobs/<id>/result (the same
+                NDJSON as streaming mode).
+
+    ?format=compact → Dictionary-encoded JSON: advisory texts and labels
+                are sent once and rows carry only their ids
+                (batch_service.score_frame_compact).
+    ?inputs=0 → Do not echo the input columns back (buffered and ?stream=1).
     """
+    stream = request.args.get("stream", "").lower() in ("1", "true", "yes") \
+        or request.accept_mimetypes.best == "application/x-ndjson"
+    run_async = request.args.get("async", "").lower() in ("1", "true", "yes")
+    compact   = request.args.get("format", "").lower() == "compact"
+    inputs    = request.args.get("inputs", "").lower() not in ("0", "false", "no")
+
+    if not stream and not run_async and (request.content_length or 0) > config.BUFFERED_UPLOAD_MAX_BYTES:
+        return jsonify({
+            "error": f"File too large for a buffered upload "
+                     f"(max {config.BUFFERED_UPLOAD_MAX_BYTES // (1024 * 1024)} MB). "
+                     f"Use /upload?stream=1 for large rosters."
+        }), 413
+
     if "file" not in request.files:
         return jsonify({"error": "No file provided."}), 400
 
@@ -177,59 +301,117 @@ def upload():
     if file.filename == "" or not file.filename.endswith(".csv"):
         return jsonify({"error": "Please upload a valid .csv file."}), 400
 
+    if run_async:
+        return _upload_async(file)
+    if stream:
+        return _upload_stream(file, inputs)
+
     try:
         import pandas as pd
 
         df = pd.read_csv(file)
 
         # Support both header styles: "attendance" (app style) or "Attendance (%)" (CSV style)
-        COL_MAP = {
-            "Attendance (%)":           "attendance",
-            "Study Hours (per day)":    "study_hours",
-            "Assignment Score":         "assignment_score",
-            "Previous GPA":             "previous_gpa",
-            "Participation Level":      "participation_level",
-            "Internet Usage (hrs/day)": "internet_usage",
-            "Sleep Hours":              "sleep_hours",
-            "Family Support Index":     "family_support",
-            "Extra Curricular":         "extra_curricular",
-        }
-        # Rename CSV-style headers to app-style keys if present
-        df.rename(columns=COL_MAP, inplace=True)
-
-        REQUIRED = ["attendance","study_hours","assignment_score","previous_gpa",
-                    "participation_level","internet_usage","sleep_hours",
-                    "family_support","extra_curricular"]
-        missing_cols = [c for c in REQUIRED if c not in df.columns]
+        missing_cols = batch_service.prepare_frame(df)
         if missing_cols:
             return jsonify({"error": f"CSV missing columns: {missing_cols}"}), 400
 
-        results = []
-        for _, row in df.iterrows():
-            row_dict     = row.to_dict()
-            exam_score   = prediction_service.predict_exam_score(row_dict)
-            pass_fail    = prediction_service.predict_pass_fail(row_dict)
-            performance  = prediction_service.predict_performance(row_dict)
-            risk_cluster = clustering_service.assign_risk_cluster(row_dict)
-            advisory_list = get_advisory(exam_score, pass_fail, performance, risk_cluster, row_dict)
-
-            results.append({
-                **row_dict,
-                "exam_score":   exam_score,
-                "pass_fail":    pass_fail,
-                "performance":  performance,
-                "risk_cluster": risk_cluster,
-                "advisory":     advisory_list,
-            })
-
-        return jsonify({"count": len(results), "results": results})
+        # Vectorized: one encode/scale pass and one predict() per model
+        with model_loader.pinned() as models:
+            g.model_version = models.version
+            if compact:
+                encoded = batch_service.score_frame_compact(df, inputs)
+                payload = {"format": "compact", "count": len(encoded["rows"]),
+                           "model_version": models.version, **encoded}
+                # Never pretty-printed (jsonify indents in debug mode): rows stay one line each
+                return app.response_class(app.json.dumps(payload) + "\n", mimetype="application/json")
+            results = batch_service.score_frame(df, inputs)
+
+        return jsonify({"count": len(results), "results": results, "model_version": models.version})
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+def _upload_stream(file, inputs: bool = True):
+    """
+    NDJSON response generator for /upload?stream=1.
+    Only one chunk of rows is held in memory at a time.
+    """
+    # Take ownership of the spooled upload: Flask closes request.files when
+    # the view returns, but the generator below keeps reading after that.
+    upload_stream, file.stream = file.stream, io.BytesIO()
+
+    chunks = batch_service.iter_csv_chunks(upload_stream)
+    try:
+        first = next(chunks, None)     # validate headers before streaming starts
+    except Exception as e:
+        upload_stream.close()
+        return jsonify({"error": str(e)}), 400
+
+    # Every chunk is scored with the model set that was live when the upload began
+    models = model_loader.current()
+    g.model_version = models.version
+
+    def generate():
+        count = 0
+        try:
+            chunk = first
+            while chunk is not None:
+                with model_loader.pinned(models):
+                    rows = batch_service.score_frame(chunk, inputs)
+                count += len(rows)
+                yield "".join(app.json.dumps(r) + "\n" for r in rows)
+                chunk  = next(chunks, None)
+            yield app.json.dumps({"count": count, "model_version": models.version}) + "\n"
+        except Exception as e:
+            yield app.json.dumps({"error": str(e), "count": count}) + "\n"
+        finally:
+            upload_stream.close()
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+def _upload_async(file):
+    """Queues the CSV as a background job (utils/jobs.py) and returns its id."""
+    try:
+        state = jobs.submit(file.stream, file.filename)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({
+        **state,
+        "status_url": url_for("job_status", job_id=state["id"]),
+        "result_url": url_for("job_result", job_id=state["id"]),
+    }), 202, {"Location": url_for("job_status", job_id=state["id"])}
+
+
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    """Progress of an /upload?async=1 job (rows_done, rows_total, rows_per_second)."""
+    try:
+        state = jobs.get(job_id)
+    except jobs.JobNotFound:
+        return jsonify({"error": "Unknown job."}), 404
+    if state["status"] == "done":
+        state["result_url"] = url_for("job_result", job_id=job_id)
+    return jsonify(state)
+
+
+@app.route("/jobs/<job_id>/result")
+def job_result(job_id):
+    """The NDJSON result of a finished job (409 while it is still running)."""
+    try:
+        path = jobs.result_path(job_id)
+    except jobs.JobNotFound:
+        return jsonify({"error": "Unknown job."}), 404
+    if path is None:
+        state = jobs.get(job_id)
+        return jsonify({"error": state["error"] or f"Job is {state['status']}.", "status": state["status"]}), 409
+    return send_file(path, mimetype="application/x-ndjson", as_attachment=True,
+                     download_name=f"ackvision-{job_id}.ndjson")
+
+
 # ── Run ──────────────────────────────────────────────────────
 if __name__ == "__main__":
-    import os
     port = int(os.environ.get('PORT', 5000))
     app.run(host="0.0.0.0", port=port, debug=config.DEBUG)
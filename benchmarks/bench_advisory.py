@@ -0,0 +1,56 @@
+"""
+benchmarks/bench_advisory.py  —  advisory rule evaluation for large batches
+Run from the project root: python benchmarks/bench_advisory.py [--rows 1000000]
+
+Times, on resampled dataset rows with random predictions:
+  per-row    get_advisory() once per row (measured on 100k rows, scaled)
+  codes      advisory_codes(): the compiled rule table → uint8 code array
+  render     AdvisoryCodes.render(): codes → message lists (serialisation)
+and checks the rendered batch against get_advisory() row by row.
+"""
+import argparse, os, sys, time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import config
+from utils.advisory import get_advisory, advisory_codes
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--rows", type=int, default=1_000_000)
+args = parser.parse_args()
+
+n     = args.rows
+rng   = np.random.default_rng(0)
+frame = pd.read_csv(config.DATA_PATH).sample(n, replace=True, random_state=0).reset_index(drop=True)
+frame.rename(columns=dict(zip(config.FEATURE_COLUMNS, config.INPUT_KEYS)), inplace=True)
+scores = np.round(rng.uniform(0, 100, n), 2)
+labels = [
+    rng.choice(list(config.PASS_FAIL_LABELS.values()), n).tolist(),
+    rng.choice(list(config.PERFORMANCE_LABELS.values()), n).tolist(),
+    rng.choice(list(config.RISK_LABELS.values()), n).tolist(),
+]
+
+loop_n  = min(n, 100_000)
+records = frame.head(loop_n).to_dict("records")
+start   = time.perf_counter()
+per_row = [get_advisory(s, pf, perf, risk, rec) for s, pf, perf, risk, rec in
+           zip(scores[:loop_n].tolist(), *(l[:loop_n] for l in labels), records)]
+t_loop  = (time.perf_counter() - start) * n / loop_n
+
+start   = time.perf_counter()
+codes   = advisory_codes(scores, *labels, frame)
+t_codes = time.perf_counter() - start
+
+start    = time.perf_counter()
+rendered = codes.render()
+t_render = time.perf_counter() - start
+
+assert rendered[:loop_n] == per_row, "compiled rules diverge from get_advisory()"
+
+print(f"{n:,} rows  ({codes.codes.nbytes / 1e6:.1f} MB of codes)")
+print(f"per-row get_advisory : {t_loop:8.3f}s  (extrapolated from {loop_n:,})")
+print(f"advisory_codes       : {t_codes:8.3f}s  {t_loop / t_codes:8.1f}× faster")
+print(f"render to strings    : {t_render:8.3f}s")
@@ -0,0 +1,62 @@
+"""
+benchmarks/bench_batch.py  —  /upload scoring throughput
+Run from the project root: python benchmarks/bench_batch.py [n_rows]
+
+Compares rows/second of the old per-row loop (iterrows → pipeline.run →
+get_advisory) against utils/batch_service.score_frame on a roster built
+by resampling the synthetic dataset. Also checks both give the same rows.
+"""
+import os, sys, time
+import warnings
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+warnings.filterwarnings("ignore")
+
+import config
+from utils import model_loader, batch_service
+from utils.inference_pipeline import pipeline
+from utils.advisory import get_advisory
+
+N_ROWS    = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+LOOP_ROWS = min(N_ROWS, 1_000)   # the old loop is too slow to run on everything
+
+model_loader.load_all()
+
+roster = pd.read_csv(config.DATA_PATH).sample(N_ROWS, replace=True, random_state=42)
+roster.reset_index(drop=True, inplace=True)
+batch_service.prepare_frame(roster)
+
+
+def row_loop(df):
+    results = []
+    for _, row in df.iterrows():
+        row_dict   = row.to_dict()
+        prediction = pipeline.run(row_dict)
+        results.append({
+            **row_dict, **prediction,
+            "advisory": get_advisory(
+                prediction["exam_score"], prediction["pass_fail"],
+                prediction["performance"], prediction["risk_cluster"], row_dict,
+            ),
+        })
+    return results
+
+
+def rate(fn, df):
+    start = time.perf_counter()
+    out   = fn(df)
+    return out, len(df) / (time.perf_counter() - start)
+
+
+subset = roster.head(LOOP_ROWS).copy()
+loop_out, loop_rate   = rate(row_loop, subset)
+batch_sub, _          = rate(batch_service.score_frame, subset)
+assert loop_out == batch_sub, "batch engine diverges from the per-row loop"
+
+_, batch_rate = rate(batch_service.score_frame, roster)
+
+print(f"Per-row loop : {loop_rate:12,.0f} rows/s  (measured on {LOOP_ROWS:,} rows)")
+print(f"Batch engine : {batch_rate:12,.0f} rows/s  (measured on {N_ROWS:,} rows)")
+print(f"Speed-up     : {batch_rate / loop_rate:12,.1f}x")
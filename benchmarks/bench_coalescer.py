@@ -0,0 +1,67 @@
+"""
+benchmarks/bench_coalescer.py  —  /predict micro-batching under concurrency
+Run from the project root: python benchmarks/bench_coalescer.py [n_threads] [n_requests]
+
+Fires n_requests single-record pipeline.run() calls from n_threads threads
+(like gunicorn --threads) with config.COALESCE_ENABLED off and on, for a
+few COALESCE_MAX_WAIT_MS settings. Reports throughput, per-request
+latency and the coalescer's batch-size / queue-wait stats, and checks
+that coalesced results equal the direct ones. The prediction cache
+(utils/prediction_cache.py) is turned off: the resampled rows repeat, and
+cache hits never reach the coalescer.
+"""
+import os, sys, time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+warnings.filterwarnings("ignore")
+
+import config
+from utils import model_loader, batch_service, coalescer
+from utils.inference_pipeline import pipeline
+
+N_THREADS  = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+N_REQUESTS = int(sys.argv[2]) if len(sys.argv) > 2 else 4_000
+
+model_loader.load_all()
+config.PREDICTION_CACHE_ENABLED = False
+
+roster = pd.read_csv(config.DATA_PATH).sample(N_REQUESTS, replace=True, random_state=42)
+batch_service.prepare_frame(roster)
+records = roster[config.INPUT_KEYS].to_dict("records")
+
+
+def timed_run(record):
+    start  = time.perf_counter()
+    result = pipeline.run(record)
+    return result, time.perf_counter() - start
+
+
+def run_all():
+    start = time.perf_counter()
+    with ThreadPoolExecutor(N_THREADS) as pool:
+        out = list(pool.map(timed_run, records))
+    wall = time.perf_counter() - start
+    lat  = np.array([t for _, t in out]) * 1000.0
+    return [r for r, _ in out], wall, lat
+
+
+config.COALESCE_ENABLED = False
+reference, wall, lat = run_all()
+print(f"{N_REQUESTS} requests, {N_THREADS} threads\n")
+print(f"{'mode':>16} {'req/s':>8} {'p50 ms':>7} {'p95 ms':>7} {'mean batch':>10} {'wait p95':>9}  same")
+print(f"{'direct':>16} {N_REQUESTS / wall:>8.0f} {np.percentile(lat, 50):>7.2f} {np.percentile(lat, 95):>7.2f}")
+
+config.COALESCE_ENABLED = True
+for wait_ms in (0.0, 1.0, 2.0, 5.0):
+    coalescer._coalescer = coalescer.RequestCoalescer(config.COALESCE_MAX_BATCH, wait_ms)
+    results, wall, lat = run_all()
+    s = coalescer.stats()
+    print(f"{f'coalesce {wait_ms:g}ms':>16} {N_REQUESTS / wall:>8.0f} {np.percentile(lat, 50):>7.2f} "
+          f"{np.percentile(lat, 95):>7.2f} {s['mean_batch']:>10.1f} {s['queue_wait_ms']['p95']:>9.2f}  "
+          f"{results == reference}")
+print("\nbatch sizes (last run):", {k: v for k, v in s["batch_sizes"].items() if v})
@@ -0,0 +1,68 @@
+"""
+benchmarks/bench_compact_upload.py  —  /upload response size: full rows vs compact
+Run from the project root: python benchmarks/bench_compact_upload.py [--rows 100000]
+
+Scores a resampled roster and serialises it the way /upload does (sorted
+keys, no indent) as: full rows, full rows without inputs (?inputs=0),
+compact (?format=compact) and compact without inputs. Reports the body
+size, the scoring + encoding time and the peak Python memory (separate
+traced run) of each, and checks that compact decodes back to the full rows.
+"""
+import argparse, json, os, sys, time, tracemalloc
+import warnings
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+warnings.filterwarnings("ignore")
+
+import config
+from utils import model_loader, model_registry, batch_service
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--rows", type=int, default=100_000)
+args = parser.parse_args()
+
+model_loader.load_all()
+model_registry.warm(model_loader.current())
+roster = pd.read_csv(config.DATA_PATH).sample(args.rows, replace=True, random_state=42).reset_index(drop=True)
+batch_service.prepare_frame(roster)
+
+
+def decode(compact: dict) -> list:
+    rows = []
+    for row in compact["rows"]:
+        d = dict(zip(compact["columns"], row))
+        for key, vocabulary in compact["labels"].items():
+            d[key] = vocabulary[d[key]]
+        d["advisory"] = [compact["messages"][i] for i in d["advisory"]]
+        rows.append(d)
+    return rows
+
+
+variants = [
+    ("full",              lambda: {"results": batch_service.score_frame(roster)}),
+    ("full, inputs=0",    lambda: {"results": batch_service.score_frame(roster, inputs=False)}),
+    ("compact",           lambda: batch_service.score_frame_compact(roster)),
+    ("compact, inputs=0", lambda: batch_service.score_frame_compact(roster, inputs=False)),
+]
+
+print(f"{args.rows:,} rows")
+print(f"{'format':<18} {'bytes':>14} {'ratio':>7} {'seconds':>8} {'peak MB':>8}")
+baseline = None
+for name, build in variants:
+    start   = time.perf_counter()
+    payload = build()
+    body    = json.dumps(payload, sort_keys=True)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    json.dumps(build(), sort_keys=True)
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    if baseline is None:
+        baseline, full_rows = len(body), payload["results"]
+    elif name == "compact":
+        assert decode(payload) == full_rows, "compact result does not decode to the full rows"
+    print(f"{name:<18} {len(body):>14,} {baseline / len(body):>6.1f}× {seconds:>8.2f} {peak:>8.0f}")
+    del payload, body
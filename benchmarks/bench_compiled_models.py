@@ -0,0 +1,41 @@
+"""
+benchmarks/bench_compiled_models.py  —  Compiled evaluators: parity + latency
+Run from the project root: python benchmarks/bench_compiled_models.py
+
+For every saved model with a compiled evaluator (utils/compiled_models.py):
+1. Checks predictions equal sklearn's on the whole dataset plus 100k random
+   rows (regression output must be bit-identical).
+2. Times a single-record predict() on both.
+"""
+import os, sys, timeit
+import warnings
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+warnings.filterwarnings("ignore")
+
+from utils import model_loader, compiled_models, dataset_store
+
+model_loader.load_all()
+
+X_data = np.asarray(dataset_store.get_feature_matrix(scaled=True))
+X_rand = np.random.RandomState(0).normal(0, 1.5, (100_000, X_data.shape[1]))
+
+print(f"{'model':>8} {'parity':>22} {'sklearn µs':>11} {'compiled µs':>12} {'speed-up':>9}")
+for name in ("linear", "dt", "kmeans"):
+    reference = model_loader.get_model(name)
+    compiled  = compiled_models.get(name)
+
+    for X in (X_data, X_rand):
+        expected, got = reference.predict(X), compiled.predict(X)
+        assert np.array_equal(expected, got), f"{name}: compiled output diverges from sklearn"
+        # single-row path must agree too
+        for row in X[:2000]:
+            assert np.array_equal(reference.predict(row[None]), compiled.predict(row[None])), name
+
+    row = X_data[:1].copy()
+    ref_t  = min(timeit.repeat(lambda: reference.predict(row), number=500, repeat=5)) / 500
+    comp_t = min(timeit.repeat(lambda: compiled.predict(row), number=20000, repeat=5)) / 20000
+    print(f"{name:>8} {'ok (' + format(len(X_data) + len(X_rand), ',') + ' rows)':>22} "
+          f"{ref_t * 1e6:>11.1f} {comp_t * 1e6:>12.2f} {ref_t / comp_t:>8.0f}x")
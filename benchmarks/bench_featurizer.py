@@ -0,0 +1,50 @@
+"""
+benchmarks/bench_featurizer.py  —  Compiled featurizer parity + latency
+Run from the project root: python benchmarks/bench_featurizer.py
+
+1. Checks that utils/featurizer.py produces EXACTLY the same bits as the
+   pandas + sklearn reference path for every row of the dataset
+   (also covered by tests/test_featurizer.py).
+2. Times a single-record transform on both paths.
+"""
+import os, sys, timeit
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+warnings.filterwarnings("ignore")
+
+import config
+from utils import model_loader
+from utils.featurizer import get_featurizer
+from utils.preprocessing import get_feature_array_reference
+
+COL_MAP = dict(zip(config.FEATURE_COLUMNS, config.INPUT_KEYS))
+
+model_loader.load_all()
+fz = get_featurizer()
+
+# ── Parity over the whole dataset ───────────────────────────────────
+records = pd.read_csv(config.DATA_PATH).rename(columns=COL_MAP)[config.INPUT_KEYS].to_dict("records")
+mismatches = 0
+for rec in records:
+    ref  = get_feature_array_reference(rec)
+    fast = fz.transform(rec)
+    if ref.dtype != fast.dtype or ref.shape != fast.shape or ref.tobytes() != fast.tobytes():
+        mismatches += 1
+print(f"Parity: {len(records) - mismatches}/{len(records)} rows bit-identical")
+assert mismatches == 0, "compiled featurizer diverges from the sklearn reference"
+
+# ── Single-record latency ───────────────────────────────────────────
+sample = records[0]
+buffer = np.empty((1, fz.n_features))
+for label, fn in [
+    ("reference (pandas + sklearn)", lambda: get_feature_array_reference(sample)),
+    ("compiled                    ", lambda: fz.transform(sample)),
+    ("compiled, preallocated out  ", lambda: fz.transform(sample, out=buffer)),
+]:
+    n = 200 if "reference" in label else 20000
+    best = min(timeit.repeat(fn, number=n, repeat=5)) / n
+    print(f"{label}  {best * 1e6:9.2f} µs / record")
@@ -0,0 +1,82 @@
+"""
+benchmarks/bench_neighbors.py  —  KNN neighbour-index backends: recall + latency
+Run from the project root: python benchmarks/bench_neighbors.py [--sizes ...]
+
+Builds synthetic training sets (resampled from the real scaled features
+with jitter, labelled by the saved KNN model) of 10k–1M rows and compares
+every backend in utils/neighbors.py against exact float64 brute force:
+  recall@k   → share of true k nearest neighbours found
+  agreement  → share of queries whose predicted class matches the exact vote
+  single µs  → latency of one-row predict()
+  batch µs   → per-row latency of predict() on all queries at once
+"""
+import argparse, os, sys, time, timeit
+import warnings
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+warnings.filterwarnings("ignore")
+
+from utils import model_loader, dataset_store
+from utils.neighbors import build_index, BACKENDS
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+parser.add_argument("--queries", type=int, default=1_000)
+args = parser.parse_args()
+
+model_loader.load_all()
+knn    = model_loader.get_knn()
+k      = knn.n_neighbors
+X_base = np.asarray(dataset_store.get_feature_matrix(scaled=True))
+rng    = np.random.RandomState(0)
+
+
+def jitter(n):
+    return X_base[rng.randint(0, len(X_base), n)] + rng.normal(0, 0.1, (n, X_base.shape[1]))
+
+
+def exact_neighbours(X, Q):
+    """float64 brute force in blocks — the ground truth."""
+    sq  = np.einsum("ij,ij->i", X, X)
+    out = []
+    step = max(1, (1 << 23) // len(X))
+    for s in range(0, len(Q), step):
+        d2   = sq[None, :] - 2.0 * (Q[s:s + step] @ X.T)
+        part = np.argpartition(d2, k - 1, axis=1)[:, :k]
+        order = np.take_along_axis(d2, part, axis=1).argsort(axis=1, kind="stable")
+        out.append(np.take_along_axis(part, order, axis=1))
+    return np.vstack(out)
+
+
+print(f"{'train rows':>10} {'backend':>9} {'build s':>8} {'recall@k':>9} {'agree':>7} {'single µs':>10} {'batch µs':>9}")
+for n in args.sizes:
+    X, Q = jitter(n), jitter(args.queries)
+    y    = np.searchsorted(knn.classes_, knn.predict(X))
+    truth = exact_neighbours(X, Q)
+    votes = (y[truth][:, :, None] == np.arange(len(knn.classes_))).sum(axis=1)
+    exact_pred = knn.classes_[votes.argmax(axis=1)]
+
+    for backend in BACKENDS:
+        if backend == "sklearn":
+            from sklearn.neighbors import KNeighborsClassifier
+            start = time.perf_counter()
+            model = KNeighborsClassifier(n_neighbors=k).fit(X, knn.classes_[y])
+            build = time.perf_counter() - start
+            found = model.kneighbors(Q, return_distance=False)
+        else:
+            start = time.perf_counter()
+            model = build_index(backend, X, y, knn.classes_, k)
+            build = time.perf_counter() - start
+            found = model.kneighbors(Q)
+
+        recall = np.mean([len(np.intersect1d(a, b)) / k for a, b in zip(found, truth)])
+        agree  = np.mean(model.predict(Q) == exact_pred)
+        one    = Q[:1]
+        single = min(timeit.repeat(lambda: model.predict(one), number=20, repeat=3)) / 20
+        start  = time.perf_counter()
+        model.predict(Q)
+        batch  = (time.perf_counter() - start) / len(Q)
+        print(f"{n:>10,} {backend:>9} {build:>8.2f} {recall:>9.4f} {agree:>7.3f} "
+              f"{single * 1e6:>10.1f} {batch * 1e6:>9.1f}")
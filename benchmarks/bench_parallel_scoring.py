@@ -0,0 +1,58 @@
+"""
+benchmarks/bench_parallel_scoring.py  —  batch scoring throughput vs process-pool size
+Run from the project root: python benchmarks/bench_parallel_scoring.py [--rows 100000 1000000 10000000] [--workers 1 2 4 8]
+
+Scores a scaled feature matrix (dataset rows resampled with noise) through
+utils/scoring_pool.predict_matrix with PARALLEL_SCORING on, for every pool
+size: 1 worker = the inline single-core path. Each pool is warmed (spawned,
+initializer run) before timing, and every result is checked against the
+inline one. Speed-up needs real cores — on a 1-CPU box every size is ~1×.
+"""
+import argparse, os, sys, time
+import warnings
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+warnings.filterwarnings("ignore")
+
+import config
+from utils import model_loader, model_registry, batch_service, dataset_store, scoring_pool
+
+# Pool processes are spawned and import this file: run only as the main script
+if __name__ == "__main__":
+    cores  = os.cpu_count() or 1
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, *(w for w in (2, 4, 8, 16, 32) if w <= cores), cores}))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    model_loader.load_all()
+    model_registry.warm(model_loader.current())
+    config.PARALLEL_SCORING  = True
+    config.PARALLEL_MIN_ROWS = 0
+
+    frame = dataset_store.load_frame().copy()
+    batch_service.prepare_frame(frame)
+    base  = batch_service.featurize_frame(frame)
+    rng   = np.random.default_rng(0)
+
+    print(f"{cores} CPU(s)")
+    print(f"{'rows':>11} {'workers':>7} {'seconds':>8} {'rows/s':>12} {'speed-up':>8}")
+    for n_rows in args.rows:
+        X = base[rng.integers(0, len(base), n_rows)] + rng.normal(0, 0.05, (n_rows, base.shape[1]))
+        reference, single = None, None
+        for workers in args.workers:
+            scoring_pool.predict_matrix(X[:max(2 * workers, 1)], workers=workers)     # spawn + initializer
+            best = np.inf
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                out   = scoring_pool.predict_matrix(X, workers=workers)
+                best  = min(best, time.perf_counter() - start)
+            if reference is None:
+                reference, single = out, best
+            assert out == reference, f"{workers} workers diverge from the inline result"
+            print(f"{n_rows:>11,} {workers:>7} {best:>8.2f} {n_rows / best:>12,.0f} {single / best:>7.2f}×")
+        del X, reference, out
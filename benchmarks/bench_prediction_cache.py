@@ -0,0 +1,65 @@
+"""
+benchmarks/bench_prediction_cache.py  —  prediction cache hit path vs inference
+Run from the project root: python benchmarks/bench_prediction_cache.py [n_rows]
+
+  single → pipeline.run() over records drawn from a small pool of profiles
+           (resubmits), cache off vs on
+  batch  → batch_service.score_frame() on a roster with duplicate rows,
+           cold cache vs warm cache vs cache off
+Also checks that cached results equal uncached ones and that
+model_loader.load_all() invalidates the cache.
+"""
+import os, sys, time
+import warnings
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+warnings.filterwarnings("ignore")
+
+import config
+from utils import model_loader, batch_service, prediction_cache
+from utils.inference_pipeline import pipeline
+
+N_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+model_loader.load_all()
+cache = prediction_cache.get_cache()
+
+data    = pd.read_csv(config.DATA_PATH)
+pool    = data.sample(200, random_state=0)
+batch_service.prepare_frame(pool)
+records = pool[config.INPUT_KEYS].sample(N_ROWS, replace=True, random_state=1).to_dict("records")
+
+
+def per_call(fn, items):
+    start = time.perf_counter()
+    out   = [fn(r) for r in items]
+    return out, (time.perf_counter() - start) / len(items) * 1e6
+
+
+config.PREDICTION_CACHE_ENABLED = False
+ref, off_us = per_call(pipeline.run, records)
+config.PREDICTION_CACHE_ENABLED = True
+cache.clear()
+got, on_us = per_call(pipeline.run, records)
+print(f"single  ({N_ROWS} requests over 200 profiles)")
+print(f"  cache off  {off_us:7.1f} µs/request")
+print(f"  cache on   {on_us:7.1f} µs/request   hit rate {cache.stats()['hit_rate']:.3f}   same {got == ref}")
+
+roster = data.sample(N_ROWS, replace=True, random_state=2).reset_index(drop=True)
+batch_service.prepare_frame(roster)
+print(f"\nbatch   ({N_ROWS} rows, {roster.duplicated().sum()} duplicates)")
+config.PREDICTION_CACHE_ENABLED = False
+start = time.perf_counter(); ref = batch_service.score_frame(roster); off = time.perf_counter() - start
+config.PREDICTION_CACHE_ENABLED = True
+cache.clear()
+start = time.perf_counter(); cold = batch_service.score_frame(roster); t_cold = time.perf_counter() - start
+start = time.perf_counter(); warm = batch_service.score_frame(roster); t_warm = time.perf_counter() - start
+print(f"  cache off   {N_ROWS / off:9.0f} rows/s")
+print(f"  cold cache  {N_ROWS / t_cold:9.0f} rows/s   same {cold == ref}")
+print(f"  warm cache  {N_ROWS / t_warm:9.0f} rows/s   same {warm == ref}")
+
+model_loader.load_all()
+print(f"\nafter load_all(): {cache.stats()['entries']} entries, "
+      f"{cache.stats()['invalidations']} invalidations")
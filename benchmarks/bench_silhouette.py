@@ -0,0 +1,69 @@
+"""
+benchmarks/bench_silhouette.py  —  Silhouette modes: runtime vs accuracy
+Run from the project root: python benchmarks/bench_silhouette.py [--exact-max N]
+
+Builds synthetic scaled datasets of 1k / 100k / 1M rows (resampled from the
+real data with small jitter), labels them with the saved KMeans model and
+times each silhouette mode from utils/silhouette.py.
+
+The exact score is O(n²); above --exact-max rows it is skipped and the
+accuracy column is measured against a large-sample reference instead.
+"""
+import argparse, os, sys, time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+warnings.filterwarnings("ignore")
+
+import config
+from utils import model_loader, batch_service
+from utils.silhouette import exact_silhouette, sampled_silhouette, centroid_silhouette
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+parser.add_argument("--exact-max", type=int, default=20_000,
+                    help="largest n for which the exact O(n²) score is computed")
+parser.add_argument("--reference-sample", type=int, default=40_000,
+                    help="sample size of the reference when exact is skipped")
+args = parser.parse_args()
+
+model_loader.load_all()
+kmeans = model_loader.get_kmeans()
+
+base = pd.read_csv(config.DATA_PATH)
+batch_service.prepare_frame(base)
+X_base = batch_service.featurize_frame(base)
+rng = np.random.RandomState(0)
+
+
+def timed(fn, *a, **kw):
+    start = time.perf_counter()
+    out   = fn(*a, **kw)
+    return out, time.perf_counter() - start
+
+
+print(f"{'rows':>10} {'mode':>9} {'seconds':>9} {'score':>8} {'abs err':>8}  note")
+for n in args.sizes:
+    X      = X_base[rng.randint(0, len(X_base), n)] + rng.normal(0, 0.05, (n, X_base.shape[1]))
+    labels = kmeans.predict(X)
+
+    if n <= args.exact_max:
+        ref, secs = timed(exact_silhouette, X, labels)
+        note = "reference"
+        print(f"{n:>10,} {'exact':>9} {secs:>9.3f} {ref['score']:>8.4f} {0:>8.4f}  {note}")
+    else:
+        ref, secs = timed(sampled_silhouette, X, labels, sample_size=args.reference_sample, seed=1)
+        note = f"exact skipped; reference = {args.reference_sample:,}-row sample"
+        print(f"{n:>10,} {'exact':>9} {'—':>9} {'—':>8} {'—':>8}  {note}")
+
+    for label, fn, kw in [
+        ("sampled",  sampled_silhouette,  {}),
+        ("centroid", centroid_silhouette, {"centers": kmeans.cluster_centers_}),
+    ]:
+        out, secs = timed(fn, X, labels, **kw)
+        extra = f"ci95=[{out['ci95'][0]:.4f}, {out['ci95'][1]:.4f}]" if "ci95" in out else ""
+        print(f"{n:>10,} {label:>9} {secs:>9.3f} {out['score']:>8.4f} "
+              f"{abs(out['score'] - ref['score']):>8.4f}  {extra}")
@@ -0,0 +1,101 @@
+"""
+benchmarks/bench_startup.py  —  cold start: import time, model loading, first request
+Run from the project root: python benchmarks/bench_startup.py [--budget SECONDS] [--top N]
+
+For every config.MODEL_LOAD_MODE ("eager", "parallel", "lazy") runs a fresh
+interpreter under `python -X importtime` that imports app.py and serves one
+/predict request, and reports:
+  import app   → seconds until the WSGI app object exists (workers can accept)
+  1st predict  → seconds for the first /predict (lazy mode loads models here)
+  ready        → import + first predict
+It then lists the N slowest top-level imports of app.py and checks that the
+serving modules alone (inference pipeline, batch scoring, registry) do not
+pull in pandas / sklearn / scipy — those must stay deferred.
+
+Exits with status 1 when a deferred module is imported eagerly, or when
+eager-mode `import app` takes longer than --budget seconds.
+"""
+import argparse, json, os, subprocess, sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Must not be imported by the serving modules themselves
+DEFERRED = ("pandas", "sklearn", "scipy", "sklearn.metrics")
+SERVING  = ("utils.inference_pipeline", "utils.batch_service", "utils.model_registry", "utils.prediction_cache")
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--budget", type=float, default=None, help="max seconds for eager `import app`")
+parser.add_argument("--top", type=int, default=10)
+parser.add_argument("--repeat", type=int, default=3)
+args = parser.parse_args()
+
+PROBE = """
+import json, sys, time, warnings
+warnings.filterwarnings("ignore")
+sys.path.insert(0, {root!r})
+import config
+config.MODEL_LOAD_MODE = {mode!r}
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+client = app.app.test_client()
+client.post("/predict", json=dict(attendance=80, study_hours=4, assignment_score=70, previous_gpa=7,
+    participation_level="Medium", internet_usage=3, sleep_hours=7, family_support=5, extra_curricular="Yes"))
+done = time.perf_counter()
+print(json.dumps({{"import": imported - start, "predict": done - imported}}), file=sys.__stdout__)
+"""
+
+
+def probe(mode):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(root=ROOT, mode=mode)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    timing = json.loads(proc.stdout.strip().splitlines()[-1])
+    return timing, proc.stderr
+
+
+def top_imports(importtime_log, n):
+    """Slowest direct imports made while importing app (cumulative µs)."""
+    rows = []
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():      # the header line
+            continue
+        depth = len(name) - len(name.lstrip())
+        rows.append((depth, int(cumulative), name.strip()))
+    app_depth = next(d for d, _, name in rows if name == "app")
+    direct    = [(us, name) for d, us, name in rows if d == app_depth + 2]
+    return sorted(direct, reverse=True)[:n]
+
+
+print(f"{'mode':>9} {'import app s':>12} {'1st predict s':>13} {'ready s':>8}")
+results, log_eager = {}, None
+for mode in ("eager", "parallel", "lazy"):
+    runs = [probe(mode) for _ in range(args.repeat)]
+    best = min(runs, key=lambda r: r[0]["import"] + r[0]["predict"])
+    results[mode] = best[0]
+    if mode == "eager":
+        log_eager = best[1]
+    t = best[0]
+    print(f"{mode:>9} {t['import']:>12.3f} {t['predict']:>13.3f} {t['import'] + t['predict']:>8.3f}")
+
+print(f"\nslowest imports under `import app` (eager, cumulative):")
+for us, name in top_imports(log_eager, args.top):
+    print(f"  {us / 1e6:7.3f} s  {name}")
+
+check = subprocess.run(
+    [sys.executable, "-c", f"import sys; sys.path.insert(0, {ROOT!r}); "
+     f"import {', '.join(SERVING)}; print(','.join(m for m in {DEFERRED!r} if m in sys.modules))"],
+    cwd=ROOT, capture_output=True, text=True, check=True,
+)
+leaked = [m for m in check.stdout.strip().split(",") if m]
+print(f"\ndeferred imports: {'ok' if not leaked else 'EAGERLY IMPORTED: ' + ', '.join(leaked)}")
+
+failed = bool(leaked)
+if args.budget is not None and results["eager"]["import"] > args.budget:
+    print(f"eager import app took {results['eager']['import']:.3f} s > budget {args.budget:.3f} s")
+    failed = True
+sys.exit(1 if failed else 0)
@@ -0,0 +1,91 @@
+"""
+benchmarks/bench_stream_training.py  —  in-memory vs streaming training: peak memory + quality
+Run from the project root: python benchmarks/bench_stream_training.py [--rows 200000 1000000]
+
+Builds larger CSVs by resampling the dataset rows with a little noise on the
+numeric columns, then trains on each in a fresh subprocess:
+  memory → training.prepare() + fit_model() for all 4 models
+  stream → training.stream_fit()
+and reports wall time, peak RSS (ru_maxrss) and the held-out metrics.
+Nothing is published: the training cache lives in a temp dir, models/ is untouched.
+"""
+import argparse, json, os, subprocess, sys, tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--rows", type=int, nargs="+", default=[200_000, 1_000_000])
+parser.add_argument("--chunk-rows", type=int, default=None, help="override config.TRAIN_CHUNK_ROWS")
+parser.add_argument("--skip-memory", action="store_true", help="only run the streaming mode")
+args = parser.parse_args()
+
+# Runs in the child: patch the paths, train, print one JSON line
+CHILD = r"""
+import json, resource, sys, time
+import config
+config.DATA_PATH, config.TRAIN_CACHE_DIR = sys.argv[2], sys.argv[3]
+if sys.argv[4] != "None":
+    config.TRAIN_CHUNK_ROWS = int(sys.argv[4])
+from utils import training
+
+t0 = time.perf_counter()
+if sys.argv[1] == "stream":
+    res  = training.stream_fit(force=True)
+    keys = {name: res["key"] for name in training.MODEL_OUTPUTS}
+else:
+    prep = training.prepare(force=True)
+    keys = {name: training.model_key(name, prep["key"]) for name in training.MODEL_OUTPUTS}
+    for name, key in keys.items():
+        training.fit_model(name, prep["dir"], key)
+seconds = time.perf_counter() - t0
+m = {name: training.model_metrics(name, key) for name, key in keys.items()}
+print(json.dumps({
+    "seconds": seconds,
+    "peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "mae": m["linear"]["mae"], "r2": m["linear"]["r2"],
+    "dt": m["dt"]["accuracy"], "knn": m["knn"]["accuracy"],
+}))
+"""
+
+
+def make_csv(path, n_rows):
+    import numpy as np
+    import pandas as pd
+    import config
+
+    base = pd.read_csv(config.DATA_PATH)
+    rng  = np.random.default_rng(0)
+    numeric = [c for c in base.columns if base[c].dtype != object]
+    first = True
+    for start in range(0, n_rows, 100_000):
+        n     = min(100_000, n_rows - start)
+        chunk = base.iloc[rng.integers(0, len(base), n)].reset_index(drop=True)
+        chunk[numeric] = chunk[numeric] * rng.normal(1.0, 0.05, (n, len(numeric)))
+        chunk.round(2).to_csv(path, mode="w" if first else "a", header=first, index=False)
+        first = False
+
+
+def run(mode, csv_path, cache_dir):
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, mode, csv_path, cache_dir, str(args.chunk_rows)],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if out.returncode:
+        return {"error": out.stderr.strip().splitlines()[-1]}
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+with tempfile.TemporaryDirectory() as tmp:
+    print(f"{'rows':>10} {'mode':<7} {'seconds':>8} {'peak MB':>8} {'MAE':>7} {'R²':>7} {'DT acc':>7} {'KNN acc':>7}")
+    for n_rows in args.rows:
+        csv_path = os.path.join(tmp, f"students_{n_rows}.csv")
+        make_csv(csv_path, n_rows)
+        for mode in (["stream"] if args.skip_memory else ["memory", "stream"]):
+            r = run(mode, csv_path, os.path.join(tmp, f"cache-{mode}-{n_rows}"))
+            if "error" in r:
+                print(f"{n_rows:>10} {mode:<7} {r['error']}")
+                continue
+            print(f"{n_rows:>10} {mode:<7} {r['seconds']:>8.1f} {r['peak_mb']:>8.0f} "
+                  f"{r['mae']:>7.3f} {r['r2']:>7.4f} {r['dt']:>7.4f} {r['knn']:>7.4f}")
+        os.remove(csv_path)
@@ -0,0 +1,95 @@
+"""
+benchmarks/bench_worker_memory.py  —  gunicorn memory per worker, preload off vs on
+Run from the project root: python benchmarks/bench_worker_memory.py [--workers 1 2 4 8 16]
+
+Starts `gunicorn -c gunicorn.conf.py app:app` for every worker count with
+GUNICORN_PRELOAD=0 and =1, sends /predict and /api/visualize traffic so every
+worker has served requests, then reads /proc/<pid>/smaps_rollup:
+  RSS  → resident pages, shared ones counted in every process
+  PSS  → shared pages split between the processes mapping them
+  USS  → pages private to the worker (what each extra worker really costs)
+"total PSS" is master + all workers — the memory the deployment actually uses.
+Linux only.
+"""
+import argparse, json, os, socket, subprocess, sys, time
+import urllib.request
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+parser.add_argument("--requests-per-worker", type=int, default=20)
+args = parser.parse_args()
+
+RECORD = json.dumps(dict(
+    attendance=80, study_hours=4, assignment_score=70, previous_gpa=7,
+    participation_level="Medium", internet_usage=3, sleep_hours=7,
+    family_support=5, extra_curricular="Yes",
+)).encode()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def memory(pid):
+    """(rss, pss, uss) in MB from smaps_rollup."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as fh:
+        for line in fh:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return fields["Rss"], fields["Pss"], fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+
+
+def children(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as fh:
+        return [int(p) for p in fh.read().split()]
+
+
+def run(n_workers, preload):
+    port = free_port()
+    env  = {**os.environ, "WEB_CONCURRENCY": str(n_workers), "GUNICORN_PRELOAD": "1" if preload else "0",
+            "ACKVISION_ADMIN_TOKEN": ""}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "-b", f"127.0.0.1:{port}", "app:app"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        url, deadline = f"http://127.0.0.1:{port}", time.time() + 300
+        while time.time() < deadline:
+            if proc.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with code {proc.returncode}")
+            try:
+                if len(children(proc.pid)) == n_workers:
+                    urllib.request.urlopen(f"{url}/api/stats", timeout=5)
+                    break
+            except OSError:
+                pass
+            time.sleep(0.5)
+        time.sleep(1.0)     # let late workers finish booting
+
+        for _ in range(args.requests_per_worker * n_workers):
+            req = urllib.request.Request(f"{url}/predict", RECORD, {"Content-Type": "application/json"})
+            urllib.request.urlopen(req, timeout=30).read()
+        for _ in range(2 * n_workers):
+            urllib.request.urlopen(f"{url}/api/visualize", timeout=60).read()
+
+        workers = [memory(pid) for pid in children(proc.pid)]
+        master  = memory(proc.pid)
+        mean    = [sum(col) / len(workers) for col in zip(*workers)]
+        total   = master[1] + sum(w[1] for w in workers)
+        return mean, total
+    finally:
+        proc.terminate()
+        proc.wait(timeout=60)
+
+
+print(f"{'workers':>7} {'preload':>7} {'RSS/worker':>10} {'PSS/worker':>10} {'USS/worker':>10} {'total PSS':>10}   (MB)")
+for n in args.workers:
+    for preload in (False, True):
+        (rss, pss, uss), total = run(n, preload)
+        print(f"{n:>7} {str(preload):>7} {rss:>10.1f} {pss:>10.1f} {uss:>10.1f} {total:>10.1f}", flush=True)
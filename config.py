@@ -17,12 +17,27 @@ DEBUG      = True                  # Set False in production
 # ── Dataset Path ─────────────────────────────────────────────
 DATA_PATH = os.path.join(BASE_DIR, "data", "student_synthetic_data.csv")
 
+# Memory-mappable columnar copy of DATA_PATH (built by utils/dataset_store.py)
+DATASET_STORE_DIR = os.path.join(BASE_DIR, "data", ".store")
+
 # ── Model Paths ──────────────────────────────────────────────
 LINEAR_MODEL_PATH   = os.path.join(BASE_DIR, "models", "linear.pkl")
 DT_MODEL_PATH       = os.path.join(BASE_DIR, "models", "decision_tree.pkl")
 KNN_MODEL_PATH      = os.path.join(BASE_DIR, "models", "knn.pkl")
 KMEANS_MODEL_PATH   = os.path.join(BASE_DIR, "models", "kmeans.pkl")
 
+# ── KNN Neighbour Index ──────────────────────────────────────
+# Search backend for the KNN performance model (utils/neighbors.py):
+#   "sklearn"   → pickled KNeighborsClassifier.predict()
+#   "brute"     → float32 BLAS scan        "kd_tree" / "ball_tree" → exact trees
+#   "ivf"       → approximate inverted-file index (KNN_IVF_LISTS buckets,
+#                 KNN_IVF_PROBE probed per query; None = sqrt(n) / lists÷16)
+# train_models.py persists the index next to knn.pkl.
+KNN_BACKEND    = "kd_tree"
+KNN_INDEX_PATH = os.path.join(BASE_DIR, "models", "knn_index.pkl")
+KNN_IVF_LISTS  = None
+KNN_IVF_PROBE  = None
+
 # ── Encoder / Scaler Paths (saved by Dev 1's preprocessing.py) ──
 SCALER_PATH                 = os.path.join(BASE_DIR, "models", "scaler.pkl")
 PARTICIPATION_ENCODER_PATH  = os.path.join(BASE_DIR, "models", "participation_encoder.pkl")
@@ -30,6 +45,52 @@ EXTRA_ENCODER_PATH          = os.path.join(BASE_DIR, "models", "extra_encoder.pk
 PASS_ENCODER_PATH           = os.path.join(BASE_DIR, "models", "pass_encoder.pkl")
 PERFORMANCE_ENCODER_PATH    = os.path.join(BASE_DIR, "models", "performance_encoder.pkl")
 
+# Use the compiled evaluators in utils/compiled_models.py (plain NumPy
+# exports of the linear, decision-tree and K-Means models) instead of
+# sklearn's predict(). On by default: output is identical on every saved
+# model (tests/test_compiled_models.py) and single-row model calls are
+# ~30x faster (benchmarks/bench_compiled_models.py). False = sklearn everywhere.
+COMPILED_INFERENCE = True
+
+# How long (seconds) utils/artifact_cache trusts an in-memory artifact before
+# re-checking its file on disk. 0 = stat the file on every access.
+ARTIFACT_RECHECK_SECONDS    = 2.0
+
+# How model_loader reads the pickles: "eager" (one after another),
+# "parallel" (MODEL_LOAD_WORKERS threads) or "lazy" (each on first use —
+# fastest process start, the first request pays for the loading).
+# benchmarks/bench_startup.py compares them.
+MODEL_LOAD_MODE    = "eager"
+MODEL_LOAD_WORKERS = 4
+
+# joblib mmap_mode for the model pickles: "r" maps their NumPy arrays (e.g.
+# the KNN training matrix) read-only from disk, so every worker shares the
+# same page-cache pages. None = load private copies.
+MODEL_MMAP_MODE = "r"
+
+# ── Gunicorn / Worker Memory ──────────────────────────────────
+# gunicorn.conf.py: with GUNICORN_PRELOAD the master imports app.py (models,
+# KNN index, compiled evaluators, dataset store) ONCE and forks the workers,
+# which then share those pages copy-on-write. Environment overrides:
+# $GUNICORN_PRELOAD, $WEB_CONCURRENCY, $GUNICORN_THREADS.
+# benchmarks/bench_worker_memory.py measures the effect.
+GUNICORN_PRELOAD = True
+GUNICORN_WORKERS = 2
+GUNICORN_THREADS = 1
+PRELOAD_DATASET  = True     # also build/open data/.store and the scaled matrix before forking
+
+# ── Model Hot Reload ──────────────────────────────────────────
+# utils/model_registry.py polls the model files every MODEL_WATCH_INTERVAL
+# seconds and swaps in a new set (after a smoke prediction on
+# MODEL_SMOKE_ROWS dataset rows) without restarting the workers.
+# POST /admin/models/reload triggers it on demand; it needs the
+# X-Admin-Token header to equal ADMIN_TOKEN (admin routes are off when unset).
+MODEL_WATCH_ENABLED       = True
+MODEL_WATCH_INTERVAL      = 5.0
+MODEL_SMOKE_ROWS          = 32
+MODEL_RELOAD_TRIGGER_PATH = os.path.join(BASE_DIR, "models", ".reload")
+ADMIN_TOKEN               = os.environ.get("ACKVISION_ADMIN_TOKEN")
+
 # ── Feature Column Order ─────────────────────────────────────
 # MUST match the exact column order used by Dev 1 during training.
 # These are the ACTUAL CSV column headers from student_synthetic_data.csv.
@@ -45,6 +106,15 @@ FEATURE_COLUMNS = [
     "Extra Curricular",         # Yes / No (encoded)
 ]
 
+# ── Request Input Keys ───────────────────────────────────────
+# Form / JSON keys read by preprocessing.get_feature_array(), in the same
+# order as FEATURE_COLUMNS. /predict and /upload validate against these.
+INPUT_KEYS = [
+    "attendance", "study_hours", "assignment_score",
+    "previous_gpa", "participation_level", "internet_usage",
+    "sleep_hours", "family_support", "extra_curricular",
+]
+
 # ── Target Label Mappings ────────────────────────────────────
 # Used by prediction_service and clustering_service
 #   to decode model outputs back to human-readable labels.
@@ -69,7 +139,124 @@ RISK_LABELS = {
     2: "High Risk",
 }
 
+# ── Training Settings (train_models.py) ────────────────────────
+# Hyperparameters per model registry key — changing one retrains only
+# that model; unchanged stages are reused from TRAIN_CACHE_DIR, a
+# content-addressed cache (entries unused for TRAIN_CACHE_MAX_AGE_DAYS
+# are pruned). TRAIN_WORKERS = None → one process per CPU.
+MODEL_PARAMS = {
+    "linear": {},
+    "dt":     {"max_depth": 6, "random_state": 42},
+    "knn":    {"n_neighbors": 7},
+    "kmeans": {"n_clusters": 3, "random_state": 42, "n_init": 10},
+}
+TRAIN_TEST_SIZE          = 0.2
+TRAIN_RANDOM_STATE       = 42
+TRAIN_WORKERS            = None
+TRAIN_CACHE_DIR          = os.path.join(BASE_DIR, "models", ".cache")
+TRAIN_CACHE_MAX_AGE_DAYS = 30
+TRAIN_MANIFEST_PATH      = os.path.join(BASE_DIR, "models", "manifest.json")
+
+# "memory" → whole dataset in one DataFrame; "stream" → out-of-core passes
+# over TRAIN_CHUNK_ROWS-row chunks (train_models.py --stream). Streaming
+# fits the scaler with partial_fit, the regression via accumulated normal
+# equations, KMeans as MiniBatchKMeans, and the tree + KNN on a reservoir
+# sample of at most TRAIN_STREAM_SAMPLE_ROWS training rows.
+TRAIN_MODE                 = "memory"
+TRAIN_CHUNK_ROWS           = 50_000
+TRAIN_STREAM_SAMPLE_ROWS   = 200_000
+TRAIN_STREAM_KMEANS_EPOCHS = 5
+TRAIN_STREAM_KMEANS_BATCH  = 1024
+
+# python train_models.py tune — cross-validated search over these values
+# (grid, or TUNE_N_ITER random draws with --search random) on the training
+# split, TUNE_WORKERS processes (None → one per CPU). Every trial reports
+# fit time and serving latency next to its score; results are cached per
+# (model, params, fold) and written to TUNE_REPORT_PATH.
+# n_clusters stays 3: RISK_LABELS has exactly three tiers.
+TUNE_GRID = {
+    "dt":     {"max_depth": [3, 4, 6, 8, 12, None], "min_samples_leaf": [1, 5, 20], "random_state": [42]},
+    "knn":    {"n_neighbors": [3, 5, 7, 9, 11, 15, 21, 31]},
+    "kmeans": {"n_clusters": [3], "n_init": [1, 3, 10], "max_iter": [50, 300], "random_state": [42]},
+}
+TUNE_FOLDS           = 5
+TUNE_N_ITER          = 20
+TUNE_WORKERS         = None
+TUNE_LATENCY_REPEATS = 200
+TUNE_REPORT_PATH     = os.path.join(BASE_DIR, "models", "tuning.json")
+
+# ── Metrics Settings ──────────────────────────────────────────
+# /api/metrics results are cached until the dataset or a model changes.
+# True = compute them in a background thread at startup instead of on
+# the first request.
+METRICS_WARM_ON_STARTUP = False
+
+# K-Means silhouette score (see utils/silhouette.py):
+#   "exact" | "sampled" | "centroid" | "auto" (exact up to SILHOUETTE_EXACT_MAX_ROWS)
+SILHOUETTE_MODE           = "auto"
+SILHOUETTE_EXACT_MAX_ROWS = 10_000
+SILHOUETTE_SAMPLE_SIZE    = 5_000
+SILHOUETTE_SEED           = 42
+
+# ── Request Coalescing ────────────────────────────────────────
+# Opt-in micro-batching of concurrent /predict requests (utils/coalescer.py):
+# single records are held for up to COALESCE_MAX_WAIT_MS or until
+# COALESCE_MAX_BATCH have arrived, then scored with one vectorized call.
+# Only useful with threaded workers (gunicorn --threads N).
+COALESCE_ENABLED     = False
+COALESCE_MAX_BATCH   = 64
+COALESCE_MAX_WAIT_MS = 2.0
+
+# ── Prediction Cache ──────────────────────────────────────────
+# LRU/TTL cache of /predict and /upload results keyed on the scaled
+# feature row (utils/prediction_cache.py). Dropped whenever the models
+# are reloaded. Bounded by whichever limit is reached first.
+PREDICTION_CACHE_ENABLED     = True
+PREDICTION_CACHE_MAX_ENTRIES = 100_000
+PREDICTION_CACHE_MAX_MB      = 64
+PREDICTION_CACHE_TTL_SECONDS = 3600     # None = entries never expire
+
+# ── Visualization Settings ────────────────────────────────────
+# /api/visualize downsamples the cluster scatter to at most VIZ_MAX_POINTS
+# points (override per request with ?max_points=, capped at
+# VIZ_MAX_POINTS_LIMIT). Modes: "stratified" | "grid" | "lttb" | "full"
+VIZ_MAX_POINTS        = 5000
+VIZ_MAX_POINTS_LIMIT  = 50_000
+VIZ_DOWNSAMPLE_MODE   = "stratified"
+
 # ── Upload Settings ───────────────────────────────────────────
 UPLOAD_FOLDER    = os.path.join(BASE_DIR, "data", "uploads")
 ALLOWED_EXTENSIONS = {"csv"}
-MAX_CONTENT_LENGTH = 5 * 1024 * 1024   # 5 MB upload limit
+MAX_CONTENT_LENGTH = 512 * 1024 * 1024 # 512 MB hard limit (streaming mode)
+
+# Buffered /upload builds the whole JSON response in memory, so it keeps
+# the old 5 MB cap. Larger rosters must use streaming mode (/upload?stream=1),
+# which reads the CSV in UPLOAD_CHUNK_ROWS-row chunks and returns NDJSON.
+BUFFERED_UPLOAD_MAX_BYTES = 5 * 1024 * 1024
+UPLOAD_CHUNK_ROWS         = 5000
+
+# ── Background Scoring Jobs (/upload?async=1) ─────────────────
+# /upload?async=1 stores the CSV under JOBS_DIR and returns a job id at
+# once; GET /jobs/<id> reports progress, GET /jobs/<id>/result serves the
+# NDJSON result. The gunicorn worker that took the upload feeds
+# JOBS_CHUNK_ROWS-row chunks to the scoring process pool (below).
+# Finished / failed jobs are deleted after JOBS_TTL_HOURS.
+JOBS_DIR        = os.path.join(BASE_DIR, "data", ".jobs")
+JOBS_CHUNK_ROWS = 5000
+JOBS_TTL_HOURS  = 24
+
+# ── Scoring Process Pool ──────────────────────────────────────
+# Persistent pool of SCORING_POOL_WORKERS processes (None → one per CPU)
+# holding the loaded models, used by background jobs and — when
+# PARALLEL_SCORING is on — by every batch of at least PARALLEL_MIN_ROWS
+# rows, split into shards of about PARALLEL_SHARD_ROWS rows.
+# Each gunicorn worker owns its own pool: size the two together.
+# Pool processes are started with SCORING_POOL_START_METHOD ("spawn" or
+# "forkserver") and load the models from disk; never "fork" — the parent
+# runs watcher / coalescer / job threads whose locks a forked child could
+# inherit held.
+SCORING_POOL_WORKERS      = None
+SCORING_POOL_START_METHOD = "spawn"
+PARALLEL_SCORING     = False
+PARALLEL_MIN_ROWS    = 20_000
+PARALLEL_SHARD_ROWS  = 50_000
@@ -0,0 +1,47 @@
+# ============================================================
+#  gunicorn.conf.py — AckVision Gunicorn Settings
+#  Picked up automatically by `gunicorn app:app` (see Procfile).
+#
+#  Preload mode (config.GUNICORN_PRELOAD): the master imports
+#  app.py ONCE — models (joblib mmap), KNN index, compiled
+#  evaluators and the memory-mapped dataset store — then forks
+#  the workers, which share those pages copy-on-write instead
+#  of each loading its own copy.
+# ============================================================
+
+import gc
+import os
+
+# Not `import config`: gunicorn would read that name as its own -c setting
+import config as app_config
+
+workers     = int(os.environ.get("WEB_CONCURRENCY", app_config.GUNICORN_WORKERS))
+threads     = int(os.environ.get("GUNICORN_THREADS", app_config.GUNICORN_THREADS))
+preload_app = os.environ.get("GUNICORN_PRELOAD", str(app_config.GUNICORN_PRELOAD)).lower() in ("1", "true", "yes")
+
+if preload_app:
+    # app.py skips its background threads; post_fork starts them per worker
+    os.environ["ACKVISION_PRELOAD"] = "1"
+
+
+def when_ready(server):
+    """Master, after the app is loaded and before the first fork."""
+    if not preload_app:
+        return
+    if app_config.PRELOAD_DATASET:
+        from utils import dataset_store
+        dataset_store.load_columns()
+        dataset_store.get_feature_matrix(scaled=True)
+
+    # Move everything allocated so far out of the GC's reach: collections in
+    # the workers would otherwise write to these objects' headers and un-share
+    # their pages.
+    gc.collect()
+    gc.freeze()
+    server.log.info("[gunicorn] ✓ App preloaded, %d objects frozen for copy-on-write", gc.get_freeze_count())
+
+
+def post_fork(server, worker):
+    if preload_app:
+        import app
+        app.start_background_tasks()
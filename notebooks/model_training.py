@@ -2,11 +2,6 @@ import os
 import joblib
 import numpy as np
 
-from sklearn.linear_model import LinearRegression
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.neighbors import KNeighborsClassifier
-from sklearn.cluster import KMeans
-
 from sklearn.metrics import (
     r2_score,
     mean_absolute_error,
@@ -21,6 +16,7 @@ import sys
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from utils.preprocessing import preprocess_and_split
+from utils.training import build_estimator     # hyperparameters from config.MODEL_PARAMS
 
 os.makedirs("models", exist_ok=True)
 
@@ -29,7 +25,7 @@ X_train, X_test, y_score_train, y_score_test, y_pass_train, y_pass_test, y_perf_
 # =======================
 # 1️⃣ Linear Regression
 # =======================
-linear_model = LinearRegression()
+linear_model = build_estimator("linear")
 linear_model.fit(X_train, y_score_train)
 
 y_pred_score = linear_model.predict(X_test)
@@ -44,7 +40,7 @@ joblib.dump(linear_model, "models/linear.pkl")
 # =======================
 # 2️⃣ Decision Tree
 # =======================
-dt_model = DecisionTreeClassifier(random_state=42)
+dt_model = build_estimator("dt")
 dt_model.fit(X_train, y_pass_train)
 
 y_pred_pass = dt_model.predict(X_test)
@@ -59,7 +55,7 @@ joblib.dump(dt_model, "models/decision_tree.pkl")
 # =======================
 # 3️⃣ KNN
 # =======================
-knn_model = KNeighborsClassifier(n_neighbors=5)
+knn_model = build_estimator("knn")
 knn_model.fit(X_train, y_perf_train)
 
 y_pred_perf = knn_model.predict(X_test)
@@ -73,7 +69,7 @@ joblib.dump(knn_model, "models/knn.pkl")
 # =======================
 # 4️⃣ KMeans
 # =======================
-kmeans_model = KMeans(n_clusters=3, random_state=42)
+kmeans_model = build_estimator("kmeans")
 kmeans_model.fit(X_train)
 
 print("KMeans Silhouette Score:", silhouette_score(X_train, kmeans_model.labels_))
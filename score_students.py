@@ -0,0 +1,247 @@
+"""
+score_students.py  —  AckVision Offline Bulk Scorer
+Run from the project root:
+    python score_students.py INPUT [INPUT ...] -o OUTPUT [--format csv|parquet|ndjson]
+                             [--workers N] [--chunk-size ROWS]
+
+Scores student CSV files without going through HTTP or the /upload size cap.
+INPUT is a CSV file or a directory (every *.csv in it, sorted). Rows are read
+in --chunk-size chunks and written as they are scored, so memory stays
+bounded whatever the file size. Same predictions and advice as /upload
+(utils/batch_service.py → compiled models, KNN index, advisory rules).
+
+OUTPUT:
+  a file    → every input, in order, in one file ("-" = stdout, csv / ndjson)
+  a dir/    → one <input name>.scored.<ext> per input
+--format defaults to the output extension, else csv. CSV and Parquet hold
+the advisory list as a JSON string / list column; NDJSON rows are exactly
+/upload?stream=1's.
+
+--workers N > 1 scores chunks in N processes of utils/scoring_pool.py
+(default: config.SCORING_POOL_WORKERS, None → one per CPU).
+Throughput and per-stage timings are printed to stderr at the end.
+"""
+import argparse, glob, json, os, sys, time
+from collections import deque
+from contextlib import redirect_stdout
+
+import config
+from utils import model_loader, model_registry, batch_service, scoring_pool
+
+FORMATS = ("csv", "parquet", "ndjson")
+STDOUT  = sys.stdout                 # "-o -" target, even while logs are redirected
+
+
+def list_inputs(paths: list) -> list:
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.csv"))))
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            raise SystemExit(f"score_students: no such file or directory: {path}")
+    if not files:
+        raise SystemExit("score_students: no CSV files to score")
+    return files
+
+
+class Writer:
+    """Appends scored chunks to one output file in csv, parquet or ndjson."""
+
+    def __init__(self, path: str, fmt: str):
+        self.path, self.fmt = path, fmt
+        self.rows, self._fh, self._parquet, self._columns = 0, None, None, None
+        if fmt == "parquet":
+            if path == "-":
+                raise SystemExit("score_students: parquet cannot be written to stdout")
+            try:
+                import pyarrow, pyarrow.parquet        # noqa: F401  (optional dependency)
+            except ImportError:
+                raise SystemExit("score_students: parquet output needs pyarrow (pip install pyarrow)")
+        elif path == "-":
+            self._fh = STDOUT
+        else:
+            self._fh = open(path, "w", newline="")
+
+    def write(self, frame, advice):
+        """
+        Writes a scored chunk; advice (advisory.AdvisoryCodes) is rendered to text here.
+        Every chunk is written in the first chunk's column order (one CSV header,
+        one Parquet schema); raises ValueError if its columns are not the same set.
+        """
+        frame = frame.assign(advisory=advice.render())
+        if self._columns is None:
+            self._columns = list(frame.columns)
+        elif list(frame.columns) != self._columns:
+            if set(frame.columns) != set(self._columns):
+                extra   = sorted(set(frame.columns) - set(self._columns))
+                missing = sorted(set(self._columns) - set(frame.columns))
+                raise ValueError(
+                    f"columns differ from the first input written to {self.path} "
+                    f"(extra: {extra}, missing: {missing}) — write them to separate outputs (-o dir/)"
+                )
+            frame = frame[self._columns]
+        if self.fmt == "ndjson":
+            # Same encoding as Flask's JSON provider (sorted keys) used by /upload?stream=1
+            self._fh.write("".join(
+                json.dumps(r, sort_keys=True, default=str) + "\n" for r in frame.to_dict("records")
+            ))
+        elif self.fmt == "csv":
+            out = frame.assign(advisory=[json.dumps(tips, ensure_ascii=False) for tips in frame["advisory"]])
+            out.to_csv(self._fh, header=self.rows == 0, index=False)
+        else:
+            import pyarrow as pa, pyarrow.parquet as pq
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)    # one row group per chunk
+        self.rows += len(frame)
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+        if self._fh is not None and self._fh is not STDOUT:
+            self._fh.close()
+
+
+def read_chunks(path: str, chunk_size: int, timings: dict):
+    """iter_csv_chunks with the parse time added to timings["read"]."""
+    chunks = batch_service.iter_csv_chunks(path, chunk_size)
+    while True:
+        t0 = time.perf_counter()
+        frame = next(chunks, None)
+        timings["read"] = timings.get("read", 0.0) + time.perf_counter() - t0
+        if frame is None:
+            return
+        yield frame
+
+
+def score_inline(frame, timings: dict) -> tuple:
+    """Same result as scoring_pool.score_chunk, in this process."""
+    columns = batch_service.score_columns(frame, timings)
+    advice  = columns.pop("advisory")
+    return frame.assign(**columns), advice
+
+
+def run(inputs: list, output: str, fmt: str = None, workers: int = None, chunk_size: int = None) -> dict:
+    files      = list_inputs(inputs)
+    per_file   = output.endswith(os.sep) or os.path.isdir(output)
+    fmt        = fmt or os.path.splitext(output.rstrip(os.sep))[1].lstrip(".").lower()
+    fmt        = fmt if fmt in FORMATS else "csv"
+    workers    = workers or scoring_pool.n_workers()
+    chunk_size = chunk_size or config.UPLOAD_CHUNK_ROWS
+    if per_file:
+        os.makedirs(output, exist_ok=True)
+
+    t_start = time.perf_counter()
+    model_loader.load_all()
+    model_registry.warm(model_loader.current())
+    timings = {"load_models": time.perf_counter() - t_start}
+    models  = model_loader.current()
+
+    started, rows = time.perf_counter(), 0
+    writer = None if per_file else Writer(output, fmt)
+    with scoring_pool.acquire(models, workers) if workers > 1 else _no_pool() as pool:
+        for path in files:
+            if per_file:
+                stem   = os.path.splitext(os.path.basename(path))[0]
+                writer = Writer(os.path.join(output, f"{stem}.scored.{fmt}"), fmt)
+            try:
+                rows += _score_file(path, writer, pool, workers, chunk_size, timings)
+            except ValueError as e:
+                raise ValueError(f"{path}: {e}") from None
+            finally:
+                if per_file:
+                    writer.close()
+            print(f"[score_students] ✓ {path}", file=sys.stderr)
+    if writer is not None and not per_file:
+        writer.close()
+
+    wall = time.perf_counter() - started
+    report = {
+        "files": len(files), "rows": rows, "seconds": wall,
+        "rows_per_second": rows / wall if wall > 0 else 0.0,
+        "workers": workers, "chunk_size": chunk_size, "model_version": models.version,
+        "stages": timings,
+    }
+    print_report(report)
+    return report
+
+
+class _no_pool:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+
+def _score_file(path, writer, pool, workers, chunk_size, timings) -> int:
+    """Scores one CSV into writer; chunks go through the pool when there is one."""
+    rows = 0
+
+    def write(frame, advice):
+        nonlocal rows
+        t0 = time.perf_counter()
+        writer.write(frame, advice)
+        timings["write"] = timings.get("write", 0.0) + time.perf_counter() - t0
+        rows += len(frame)
+
+    if pool is None:
+        for frame in read_chunks(path, chunk_size, timings):
+            write(*score_inline(frame, timings))
+        return rows
+
+    def collect():
+        future, frame = in_flight.popleft()
+        # A stale pool process (model files retrained meanwhile) refuses the chunk → inline
+        scored, advice, worker_timings = scoring_pool.result(future, lambda: (*score_inline(frame, timings), {}))
+        _merge(timings, worker_timings)
+        write(scored, advice)
+
+    in_flight = deque()                      # submission order = output order
+    for frame in read_chunks(path, chunk_size, timings):
+        if len(in_flight) >= 2 * workers:
+            collect()
+        in_flight.append((pool.submit(scoring_pool.score_chunk, frame), frame))
+    while in_flight:
+        collect()
+    return rows
+
+
+def _merge(timings: dict, extra: dict):
+    for stage, seconds in extra.items():
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+def print_report(r: dict):
+    err = sys.stderr
+    print("=" * 60, file=err)
+    print(f" Scored {r['rows']:,} rows from {r['files']} file(s) in {r['seconds']:.2f}s"
+          f"  →  {r['rows_per_second']:,.0f} rows/s", file=err)
+    print(f" workers={r['workers']}  chunk_size={r['chunk_size']:,}  model_version={r['model_version']}", file=err)
+    note = "  (summed over workers)" if r["workers"] > 1 else ""
+    print(f" Stage timings{note}:", file=err)
+    total = sum(v for k, v in r["stages"].items() if k != "load_models") or 1.0
+    for stage in ("load_models", "read", "featurize", "predict", "advisory", "write"):
+        if stage in r["stages"]:
+            share = "" if stage == "load_models" else f"  {r['stages'][stage] / total:6.1%}"
+            print(f"   {stage:<12} {r['stages'][stage]:>8.2f}s{share}", file=err)
+    print("=" * 60, file=err)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score student CSV files offline.")
+    parser.add_argument("inputs", nargs="+", help="CSV files and/or directories of CSV files")
+    parser.add_argument("-o", "--output", required=True, help="output file, '-' for stdout, or a directory/")
+    parser.add_argument("--format", choices=FORMATS, default=None, help="default: from the output extension, else csv")
+    parser.add_argument("--workers", type=int, default=None, help="scoring processes (default: config.SCORING_POOL_WORKERS)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="rows per chunk (default: config.UPLOAD_CHUNK_ROWS)")
+    args = parser.parse_args()
+    # Library logs go to stderr so "-o -" output stays clean
+    with redirect_stdout(sys.stderr if args.output == "-" else sys.stdout):
+        try:
+            run(args.inputs, args.output, args.format, args.workers, args.chunk_size)
+        except ValueError as e:             # missing columns (iter_csv_chunks) / mismatched inputs (Writer)
+            raise SystemExit(f"score_students: {e}")
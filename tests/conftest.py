@@ -0,0 +1,9 @@
+# ============================================================
+#  tests/conftest.py — AckVision test setup
+#  Run from the project root: python -m pytest -q
+# ============================================================
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -0,0 +1,65 @@
+# ============================================================
+#  tests/test_compiled_models.py — compiled evaluators and KNN
+#  index backends must predict exactly what the saved sklearn
+#  models predict, on every row of the dataset.
+# ============================================================
+
+import warnings
+
+import numpy as np
+import pytest
+
+import config
+from utils import model_loader, dataset_store, compiled_models, neighbors, batch_service
+
+
+@pytest.fixture(scope="module")
+def models():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")         # pickles may come from a newer sklearn
+        model_loader.load_all()
+    return model_loader.current()
+
+
+@pytest.fixture(scope="module")
+def X(models):
+    return np.asarray(dataset_store.get_feature_matrix(scaled=True), dtype=np.float64)
+
+
+@pytest.mark.parametrize("name", ["linear", "dt", "kmeans"])
+def test_compiled_matches_sklearn(models, X, name):
+    reference = models.models[name].predict(X)
+    with model_loader.pinned(models):
+        compiled = compiled_models.get(name)
+    np.testing.assert_array_equal(compiled.predict(X), reference)
+
+
+@pytest.mark.parametrize("name", ["linear", "dt", "kmeans"])
+def test_compiled_single_row_matches_sklearn(models, X, name):
+    with model_loader.pinned(models):
+        compiled = compiled_models.get(name)
+    for row in X[:200]:
+        row = row[None, :]
+        np.testing.assert_array_equal(compiled.predict(row), models.models[name].predict(row))
+
+
+@pytest.mark.parametrize("backend", ["brute", "kd_tree", "ball_tree"])
+def test_exact_knn_backends_match_sklearn(models, X, backend):
+    knn = models.models["knn"]
+    np.testing.assert_array_equal(neighbors.index_from_knn(knn, backend).predict(X), knn.predict(X))
+
+
+def test_ivf_probing_every_list_is_exact(models, X):
+    knn   = models.models["knn"]
+    index = neighbors.IVFIndex(knn.n_neighbors, knn.classes_, n_lists=16, n_probe=16).fit(knn._fit_X, knn._y)
+    np.testing.assert_array_equal(index.predict(X), knn.predict(X))
+
+
+def test_batch_scoring_same_with_and_without_compiled(models, X, monkeypatch):
+    monkeypatch.setattr(config, "KNN_BACKEND", "sklearn")
+    with model_loader.pinned(models):
+        monkeypatch.setattr(config, "COMPILED_INFERENCE", False)
+        reference = batch_service.predict_matrix(X)
+        monkeypatch.setattr(config, "COMPILED_INFERENCE", True)
+        compiled = batch_service.predict_matrix(X)
+    assert compiled == reference
@@ -0,0 +1,40 @@
+# ============================================================
+#  tests/test_featurizer.py — the compiled featurizer must
+#  produce exactly the bits of the pandas + sklearn reference
+#  path (preprocessing.get_feature_array_reference).
+# ============================================================
+
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import config
+from utils import model_loader
+from utils.featurizer import get_featurizer
+from utils.preprocessing import get_feature_array_reference
+
+
+@pytest.fixture(scope="module")
+def records():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")         # pickles may come from a newer sklearn
+        model_loader.load_all()
+    columns = dict(zip(config.FEATURE_COLUMNS, config.INPUT_KEYS))
+    return pd.read_csv(config.DATA_PATH).rename(columns=columns)[config.INPUT_KEYS].to_dict("records")
+
+
+def test_featurizer_matches_reference_bit_for_bit(records):
+    fz = get_featurizer()
+    for rec in records:
+        ref, fast = get_feature_array_reference(rec), fz.transform(rec)
+        assert (fast.dtype, fast.shape) == (ref.dtype, ref.shape)
+        assert fast.tobytes() == ref.tobytes(), rec
+
+
+def test_featurizer_preallocated_out(records):
+    fz  = get_featurizer()
+    out = np.empty((1, fz.n_features))
+    for rec in records[:200]:
+        np.testing.assert_array_equal(fz.transform(rec, out=out), get_feature_array_reference(rec))
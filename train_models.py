@@ -1,126 +1,230 @@
 """
 train_models.py  —  AckVision Model Training Script
-Run from the project root: python train_models.py
+Run from the project root: python train_models.py [--force] [--workers N] [--stream [--baseline]]
+                           python train_models.py tune [--search grid|random] [--models dt knn ...]
 Trains all 4 models and saves encoders/scaler to models/
+
+Pipeline (stages in utils/training.py):
+  1. prepare  → encode + scale the dataset ONCE, shared by every model
+  2. fit      → LinearRegression, DecisionTree, KNN and KMeans fitted in
+                parallel worker processes; a model whose data and
+                hyperparameters (config.MODEL_PARAMS) are unchanged is
+                taken from the content-addressed cache instead
+  3. publish  → copy into models/ (only files whose bytes changed)
+A manifest with per-stage status and timings is written to
+config.TRAIN_MANIFEST_PATH.
+
+--stream (or config.TRAIN_MODE = "stream") replaces stages 1–2 with
+training.stream_fit(): chunked passes over the CSV in bounded memory.
+--baseline additionally fits in memory on the same train/test rows (the
+streaming hash split) and prints both sets of metrics.
+
+`tune` runs the cross-validated search of utils/tuning.py over
+config.TUNE_GRID and prints score, fit time and serving latency per
+candidate; "*" marks the latency/quality frontier. It changes nothing
+in models/ — copy the chosen values into config.MODEL_PARAMS.
 """
-import os, sys
-import pandas as pd
-import numpy as np
-import joblib
-
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.neighbors import KNeighborsClassifier
-from sklearn.cluster import KMeans
-from sklearn.metrics import (
-    mean_absolute_error, r2_score,
-    accuracy_score, classification_report
-)
-
-BASE_DIR   = os.path.dirname(os.path.abspath(__file__))
-DATA_PATH  = os.path.join(BASE_DIR, "data", "student_synthetic_data.csv")
-MODELS_DIR = os.path.join(BASE_DIR, "models")
-os.makedirs(MODELS_DIR, exist_ok=True)
-
-print("=" * 60)
-print(" AckVision — Model Training")
-print("=" * 60)
-
-# ── Load & inspect ────────────────────────────────────────────────
-df = pd.read_csv(DATA_PATH)
-print(f"\nLoaded {len(df)} rows from {DATA_PATH}")
-print(f"Pass/Fail:\n{df['Pass/Fail'].value_counts()}")
-print(f"Performance:\n{df['Performance Category'].value_counts()}")
-
-# ── Encode categorical features ───────────────────────────────────
-part_enc  = LabelEncoder()
-extra_enc = LabelEncoder()
-pass_enc  = LabelEncoder()
-perf_enc  = LabelEncoder()
-
-df["Participation Level"] = part_enc.fit_transform(df["Participation Level"])
-df["Extra Curricular"]    = extra_enc.fit_transform(df["Extra Curricular"])
-df["Pass/Fail"]           = pass_enc.fit_transform(df["Pass/Fail"])
-df["Performance Category"]= perf_enc.fit_transform(df["Performance Category"])
-
-print(f"\nPass/Fail encoder classes: {list(pass_enc.classes_)}")
-print(f"  → class indices:         {list(range(len(pass_enc.classes_)))}")
-print(f"Performance encoder classes: {list(perf_enc.classes_)}")
-
-FEATURE_COLS = [
-    "Attendance (%)",
-    "Study Hours (per day)",
-    "Assignment Score",
-    "Previous GPA",
-    "Participation Level",
-    "Internet Usage (hrs/day)",
-    "Sleep Hours",
-    "Family Support Index",
-    "Extra Curricular",
-]
-
-X = df[FEATURE_COLS]
-y_score = df["Final Exam Score"]
-y_pass  = df["Pass/Fail"]
-y_perf  = df["Performance Category"]
-
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
-
-X_train, X_test, ys_tr, ys_te, yp_tr, yp_te, yq_tr, yq_te = train_test_split(
-    X_scaled, y_score, y_pass, y_perf, test_size=0.2, random_state=42
-)
-
-# ── 1. Linear Regression ──────────────────────────────────────────
-lr = LinearRegression()
-lr.fit(X_train, ys_tr)
-ys_pred = lr.predict(X_test)
-print(f"\nLinear Regression  MAE={mean_absolute_error(ys_te, ys_pred):.2f}  R²={r2_score(ys_te, ys_pred):.4f}")
-
-# ── 2. Decision Tree (Pass/Fail) ──────────────────────────────────
-dt = DecisionTreeClassifier(max_depth=6, random_state=42)
-dt.fit(X_train, yp_tr)
-yp_pred = dt.predict(X_test)
-print(f"Decision Tree      Acc={accuracy_score(yp_te, yp_pred):.4f}")
-print(classification_report(yp_te, yp_pred, target_names=pass_enc.classes_))
-
-# ── 3. KNN (Performance Category) ────────────────────────────────
-knn = KNeighborsClassifier(n_neighbors=7)
-knn.fit(X_train, yq_tr)
-yq_pred = knn.predict(X_test)
-print(f"KNN                Acc={accuracy_score(yq_te, yq_pred):.4f}")
-
-# ── 4. K-Means (Risk Clusters) ────────────────────────────────────
-km = KMeans(n_clusters=3, random_state=42, n_init=10)
-km.fit(X_scaled)
-# Map clusters by mean score (0=lowest→High Risk, 2=highest→Low Risk)
-cluster_means = {c: y_score[km.labels_ == c].mean() for c in range(3)}
-sorted_clusters = sorted(cluster_means, key=cluster_means.get)  # low→high score
-risk_map = {
-    sorted_clusters[0]: 2,   # lowest score  → High Risk (label 2)
-    sorted_clusters[1]: 1,   # middle score  → Medium Risk (label 1)
-    sorted_clusters[2]: 0,   # highest score → Low Risk (label 0)
-}
-print(f"\nK-Means cluster score means: {cluster_means}")
-print(f"Cluster→risk map: {risk_map}")
-
-# ── Save all artefacts ────────────────────────────────────────────
-joblib.dump(lr,        os.path.join(MODELS_DIR, "linear.pkl"))
-joblib.dump(dt,        os.path.join(MODELS_DIR, "decision_tree.pkl"))
-joblib.dump(knn,       os.path.join(MODELS_DIR, "knn.pkl"))
-joblib.dump(km,        os.path.join(MODELS_DIR, "kmeans.pkl"))
-joblib.dump(scaler,    os.path.join(MODELS_DIR, "scaler.pkl"))
-joblib.dump(part_enc,  os.path.join(MODELS_DIR, "participation_encoder.pkl"))
-joblib.dump(extra_enc, os.path.join(MODELS_DIR, "extra_encoder.pkl"))
-joblib.dump(pass_enc,  os.path.join(MODELS_DIR, "pass_encoder.pkl"))
-joblib.dump(perf_enc,  os.path.join(MODELS_DIR, "performance_encoder.pkl"))
-# Save risk map so app can use proper cluster→label mapping
-joblib.dump(risk_map,  os.path.join(MODELS_DIR, "risk_map.pkl"))
-
-print("\nAll models & encoders saved to models/")
-print("=" * 60)
-print(f"Pass encoder classes  : {list(pass_enc.classes_)}")
-print(f"  Fail → {pass_enc.transform(['Fail'])[0]}   Pass → {pass_enc.transform(['Pass'])[0]}")
-print(f"Performance classes   : {list(perf_enc.classes_)}")
+import argparse, json, os, time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import config
+from utils import training, artifact_cache
+
+MODEL_NAMES = ["linear", "dt", "knn", "kmeans"]
+
+
+def fit_in_memory(manifest: dict, force: bool = False, workers: int = None, split: str = "random") -> dict:
+    """Stages 1–2. Returns {"dir", "keys", "rows", "classes", "results", "status"}."""
+    t0   = time.perf_counter()
+    prep = training.prepare(config.DATA_PATH, force=force, split=split)
+    manifest["stages"]["prepare"] = {
+        "status": prep["status"], "key": prep["key"], "seconds": round(time.perf_counter() - t0, 3),
+    }
+
+    keys    = {name: training.model_key(name, prep["key"]) for name in MODEL_NAMES}
+    results = {}
+    todo    = []
+    for name in MODEL_NAMES:
+        hit = None if force else training.cached_model(name, keys[name])
+        if hit:
+            results[name] = hit
+        else:
+            todo.append(name)
+
+    t0 = time.perf_counter()
+    if todo:
+        n_workers = min(len(todo), workers or config.TRAIN_WORKERS or os.cpu_count() or 1)
+        if n_workers > 1:
+            with ProcessPoolExecutor(n_workers) as pool:
+                futures = {name: pool.submit(training.fit_model, name, prep["dir"], keys[name]) for name in todo}
+                for name, future in futures.items():
+                    results[name] = future.result()
+        else:
+            for name in todo:
+                results[name] = training.fit_model(name, prep["dir"], keys[name])
+    manifest["fit_wall_seconds"] = round(time.perf_counter() - t0, 3)
+    return {**prep, "keys": keys, "results": results}
+
+
+def fit_streaming(manifest: dict, force: bool = False) -> dict:
+    """Out-of-core stages 1–2 in one training.stream_fit() call; same return shape as fit_in_memory()."""
+    res = training.stream_fit(config.DATA_PATH, force=force)
+    manifest["stages"]["stream"] = {
+        "status": res["status"], "key": res["key"], "seconds": round(res["seconds"], 3),
+        "passes": res["passes"], "chunk_rows": config.TRAIN_CHUNK_ROWS,
+    }
+    results = {name: {"status": res["status"], "seconds": res["seconds"]} for name in MODEL_NAMES}
+    return {**res, "keys": {name: res["key"] for name in MODEL_NAMES}, "results": results}
+
+
+def print_metrics(m: dict):
+    print(f"\nLinear Regression  MAE={m['linear']['mae']:.2f}  R²={m['linear']['r2']:.4f}")
+    print(f"Decision Tree      Acc={m['dt']['accuracy']:.4f}")
+    print(m["dt"]["report"])
+    print(f"KNN                Acc={m['knn']['accuracy']:.4f}")
+    print(f"\nK-Means cluster score means: { {int(c): v for c, v in m['kmeans']['cluster_means'].items()} }")
+    print(f"Cluster→risk map: { {int(c): r for c, r in m['kmeans']['risk_map'].items()} }")
+
+
+def print_comparison(stream: dict, baseline: dict):
+    rows = [
+        ("Linear MAE",   stream["linear"]["mae"],   baseline["linear"]["mae"]),
+        ("Linear R²",    stream["linear"]["r2"],    baseline["linear"]["r2"]),
+        ("DT accuracy",  stream["dt"]["accuracy"],  baseline["dt"]["accuracy"]),
+        ("KNN accuracy", stream["knn"]["accuracy"], baseline["knn"]["accuracy"]),
+    ]
+    print(f"\n{'Stream vs in-memory':<20} {'stream':>9} {'memory':>9} {'delta':>9}")
+    for label, s, b in rows:
+        print(f"{label:<20} {s:>9.4f} {b:>9.4f} {s - b:>+9.4f}")
+    print("(both trained and evaluated on the same rows: the streaming hash split)")
+
+
+def run(force: bool = False, workers: int = None, stream: bool = None, baseline: bool = False) -> dict:
+    stream   = config.TRAIN_MODE == "stream" if stream is None else stream
+    started  = time.perf_counter()
+    manifest = {
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "mode":       "stream" if stream else "memory",
+        "stages":     {},
+    }
+
+    print("=" * 60)
+    print(" AckVision — Model Training" + ("  (streaming)" if stream else ""))
+    print("=" * 60)
+
+    fitted = fit_streaming(manifest, force) if stream else fit_in_memory(manifest, force, workers)
+    keys   = fitted["keys"]
+    pass_classes = fitted["classes"]["pass_encoder"]
+    perf_classes = fitted["classes"]["performance_encoder"]
+    print(f"\nLoaded {fitted['rows']} rows from {config.DATA_PATH}  [{manifest['mode']}: {fitted['status']}]")
+    print(f"Pass/Fail encoder classes: {pass_classes}")
+    print(f"Performance encoder classes: {perf_classes}")
+
+    for name in MODEL_NAMES:
+        manifest["stages"][f"fit:{name}"] = {
+            "status":  fitted["results"][name]["status"],
+            "key":     keys[name],
+            "params":  config.MODEL_PARAMS[name],
+            "seconds": round(fitted["results"][name]["seconds"], 3),
+            "metrics": training.model_metrics(name, keys[name]),
+        }
+
+    metrics = {name: manifest["stages"][f"fit:{name}"]["metrics"] for name in MODEL_NAMES}
+    print_metrics(metrics)
+    if stream:
+        print(f"  {manifest['stages']['stream']['passes']} passes over {config.TRAIN_CHUNK_ROWS}-row chunks"
+              f"  {fitted['status']}  {fitted['seconds']:.2f}s")
+    else:
+        for name in MODEL_NAMES:
+            print(f"  {name:<7} {fitted['results'][name]['status']:<7} {fitted['results'][name]['seconds']:.2f}s")
+    if stream and baseline:
+        # Same held-out rows as the streaming run, so the deltas are model differences only
+        memory = fit_in_memory({"stages": {}}, force, workers, split="hash")
+        manifest["baseline"] = {name: training.model_metrics(name, memory["keys"][name]) for name in MODEL_NAMES}
+        print_comparison(metrics, manifest["baseline"])
+
+    # ── 3. Publish into models/ ───────────────────────────────────────
+    t0 = time.perf_counter()
+    outputs = training.publish(fitted["dir"], keys)
+    manifest["stages"]["publish"] = {"seconds": round(time.perf_counter() - t0, 3), "files": {
+        os.path.relpath(path, config.BASE_DIR): status for path, status in outputs.items()
+    }}
+    manifest["model_sha256"] = {
+        os.path.relpath(path, config.BASE_DIR): artifact_cache.file_hash(path)[:16] for path in outputs
+    }
+    manifest["pruned_cache_entries"] = training.prune_cache()
+    manifest["total_seconds"] = round(time.perf_counter() - started, 3)
+
+    with open(config.TRAIN_MANIFEST_PATH, "w") as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+
+    written = sum(status == "written" for status in outputs.values())
+    print(f"\nAll models & encoders saved to models/  ({written} written, {len(outputs) - written} unchanged)")
+    print(f"Manifest → {config.TRAIN_MANIFEST_PATH}  ({manifest['total_seconds']:.2f}s total)")
+    print("=" * 60)
+    print(f"Pass encoder classes  : {pass_classes}")
+    print(f"  Fail → {pass_classes.index('Fail')}   Pass → {pass_classes.index('Pass')}")
+    print(f"Performance classes   : {perf_classes}")
+    return manifest
+
+
+def tune(names: list = None, search: str = "grid", n_iter: int = None,
+         workers: int = None, force: bool = False) -> dict:
+    from utils import tuning
+
+    names   = names or list(config.TUNE_GRID)
+    started = time.perf_counter()
+    print("=" * 60)
+    print(f" AckVision — Hyperparameter Search ({search}, {config.TUNE_FOLDS}-fold CV)")
+    print("=" * 60)
+
+    prep   = training.prepare(config.DATA_PATH)
+    report = tuning.search(prep, names, search, n_iter, workers, force)
+    print(f"\n{report['trials_run']} trials run, {report['trials_cached']} cached")
+
+    for name in names:
+        print(f"\n{name} — {tuning.SCORING[name]}  (* = latency/quality frontier, ← = config.MODEL_PARAMS)")
+        print(f"   {'params':<44} {'score':>7} {'±std':>6} {'fit ms':>7} {'µs/row':>7} {'1-row µs':>8}")
+        current = training.build_estimator(name).get_params()
+        for e in sorted(report["models"][name], key=lambda e: -e["score"]):
+            params = ", ".join(f"{k}={v}" for k, v in sorted(e["params"].items()) if k != "random_state")
+            is_current = all(current.get(k) == v for k, v in e["params"].items())
+            print(f" {'*' if e.get('frontier') else ' '} {params:<44} {e['score']:>7.4f} {e['score_std']:>6.4f} "
+                  f"{e['fit_ms']:>7.1f} {e['batch_us_row']:>7.2f} {e['single_us']:>8.1f}"
+                  f"{'  ←' if is_current else ''}")
+
+    report.update(
+        created_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        search=search, folds=config.TUNE_FOLDS, knn_backend=config.KNN_BACKEND,
+        total_seconds=round(time.perf_counter() - started, 3),
+    )
+    with open(config.TUNE_REPORT_PATH, "w") as fh:
+        json.dump(report, fh, indent=2, sort_keys=True, default=str)
+    print(f"\nReport → {config.TUNE_REPORT_PATH}  ({report['total_seconds']:.2f}s total)")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the AckVision models.")
+    parser.add_argument("--force", action="store_true", help="ignore the training cache and refit everything")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: config.TRAIN_WORKERS)")
+    parser.add_argument("--stream", action="store_true", default=None,
+                        help="out-of-core training in TRAIN_CHUNK_ROWS chunks (default: config.TRAIN_MODE)")
+    parser.add_argument("--baseline", action="store_true", help="with --stream: also fit in memory and compare metrics")
+    commands = parser.add_subparsers(dest="command")
+    tune_cmd = commands.add_parser("tune", help="cross-validated hyperparameter search (config.TUNE_GRID)")
+    tune_cmd.add_argument("--search", choices=["grid", "random"], default="grid")
+    tune_cmd.add_argument("--n-iter", type=int, default=None, help="random search draws (default: config.TUNE_N_ITER)")
+    tune_cmd.add_argument("--models", nargs="+", choices=sorted(config.TUNE_GRID), default=None)
+    # Also accepted before "tune": SUPPRESS keeps those values unless repeated here
+    tune_cmd.add_argument("--workers", type=int, default=argparse.SUPPRESS,
+                          help="worker processes (default: config.TUNE_WORKERS)")
+    tune_cmd.add_argument("--force", action="store_true", default=argparse.SUPPRESS, help="re-run cached trials")
+    args = parser.parse_args()
+    if args.command == "tune":
+        if args.stream or args.baseline:
+            parser.error("--stream / --baseline do not apply to tune")
+        tune(args.models, args.search, args.n_iter, args.workers, args.force)
+    else:
+        run(force=args.force, workers=args.workers, stream=args.stream, baseline=args.baseline)
@@ -2,9 +2,210 @@
 #  utils/advisory.py — AckVision Academic Advisory Engine
 #  Generates personalised, rule-based academic suggestions
 #  by combining all 4 model outputs.
-#  No ML dependency — pure Python logic.
+#  Rules are declared once below and compiled at import into a
+#  RuleTable (threshold arrays + lookup tables); batches are
+#  evaluated to integer message codes, rendered to text last.
+#  No ML dependency — plain Python / NumPy rules.
 # ============================================================
 
+import operator
+
+import numpy as np
+
+# ── Message texts (shared by get_advisory and get_advisory_batch) ──
+SCORE_TIPS = [   # ≥85, ≥70, ≥50, below 50
+    "🏆 Outstanding predicted score! Keep up your excellent work.",
+    "📈 Good predicted score. A little more effort could push you to excellence.",
+    "⚠️  Borderline score predicted. Focus on weak subjects immediately.",
+    "🚨 Critical: Very low score predicted. Seek academic support urgently.",
+]
+FAIL_TIP = "❌ You are at risk of failing. Prioritise exam preparation over all else."
+PASS_TIP = "✅ On track to pass. Maintain consistency to secure the result."
+
+PERF_TIPS = {
+    "Excellent": "🌟 Excellent performer! Consider mentoring peers or exploring advanced topics.",
+    "Good":      "👍 Good performance. Target Excellent by improving weaker subjects.",
+    "Average":   "📚 Average performance. Create a structured daily study plan.",
+    "Poor":      "🆘 Poor performance detected. Reduce distractions and seek teacher guidance.",
+}
+PERF_DEFAULT = "Keep working hard!"
+
+RISK_TIPS = {
+    "High Risk":   "🔴 High academic risk. Attend all classes and submit all assignments on time.",
+    "Medium Risk": "🟡 Moderate risk. Small improvements in attendance and study hours will help.",
+    "Low Risk":    "🟢 Low risk. Stay consistent and avoid last-minute studying.",
+}
+
+# (form key, default, comparison, threshold, message template) for feature-level tips
+FEATURE_RULES = [
+    ("attendance_percentage", 100, "<", 75,
+     "📅 Attendance is {:.0f}% — below the 75% minimum. Attend more classes."),
+    ("study_hours",             6, "<", 4,
+     "📖 Only {:.1f} study hours/day. Aim for at least 4–6 hours."),
+    ("sleep_hours",             7, "<", 6,
+     "😴 Sleeping only {:.1f} hours. Poor sleep reduces memory retention."),
+    ("internet_usage",          4, ">", 8,
+     "📱 {:.1f} hours of internet usage/day is high. Reduce screen time."),
+]
+
+_OPS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+
+# ── Compiled rule table ──────────────────────────────────────
+
+class _Lookup(dict):
+    """{label: code} that returns `default` for any other label (C-level __getitem__ for map())."""
+
+    def __init__(self, codes: dict, default: int):
+        super().__init__(codes)
+        self.default = default
+
+    def __missing__(self, label):
+        return self.default
+
+
+class RuleTable:
+    """
+    The rules above compiled once into arrays and lookup tables.
+
+    Every message (and feature template) gets a small integer code in
+    `messages`; code 0 is "no message". Advice for a row is one code per
+    slot — score, pass/fail, performance, risk, then one per feature rule —
+    so a batch is a (n_rows, n_slots) uint8 array, evaluated with NumPy
+    comparisons and turned into strings only by AdvisoryCodes.render().
+    """
+
+    def __init__(self):
+        self.messages = [""]
+        intern = self._intern
+
+        # Score bands: np.searchsorted over ascending thresholds → band → code
+        self.score_thresholds = np.array([50.0, 70.0, 85.0])
+        self.score_codes      = np.array([intern(t) for t in reversed(SCORE_TIPS)], dtype=np.uint8)
+
+        # Label slots: {label: code}, with a code for any other label
+        self.label_slots = [
+            _Lookup({"Fail": intern(FAIL_TIP)}, intern(PASS_TIP)),
+            _Lookup({k: intern(v) for k, v in PERF_TIPS.items()}, intern(PERF_DEFAULT)),
+            _Lookup({k: intern(v) for k, v in RISK_TIPS.items()}, 0),
+        ]
+
+        # Feature slots: parallel lists, one entry per FEATURE_RULES row
+        self.feature_keys       = [r[0] for r in FEATURE_RULES]
+        self.feature_defaults   = np.array([r[1] for r in FEATURE_RULES], dtype=np.float64)
+        self.feature_ops        = [_OPS[r[2]] for r in FEATURE_RULES]
+        self.feature_thresholds = np.array([r[3] for r in FEATURE_RULES], dtype=np.float64)
+        self.feature_codes      = np.array([intern(r[4]) for r in FEATURE_RULES], dtype=np.uint8)
+
+        self.n_slots = 1 + len(self.label_slots) + len(FEATURE_RULES)
+        self.text    = np.array(self.messages, dtype=object)   # code → text, for fancy indexing
+
+        # Plain-Python copies for evaluate_one: (threshold, code) highest band first
+        self._score_bands  = list(zip(self.score_thresholds.tolist()[::-1], self.score_codes.tolist()[::-1]))
+        self._feature_rows = list(zip(
+            self.feature_keys, self.feature_defaults.tolist(), self.feature_ops,
+            self.feature_thresholds.tolist(), [self.messages[c] for c in self.feature_codes.tolist()],
+        ))
+
+    def _intern(self, text: str) -> int:
+        if text not in self.messages:
+            self.messages.append(text)
+        return self.messages.index(text)
+
+    def evaluate(self, exam_scores, pass_fail, performance, risk_cluster, frame=None) -> "AdvisoryCodes":
+        """Column-wise evaluation of every rule for a batch."""
+        scores = np.asarray(exam_scores, dtype=np.float64)
+        n      = len(scores)
+        codes  = np.zeros((n, self.n_slots), dtype=np.uint8)
+        values = np.zeros((n, len(self.feature_keys)), dtype=np.float64)
+
+        band = np.searchsorted(self.score_thresholds, scores, side="right")
+        band[np.isnan(scores)] = 0                      # NaN passes no threshold
+        codes[:, 0] = self.score_codes[band]
+        for slot, (lookup, labels) in enumerate(zip(self.label_slots, (pass_fail, performance, risk_cluster)), start=1):
+            codes[:, slot] = np.fromiter(map(lookup.__getitem__, labels), np.uint8, n)
+
+        if frame is not None and n:
+            base = 1 + len(self.label_slots)
+            for j, key in enumerate(self.feature_keys):
+                if key in frame.columns:
+                    values[:, j] = frame[key].to_numpy(dtype=np.float64)
+                else:
+                    values[:, j] = self.feature_defaults[j]
+                hit = self.feature_ops[j](values[:, j], self.feature_thresholds[j])
+                codes[hit, base + j] = self.feature_codes[j]
+        return AdvisoryCodes(self, codes, values)
+
+    def evaluate_one(self, exam_score, pass_fail, performance, risk_cluster, form_data=None) -> list:
+        """Same rules for a single record, in plain Python (no array overhead)."""
+        codes = [next((c for t, c in self._score_bands if exam_score >= t), int(self.score_codes[0]))]
+        for lookup, label in zip(self.label_slots, (pass_fail, performance, risk_cluster)):
+            codes.append(lookup[label])
+        tips = [self.messages[c] for c in codes if c]
+
+        if form_data:
+            for key, default, op, threshold, template in self._feature_rows:
+                value = float(form_data.get(key, default))
+                if op(value, threshold):
+                    tips.append(template.format(value))
+        return tips
+
+
+class AdvisoryCodes:
+    """
+    Advice for a batch as codes: `codes` is (n_rows, n_slots) uint8 into
+    table.messages (0 = none), `values` holds the feature values the
+    feature templates are formatted with.
+    """
+
+    def __init__(self, table: RuleTable, codes: np.ndarray, values: np.ndarray):
+        self.table, self.codes, self.values = table, codes, values
+
+    def __len__(self):
+        return len(self.codes)
+
+    def render(self) -> list:
+        """Per-row lists of message strings (same as get_advisory row by row)."""
+        return self._assemble(lambda text: text)
+
+    def intern(self, messages: dict) -> list:
+        """
+        Per-row lists of message ids instead of strings: every distinct text
+        gets an id in `messages` ({text: id}, extended in place), so a batch
+        response can send each text once (see batch_service.score_frame_compact).
+        """
+        return self._assemble(lambda text: messages.setdefault(text, len(messages)))
+
+    def _assemble(self, emit) -> list:
+        """Per-row lists of emit(text), in get_advisory order."""
+        table = self.table
+        base  = 1 + len(table.label_slots)
+
+        # Few distinct score/label combinations: build each message tuple once
+        # (codes packed into one integer per row: a 1-D unique is much cheaper)
+        packed = np.zeros(len(self), dtype=np.uint32)
+        for slot in range(base):
+            packed = (packed << 8) | self.codes[:, slot]
+        _, first, inverse = np.unique(packed, return_index=True, return_inverse=True)
+        texts = [tuple(emit(table.messages[c]) for c in self.codes[i, :base].tolist() if c) for i in first.tolist()]
+        rows  = [list(texts[k]) for k in inverse.tolist()]
+
+        # Feature tips are formatted only where a rule fired, once per distinct value
+        for j in range(len(table.feature_keys)):
+            hits = np.flatnonzero(self.codes[:, base + j])
+            if not hits.size:
+                continue
+            template, formatted = table.messages[table.feature_codes[j]], {}
+            for i, value in zip(hits.tolist(), self.values[hits, j].tolist()):
+                out = formatted.get(value)
+                if out is None:
+                    out = formatted[value] = emit(template.format(value))
+                rows[i].append(out)
+        return rows
+
+
+RULES = RuleTable()
+
 
 def get_advisory(
     exam_score:   float,
@@ -26,58 +227,47 @@ def get_advisory(
     Returns:
         List of advisory strings (3–7 messages depending on situation)
     """
-    tips = []
-
-    # ── Score-based advice ────────────────────────────────────
-    if exam_score >= 85:
-        tips.append("🏆 Outstanding predicted score! Keep up your excellent work.")
-    elif exam_score >= 70:
-        tips.append("📈 Good predicted score. A little more effort could push you to excellence.")
-    elif exam_score >= 50:
-        tips.append("⚠️  Borderline score predicted. Focus on weak subjects immediately.")
-    else:
-        tips.append("🚨 Critical: Very low score predicted. Seek academic support urgently.")
+    return RULES.evaluate_one(exam_score, pass_fail, performance, risk_cluster, form_data)
 
-    # ── Pass/Fail advice ─────────────────────────────────────
-    if pass_fail == "Fail":
-        tips.append("❌ You are at risk of failing. Prioritise exam preparation over all else.")
-    else:
-        tips.append("✅ On track to pass. Maintain consistency to secure the result.")
-
-    # ── Performance category advice ──────────────────────────
-    perf_tips = {
-        "Excellent": "🌟 Excellent performer! Consider mentoring peers or exploring advanced topics.",
-        "Good":      "👍 Good performance. Target Excellent by improving weaker subjects.",
-        "Average":   "📚 Average performance. Create a structured daily study plan.",
-        "Poor":      "🆘 Poor performance detected. Reduce distractions and seek teacher guidance.",
-    }
-    tips.append(perf_tips.get(performance, "Keep working hard!"))
-
-    # ── Risk cluster advice ──────────────────────────────────
-    risk_tips = {
-        "High Risk":   "🔴 High academic risk. Attend all classes and submit all assignments on time.",
-        "Medium Risk": "🟡 Moderate risk. Small improvements in attendance and study hours will help.",
-        "Low Risk":    "🟢 Low risk. Stay consistent and avoid last-minute studying.",
-    }
-    tips.append(risk_tips.get(risk_cluster, ""))
-
-    # ── Feature-level tips (if raw form data is provided) ─────
-    if form_data:
-        attendance = float(form_data.get("attendance_percentage", 100))
-        study_hrs  = float(form_data.get("study_hours", 6))
-        sleep_hrs  = float(form_data.get("sleep_hours", 7))
-        internet   = float(form_data.get("internet_usage", 4))
-
-        if attendance < 75:
-            tips.append(f"📅 Attendance is {attendance:.0f}% — below the 75% minimum. Attend more classes.")
-        if study_hrs < 4:
-            tips.append(f"📖 Only {study_hrs:.1f} study hours/day. Aim for at least 4–6 hours.")
-        if sleep_hrs < 6:
-            tips.append(f"😴 Sleeping only {sleep_hrs:.1f} hours. Poor sleep reduces memory retention.")
-        if internet > 8:
-            tips.append(f"📱 {internet:.1f} hours of internet usage/day is high. Reduce screen time.")
-
-    return [t for t in tips if t]  # Remove any empty strings
+
+def advisory_codes(
+    exam_scores,
+    pass_fail,
+    performance,
+    risk_cluster,
+    frame = None,
+) -> AdvisoryCodes:
+    """
+    Evaluates every rule for a whole batch with vectorized comparisons.
+
+    Args:
+        exam_scores  : sequence of predicted scores
+        pass_fail    : sequence of "Pass" / "Fail"
+        performance  : sequence of performance labels
+        risk_cluster : sequence of risk labels
+        frame        : Optional DataFrame of the raw inputs (app-style keys)
+
+    Returns:
+        AdvisoryCodes — call .render() for the message strings
+    """
+    return RULES.evaluate(exam_scores, pass_fail, performance, risk_cluster, frame)
+
+
+def get_advisory_batch(
+    exam_scores,
+    pass_fail,
+    performance,
+    risk_cluster,
+    frame = None,
+) -> list:
+    """
+    Column-wise get_advisory() for a whole batch: advisory_codes(...).render().
+    Output is identical to calling get_advisory() row by row.
+
+    Returns:
+        List (one per row) of advisory string lists
+    """
+    return advisory_codes(exam_scores, pass_fail, performance, risk_cluster, frame).render()
 
 
 def get_summary_badge(pass_fail: str, risk_cluster: str) -> dict:
@@ -0,0 +1,157 @@
+# ============================================================
+#  utils/artifact_cache.py — AckVision Preprocessing Artifact Cache
+#  Keeps the fitted scaler and label encoders in memory so the
+#  request path never unpickles them from disk.
+#  An artifact is reloaded only when its file actually changes
+#  (mtime/size first, then SHA-256 of the content).
+# ============================================================
+
+import hashlib
+import os
+import threading
+import time
+
+import joblib
+import config
+
+# name → path of every preprocessing artifact saved by train_models.py
+ARTIFACT_PATHS = {
+    "scaler":                config.SCALER_PATH,
+    "participation_encoder": config.PARTICIPATION_ENCODER_PATH,
+    "extra_encoder":         config.EXTRA_ENCODER_PATH,
+    "pass_encoder":          config.PASS_ENCODER_PATH,
+    "performance_encoder":   config.PERFORMANCE_ENCODER_PATH,
+}
+
+# name → {"obj", "mtime", "size", "sha256", "checked_at"}
+_entries = {}
+_stats   = {"hits": 0, "misses": 0, "reloads": 0, "revalidations": 0}
+_lock    = threading.Lock()
+
+
+def file_hash(path: str) -> str:
+    """Returns the hex SHA-256 digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# path → (mtime_ns, size, sha256) so unchanged files are never re-hashed
+_fingerprints = {}
+
+
+def fingerprint(paths) -> str:
+    """
+    Returns one short content fingerprint for a set of files
+    (e.g. the dataset + every model artifact). Each file is re-hashed
+    only when its mtime/size changed since the last call.
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        st = _stat(path)
+        with _lock:
+            known = _fingerprints.get(path)
+        if known is None or known[:2] != (st.st_mtime_ns, st.st_size):
+            known = (st.st_mtime_ns, st.st_size, file_hash(path))
+            with _lock:
+                _fingerprints[path] = known
+        digest.update(f"{path}:{known[2]};".encode())
+    return digest.hexdigest()[:16]
+
+
+def _stat(path: str):
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        raise FileNotFoundError(
+            f"[artifact_cache] ✗ File not found: {path}\n"
+            f"  → Check the dataset path and run train_models.py to regenerate models."
+        )
+
+
+def _load(path: str, st) -> dict:
+    return {
+        "obj":        joblib.load(path),
+        "mtime":      st.st_mtime_ns,
+        "size":       st.st_size,
+        "sha256":     file_hash(path),
+        "checked_at": time.monotonic(),
+    }
+
+
+def _refresh(name: str) -> dict:
+    """
+    Returns the up-to-date cache entry for `name`, reloading from disk
+    only when the file's mtime/size changed AND its content hash differs.
+    Must be called with _lock held.
+    """
+    path  = ARTIFACT_PATHS[name]
+    entry = _entries.get(name)
+    now   = time.monotonic()
+
+    if entry is not None and now - entry["checked_at"] < config.ARTIFACT_RECHECK_SECONDS:
+        _stats["hits"] += 1
+        return entry
+
+    st = _stat(path)
+    if entry is None:
+        _stats["misses"] += 1
+        entry = _entries[name] = _load(path, st)
+        return entry
+
+    entry["checked_at"] = now
+    if (st.st_mtime_ns, st.st_size) == (entry["mtime"], entry["size"]):
+        _stats["hits"] += 1
+        return entry
+
+    # File was touched — only unpickle again if the bytes really changed
+    _stats["revalidations"] += 1
+    if file_hash(path) == entry["sha256"]:
+        entry["mtime"], entry["size"] = st.st_mtime_ns, st.st_size
+        _stats["hits"] += 1
+        return entry
+
+    _stats["misses"]  += 1
+    _stats["reloads"] += 1
+    entry = _entries[name] = _load(path, st)
+    print(f"[artifact_cache] ↻ Reloaded '{name}' from {path}")
+    return entry
+
+
+def load_all(revalidate: bool = False):
+    """
+    Load every preprocessing artifact into memory.
+    Called from model_loader.load_all() at app startup.
+    revalidate=True re-checks every file now instead of trusting entries
+    younger than ARTIFACT_RECHECK_SECONDS (used by hot reloads).
+    """
+    with _lock:
+        for name in ARTIFACT_PATHS:
+            if revalidate and name in _entries:
+                _entries[name]["checked_at"] = float("-inf")
+            _refresh(name)
+            print(f"[artifact_cache] ✓ Loaded '{name}' from {ARTIFACT_PATHS[name]}")
+
+
+def get(name: str):
+    """
+    Returns the in-memory artifact `name` (e.g. "scaler"),
+    loading it on first use and reloading it if the file changed.
+    """
+    if name not in ARTIFACT_PATHS:
+        raise KeyError(f"[artifact_cache] Unknown artifact '{name}'.")
+    with _lock:
+        return _refresh(name)["obj"]
+
+
+def stats() -> dict:
+    """Returns hit/miss counters plus the content hash of each cached artifact."""
+    with _lock:
+        return {
+            **_stats,
+            "sha256": {
+                name: entry["sha256"][:12] for name, entry in _entries.items()
+            },
+        }
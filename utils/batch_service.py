@@ -0,0 +1,180 @@
+# ============================================================
+#  utils/batch_service.py — AckVision Batch Scoring Engine
+#  Vectorized scoring for whole rosters (CSV /upload):
+#  the frame is encoded + scaled in one step and each model's
+#  predict() is called ONCE on the full matrix.
+#  Results match the single-record pipeline row for row.
+#  Large frames are sharded across the process pool of
+#  utils/scoring_pool.py when config.PARALLEL_SCORING is on.
+# ============================================================
+
+import time
+
+import numpy as np
+import config
+from utils.compiled_models import predictor
+from utils.featurizer import get_featurizer
+from utils.advisory import advisory_codes
+from utils.prediction_cache import cached_predict_matrix
+from utils import scoring_pool
+
+# CSV-style headers ("Attendance (%)") → app-style keys ("attendance")
+CSV_COLUMN_MAP = dict(zip(config.FEATURE_COLUMNS, config.INPUT_KEYS))
+
+
+def prepare_frame(df) -> list:
+    """
+    Renames CSV-style headers to app-style keys in place.
+    Returns the list of required input columns that are still missing.
+    """
+    df.rename(columns=CSV_COLUMN_MAP, inplace=True)
+    return [c for c in config.INPUT_KEYS if c not in df.columns]
+
+
+def featurize_frame(df) -> np.ndarray:
+    """App-style DataFrame → scaled (n_rows, n_features) matrix."""
+    return get_featurizer().transform_frame(df)
+
+
+def _decode(codes, labels: dict) -> list:
+    return [labels.get(c, "Unknown") for c in codes.tolist()]
+
+
+def predict_matrix(X: np.ndarray) -> dict:
+    """
+    Runs all 4 models once on a scaled feature matrix.
+
+    Returns:
+        dict of equal-length lists: exam_score, pass_fail, performance, risk_cluster
+    """
+    scores = np.clip(predictor("linear").predict(X), 0, 100)
+    return {
+        "exam_score":   [round(s, 2) for s in scores.tolist()],
+        "pass_fail":    _decode(predictor("dt").predict(X).astype(int), config.PASS_FAIL_LABELS),
+        "performance":  _decode(predictor("knn").predict(X).astype(int), config.PERFORMANCE_LABELS),
+        "risk_cluster": _decode(predictor("kmeans").predict(X).astype(int), config.RISK_LABELS),
+    }
+
+
+def score_columns(df, timings: dict = None) -> dict:
+    """
+    Scores every row of an app-style DataFrame column-wise.
+
+    Returns:
+        dict of equal-length lists: exam_score, pass_fail, performance,
+        risk_cluster, plus "advisory" as advisory.AdvisoryCodes (message
+        codes — call .render() when serialising). When `timings` is given,
+        the seconds spent featurizing, predicting and evaluating the advice
+        rules are added to its "featurize", "predict" and "advisory" entries.
+    """
+    t0 = time.perf_counter()
+    X  = featurize_frame(df)
+    t1 = time.perf_counter()
+    preds = cached_predict_matrix(X, scoring_pool.predict_matrix)
+    t2 = time.perf_counter()
+    preds["advisory"] = advisory_codes(
+        preds["exam_score"], preds["pass_fail"],
+        preds["performance"], preds["risk_cluster"], df,
+    )
+    if timings is not None:
+        for stage, seconds in (("featurize", t1 - t0), ("predict", t2 - t1), ("advisory", time.perf_counter() - t2)):
+            timings[stage] = timings.get(stage, 0.0) + seconds
+    return preds
+
+
+def score_frame(df, inputs: bool = True) -> list:
+    """
+    Scores every row of an app-style DataFrame (see prepare_frame).
+
+    Returns:
+        List of per-row dicts: the input columns (unless inputs=False),
+        the 4 predictions and the advisory list — same shape as the
+        /upload response rows.
+    """
+    if len(df) == 0:
+        return []
+
+    cols    = score_columns(df)
+    records = df.to_dict("records") if inputs else [{} for _ in range(len(df))]
+    return [
+        {**row, "exam_score": score, "pass_fail": pf, "performance": perf,
+         "risk_cluster": risk, "advisory": tips}
+        for row, score, pf, perf, risk, tips in zip(
+            records, cols["exam_score"], cols["pass_fail"],
+            cols["performance"], cols["risk_cluster"], cols["advisory"].render(),
+        )
+    ]
+
+
+# Label vocabularies of the compact format: id = the model's class code
+COMPACT_LABELS = {
+    "pass_fail":    list(config.PASS_FAIL_LABELS.values()),
+    "performance":  list(config.PERFORMANCE_LABELS.values()),
+    "risk_cluster": list(config.RISK_LABELS.values()),
+}
+
+
+def _dictionary_encode(values: list, vocabulary: list) -> tuple:
+    """values → (ids, vocabulary); labels not in the vocabulary are appended to it."""
+    vocabulary = list(vocabulary)
+    index      = {label: i for i, label in enumerate(vocabulary)}
+    ids        = []
+    for label in values:
+        i = index.get(label)
+        if i is None:
+            i = index[label] = len(vocabulary)
+            vocabulary.append(label)
+        ids.append(i)
+    return ids, vocabulary
+
+
+def score_frame_compact(df, inputs: bool = True) -> dict:
+    """
+    Same results as score_frame, dictionary-encoded for large rosters
+    (/upload?format=compact). Each advisory text and label is sent once;
+    rows are arrays in `columns` order carrying only ids:
+
+        {"columns":  [<input columns>..., "exam_score", "pass_fail",
+                      "performance", "risk_cluster", "advisory"],
+         "labels":   {"pass_fail": [...], "performance": [...], "risk_cluster": [...]},
+         "messages": [...],               # advisory ids index this list
+         "rows":     [[..., 46.1, 0, 2, 1, [3, 5, 8]], ...]}
+
+    inputs=False leaves the input columns out of `columns` and the rows.
+    """
+    in_cols = [str(c) for c in df.columns] if inputs else []
+    out = {"columns": in_cols + ["exam_score", "pass_fail", "performance", "risk_cluster", "advisory"],
+           "labels": {}, "messages": [], "rows": []}
+    if len(df) == 0:
+        out["labels"] = dict(COMPACT_LABELS)
+        return out
+
+    cols     = score_columns(df)
+    messages = {}
+    advice   = cols["advisory"].intern(messages)
+    encoded  = []
+    for key in ("pass_fail", "performance", "risk_cluster"):
+        ids, out["labels"][key] = _dictionary_encode(cols[key], COMPACT_LABELS[key])
+        encoded.append(ids)
+
+    columns = [df[c].tolist() for c in df.columns] if inputs else []
+    out["messages"] = list(messages)                   # insertion order = id
+    out["rows"]     = [list(row) for row in zip(*columns, cols["exam_score"], *encoded, advice)]
+    return out
+
+
+def iter_csv_chunks(fileobj, chunk_rows: int = None):
+    """
+    Reads a CSV upload lazily in chunks of `chunk_rows` rows.
+    Yields app-style DataFrames (headers already renamed).
+    Raises ValueError on the first chunk if required columns are missing,
+    so callers can reject the file before any output is produced.
+    """
+    import pandas as pd
+
+    reader = pd.read_csv(fileobj, chunksize=chunk_rows or config.UPLOAD_CHUNK_ROWS)
+    for chunk in reader:
+        missing = prepare_frame(chunk)
+        if missing:
+            raise ValueError(f"CSV missing columns: {missing}")
+        yield chunk
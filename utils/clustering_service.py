@@ -6,6 +6,7 @@
 
 import config
 from utils import model_loader
+from utils.compiled_models import predictor
 from utils.preprocessing import get_feature_array
 
 
@@ -25,42 +26,59 @@ def assign_risk_cluster(form_data: dict) -> str:
         the centroid ordering from Dev 1's training. If predictions seem
         reversed, swap the label assignments in config.RISK_LABELS.
     """
-    features   = get_feature_array(form_data)
-    model      = model_loader.get_kmeans()
-    cluster_id = int(model.predict(features)[0])
+    return risk_cluster_from_features(get_feature_array(form_data))
+
+
+def risk_cluster_from_features(features) -> str:
+    """K-Means on a scaled (1, n_features) array → risk group label."""
+    cluster_id = int(predictor("kmeans").predict(features)[0])
     return config.RISK_LABELS.get(cluster_id, "Unknown")
 
 
-def get_cluster_data_for_visualization() -> dict:
+def get_cluster_data_for_visualization(df=None) -> dict:
     """
     Returns raw cluster assignment data for all records in the dataset.
     Used by the /visualize route to generate the scatter plot.
+
+    Args:
+        df: Optional DataFrame (CSV headers) to cluster instead of the
+            dataset. When omitted, the memory-mapped dataset store and its
+            cached scaled matrix are used. It is not modified.
     """
-    import pandas as pd
-    import joblib
-    from utils.preprocessing import get_scaler
+    from utils import dataset_store
 
     try:
-        df      = pd.read_csv(config.DATA_PATH)
-        model   = model_loader.get_kmeans()
-        scaler  = get_scaler()
+        model = model_loader.get_kmeans()
+
+        if df is None:
+            columns     = dataset_store.load_columns()
+            X_scaled    = dataset_store.get_feature_matrix(scaled=True)
+            attendance  = columns["Attendance (%)"]
+            study_hours = columns["Study Hours (per day)"]
+        else:
+            from utils import artifact_cache
+            from utils.preprocessing import get_scaler
+
+            df        = df.copy()
+            part_enc  = artifact_cache.get("participation_encoder")
+            extra_enc = artifact_cache.get("extra_encoder")
 
-        part_enc  = joblib.load(config.PARTICIPATION_ENCODER_PATH)
-        extra_enc = joblib.load(config.EXTRA_ENCODER_PATH)
+            # Encode categoricals before scaling — same as training
+            df["Participation Level"] = part_enc.transform(df["Participation Level"])
+            df["Extra Curricular"]    = extra_enc.transform(df["Extra Curricular"])
 
-        # Encode categoricals before scaling — same as training
-        df["Participation Level"] = part_enc.transform(df["Participation Level"])
-        df["Extra Curricular"]    = extra_enc.transform(df["Extra Curricular"])
+            X_scaled    = get_scaler().transform(df[config.FEATURE_COLUMNS].values)
+            attendance  = df["Attendance (%)"]
+            study_hours = df["Study Hours (per day)"]
 
-        X_scaled    = scaler.transform(df[config.FEATURE_COLUMNS].values)
         cluster_ids = model.predict(X_scaled).tolist()
         labels      = [config.RISK_LABELS.get(c, "Unknown") for c in cluster_ids]
 
         return {
             "cluster_ids": cluster_ids,
             "labels":      labels,
-            "attendance":  df["Attendance (%)"].tolist(),
-            "study_hours": df["Study Hours (per day)"].tolist(),
+            "attendance":  attendance.tolist(),
+            "study_hours": study_hours.tolist(),
         }
 
     except Exception as e:
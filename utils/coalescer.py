@@ -0,0 +1,152 @@
+# ============================================================
+#  utils/coalescer.py — AckVision Request Coalescer
+#  Optional micro-batching for concurrent /predict traffic
+#  (config.COALESCE_ENABLED). Request threads hand their scaled
+#  feature row to one background worker, which waits up to
+#  COALESCE_MAX_WAIT_MS for more rows (or COALESCE_MAX_BATCH of
+#  them), runs batch_service.predict_matrix ONCE on the stacked
+#  matrix and hands each row's result back to its caller.
+#
+#  Rows are only batched with rows of the same model set, and
+#  each batch runs pinned to it (see model_loader.pinned()).
+#
+#  Only helps when requests run concurrently in one process,
+#  e.g. gunicorn --threads N or --worker-class gthread.
+# ============================================================
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+import config
+from utils import model_loader
+
+# Upper bounds of the batch-size histogram buckets
+_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+
+class RequestCoalescer:
+    """
+    Collects single-row predictions into micro-batches.
+
+    Usage:
+        coalescer = RequestCoalescer(max_batch=64, max_wait_ms=2.0)
+        result = coalescer.predict(features)   # blocks until its batch ran
+    """
+
+    def __init__(self, max_batch: int, max_wait_ms: float, window: int = 10_000):
+        self.max_batch   = max(1, int(max_batch))
+        self.max_wait    = max(0.0, float(max_wait_ms)) / 1000.0
+        self._queue      = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._batches    = 0
+        self._requests   = 0
+        self._errors     = 0
+        self._sizes      = dict.fromkeys([f"<={b}" for b in _SIZE_BUCKETS] + [f">{_SIZE_BUCKETS[-1]}"], 0)
+        self._waits      = deque(maxlen=window)    # recent queueing delays (s)
+        self._worker     = threading.Thread(target=self._run, name="predict-coalescer", daemon=True)
+        self._worker.start()
+
+    def predict(self, features: np.ndarray) -> dict:
+        """Scaled (1, n_features) array → the same dict as InferencePipeline.predict_features."""
+        future = Future()
+        self._queue.put((features, time.perf_counter(), future, model_loader.active()))
+        return future.result()
+
+    def _collect(self) -> list:
+        """Blocks for the first row, then gathers more until the batch is full or the wait is over."""
+        batch    = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        from utils.batch_service import predict_matrix
+
+        while True:
+            batch  = self._collect()
+            groups = {}                        # model set → its rows, in arrival order
+            for item in batch:
+                groups.setdefault(item[3], []).append(item)
+
+            started = time.perf_counter()
+            for model_set, items in groups.items():
+                with model_loader.pinned(model_set):
+                    self._score_group(items, predict_matrix)
+            self._record(len(batch), [started - queued for _, queued, _, _ in batch])
+
+    def _score_group(self, items: list, predict_matrix):
+        """
+        One predict_matrix call for the group. If it raises (e.g. a NaN row),
+        each row is scored on its own, so only the offending requests fail.
+        """
+        try:
+            preds = predict_matrix(np.vstack([features for features, *_ in items]))
+        except Exception as exc:
+            if len(items) == 1:
+                items[0][2].set_exception(exc)
+                with self._stats_lock:
+                    self._errors += 1
+                return
+            for item in items:
+                self._score_group([item], predict_matrix)
+            return
+
+        for i, (_, _, future, _) in enumerate(items):
+            future.set_result({key: values[i] for key, values in preds.items()})
+
+    def _record(self, size: int, waits: list):
+        bucket = next((f"<={b}" for b in _SIZE_BUCKETS if size <= b), f">{_SIZE_BUCKETS[-1]}")
+        with self._stats_lock:
+            self._batches  += 1
+            self._requests += size
+            self._sizes[bucket] += 1
+            self._waits.extend(waits)
+
+    def stats(self) -> dict:
+        """Batch-size distribution and added queueing latency (ms, recent window)."""
+        with self._stats_lock:
+            waits = np.array(self._waits) * 1000.0
+            return {
+                "max_batch":      self.max_batch,
+                "max_wait_ms":    self.max_wait * 1000.0,
+                "batches":        self._batches,
+                "requests":       self._requests,
+                "errors":         self._errors,
+                "mean_batch":     round(self._requests / self._batches, 2) if self._batches else 0.0,
+                "batch_sizes":    dict(self._sizes),
+                "queue_wait_ms": {
+                    "mean": round(float(waits.mean()), 3) if len(waits) else 0.0,
+                    "p50":  round(float(np.percentile(waits, 50)), 3) if len(waits) else 0.0,
+                    "p95":  round(float(np.percentile(waits, 95)), 3) if len(waits) else 0.0,
+                    "max":  round(float(waits.max()), 3) if len(waits) else 0.0,
+                },
+            }
+
+
+_coalescer = None
+_lock      = threading.Lock()
+
+
+def get_coalescer() -> RequestCoalescer:
+    """Returns the process-wide coalescer, starting its worker on first use."""
+    global _coalescer
+    with _lock:
+        if _coalescer is None:
+            _coalescer = RequestCoalescer(config.COALESCE_MAX_BATCH, config.COALESCE_MAX_WAIT_MS)
+        return _coalescer
+
+
+def stats() -> dict:
+    """Coalescer counters for /api/stats (just the flag until the first coalesced request)."""
+    if _coalescer is None:
+        return {"enabled": bool(config.COALESCE_ENABLED)}
+    return {"enabled": bool(config.COALESCE_ENABLED), **_coalescer.stats()}
@@ -0,0 +1,123 @@
+# ============================================================
+#  utils/compiled_models.py — AckVision Compiled Evaluators
+#  Optional fast inference mode (config.COMPILED_INFERENCE).
+#  At load time the sklearn estimators are exported into plain
+#  arrays, skipping sklearn's per-call input validation:
+#    - LinearRegression       → dot(coef_, x) + intercept_
+#    - DecisionTreeClassifier → flattened tree_ array walk
+#    - KMeans                 → nearest cluster_centers_ row
+#  The sklearn models stay loaded as the reference; parity is
+#  tested by tests/test_compiled_models.py, speed measured by
+#  benchmarks/bench_compiled_models.py.
+# ============================================================
+
+import numpy as np
+import config
+from utils import model_loader
+
+
+class CompiledLinear:
+    """LinearRegression.predict as one matrix-vector product."""
+
+    def __init__(self, model):
+        self.coef_      = np.asarray(model.coef_, dtype=np.float64)
+        self.intercept_ = model.intercept_
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        # Same expression as LinearModel._decision_function
+        return X @ self.coef_.T + self.intercept_
+
+
+class CompiledTree:
+    """
+    DecisionTreeClassifier.predict as an array walk.
+    Like sklearn, features are compared as float32 against float64 thresholds.
+    """
+
+    def __init__(self, model):
+        tree = model.tree_
+        self.left      = tree.children_left.copy()
+        self.right     = tree.children_right.copy()
+        self.feature   = tree.feature.copy()
+        self.threshold = tree.threshold.copy()
+        # Class predicted at every node (only leaves are ever read)
+        self.node_class = model.classes_.take(np.argmax(tree.value[:, 0, :], axis=1))
+        self.max_depth  = int(tree.max_depth)
+
+        # Plain-list copies for the single-row Python walk
+        self._l, self._r = self.left.tolist(), self.right.tolist()
+        self._f, self._t = self.feature.tolist(), self.threshold.tolist()
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        X32 = np.asarray(X, dtype=np.float32)
+        if len(X32) == 1:
+            row  = X32[0].tolist()
+            node = 0
+            l, r, f, t = self._l, self._r, self._f, self._t
+            while l[node] != -1:
+                node = l[node] if row[f[node]] <= t[node] else r[node]
+            return self.node_class[[node]]
+
+        nodes = np.zeros(len(X32), dtype=np.intp)
+        rows  = np.arange(len(X32))
+        for _ in range(self.max_depth):
+            inner = self.left[nodes] != -1
+            if not inner.any():
+                break
+            n  = nodes[inner]
+            go_left = X32[rows[inner], self.feature[n]] <= self.threshold[n]
+            nodes[inner] = np.where(go_left, self.left[n], self.right[n])
+        return self.node_class[nodes]
+
+
+class CompiledKMeans:
+    """KMeans.predict as argmin of ‖c‖² − 2·x·c over the fitted centers."""
+
+    def __init__(self, model):
+        self.cluster_centers_ = np.asarray(model.cluster_centers_, dtype=np.float64)
+        self._half_sq_norms   = 0.5 * np.einsum("ij,ij->i", self.cluster_centers_, self.cluster_centers_)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        # ‖x−c‖² = ‖x‖² − 2x·c + ‖c‖²; ‖x‖² is constant per row, so drop it
+        return np.argmin(self._half_sq_norms - X @ self.cluster_centers_.T, axis=1).astype(np.int32)
+
+
+# model_loader registry key → evaluator class
+_COMPILERS = {
+    "linear": CompiledLinear,
+    "dt":     CompiledTree,
+    "kmeans": CompiledKMeans,
+}
+
+
+def get(name: str):
+    """
+    Returns the compiled evaluator for a loaded model ("linear", "dt", "kmeans"),
+    compiled once per model set (see model_loader.ModelSet.derive).
+    """
+    compiler = _COMPILERS[name]
+    return model_loader.active().derive(("compiled", name), lambda models: compiler(models.models[name]))
+
+
+def predictor(name: str):
+    """
+    Model to call .predict() on for "linear", "dt", "knn" or "kmeans":
+    the compiled evaluator when config.COMPILED_INFERENCE is on and one
+    exists for that model, the neighbour index for "knn" unless
+    config.KNN_BACKEND is "sklearn", otherwise the sklearn estimator.
+    """
+    if name == "knn" and config.KNN_BACKEND != "sklearn":
+        from utils import neighbors
+        return neighbors.get_index()
+    if config.COMPILED_INFERENCE and name in _COMPILERS:
+        return get(name)
+    return model_loader.get_model(name)
+
+
+def compile_all():
+    """
+    Compile every supported model of the set in use up front
+    (called after model_loader.load_all() and before a hot-reload swap).
+    """
+    for name in _COMPILERS:
+        get(name)
@@ -0,0 +1,184 @@
+# ============================================================
+#  utils/dataset_store.py — AckVision Columnar Dataset Store
+#  Converts the dataset CSV ONCE into one .npy file per column
+#  and opens them memory-mapped, so every consumer reads the
+#  same pages zero-copy instead of re-parsing the CSV.
+#  The encoded feature matrix (categoricals → codes) and the
+#  scaled matrix are cached next to the raw columns, keyed on
+#  the encoder/scaler fingerprint — those of the ModelSet in
+#  use (model_loader.active()) once models are loaded, so the
+#  matrix always matches the models it is fed to.
+#
+#  Layout:
+#    data/.store/<csv fingerprint>/meta.json
+#    data/.store/<csv fingerprint>/col_<i>.npy
+#    data/.store/<csv fingerprint>/features_<artifact fp>/encoded.npy
+#    data/.store/<csv fingerprint>/features_<artifact fp>/scaled.npy
+# ============================================================
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+import config
+from utils import artifact_cache, model_loader
+
+# Artifacts the feature matrices depend on
+FEATURE_ARTIFACT_PATHS = [
+    config.SCALER_PATH,
+    config.PARTICIPATION_ENCODER_PATH,
+    config.EXTRA_ENCODER_PATH,
+]
+
+# csv path → {"fingerprint", "dir", "columns"}  (columns are open memmaps)
+_opened = {}
+_lock   = threading.Lock()
+
+
+def _write_atomic(final_dir: str, fill):
+    """Build into a temp dir, then rename — concurrent builders never see half a store."""
+    parent = os.path.dirname(final_dir)
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=parent, prefix=".building-")
+    try:
+        fill(tmp)
+        os.replace(tmp, final_dir)
+    except OSError:
+        if not os.path.isdir(final_dir):
+            raise
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _convert_csv(csv_path: str, store_dir: str):
+    """CSV → one .npy per column + meta.json (strings as fixed-width unicode)."""
+    import pandas as pd
+
+    df = pd.read_csv(csv_path)
+
+    def fill(tmp):
+        meta = {"n_rows": len(df), "columns": []}
+        for i, name in enumerate(df.columns):
+            series = df[name]
+            if series.dtype == object:
+                values, kind = series.fillna("").astype(str).to_numpy().astype(str), "str"
+            else:
+                values, kind = series.to_numpy(), "num"
+            np.save(os.path.join(tmp, f"col_{i}.npy"), values, allow_pickle=False)
+            meta["columns"].append({"name": name, "file": f"col_{i}.npy", "kind": kind})
+        with open(os.path.join(tmp, "meta.json"), "w") as fh:
+            json.dump(meta, fh, indent=2)
+
+    _write_atomic(store_dir, fill)
+    print(f"[dataset_store] ✓ Converted {csv_path} → {store_dir}")
+
+
+def _open(csv_path: str) -> dict:
+    """Returns the open store for csv_path, converting/re-opening if the CSV changed."""
+    key = artifact_cache.fingerprint([csv_path])
+    with _lock:
+        entry = _opened.get(csv_path)
+        if entry and entry["fingerprint"] == key:
+            return entry
+
+        root      = os.path.join(config.DATASET_STORE_DIR, os.path.splitext(os.path.basename(csv_path))[0])
+        store_dir = os.path.join(root, key)
+        if not os.path.isfile(os.path.join(store_dir, "meta.json")):
+            _convert_csv(csv_path, store_dir)
+            for stale in os.listdir(root):          # drop stores of older CSV versions
+                if stale != key and not stale.startswith("."):
+                    shutil.rmtree(os.path.join(root, stale), ignore_errors=True)
+
+        with open(os.path.join(store_dir, "meta.json")) as fh:
+            meta = json.load(fh)
+        columns = {
+            c["name"]: np.load(os.path.join(store_dir, c["file"]), mmap_mode="r")
+            for c in meta["columns"]
+        }
+        entry = _opened[csv_path] = {
+            "fingerprint": key,
+            "dir":         store_dir,
+            "columns":     columns,
+            "kinds":       {c["name"]: c["kind"] for c in meta["columns"]},
+            "features":    {},
+        }
+        return entry
+
+
+def load_columns(csv_path: str = None) -> dict:
+    """
+    Returns {column name: read-only memory-mapped ndarray} in CSV order.
+    String columns are fixed-width unicode ("" where the CSV was empty).
+    """
+    return _open(csv_path or config.DATA_PATH)["columns"]
+
+
+def load_frame(csv_path: str = None):
+    """
+    Returns the dataset as a pandas DataFrame built from the mapped columns
+    (numeric columns are not re-parsed; empty strings become NaN again).
+    """
+    import pandas as pd
+
+    entry = _open(csv_path or config.DATA_PATH)
+    data  = {}
+    for name, values in entry["columns"].items():
+        if entry["kinds"][name] == "str":
+            col = values.astype(object)
+            col[values == ""] = np.nan
+            data[name] = col
+        else:
+            data[name] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def get_feature_matrix(scaled: bool = True, csv_path: str = None) -> np.ndarray:
+    """
+    Returns the (n_rows, n_features) matrix in config.FEATURE_COLUMNS order,
+    memory-mapped from disk: categoricals encoded with the saved encoders,
+    and standard-scaled with the saved scaler when scaled=True.
+    The encoders/scaler are those of the ModelSet in use, or the files on
+    disk before load_all(). Built on first use and per artifact version.
+    """
+    entry     = _open(csv_path or config.DATA_PATH)
+    model_set = model_loader.active()
+    if model_set is not None and model_set.artifact_version:
+        art_key   = model_set.artifact_version
+        artifacts = model_set.artifacts
+    else:
+        art_key   = artifact_cache.fingerprint(FEATURE_ARTIFACT_PATHS)
+        artifacts = {name: artifact_cache.get(name) for name in model_loader.SET_ARTIFACTS}
+    name = "scaled" if scaled else "encoded"
+
+    with _lock:
+        cached = entry["features"].get(art_key)
+        if cached is None:
+            feat_dir = os.path.join(entry["dir"], f"features_{art_key}")
+            if not os.path.isfile(os.path.join(feat_dir, "scaled.npy")):
+                _build_features(entry["columns"], feat_dir, artifacts)
+            cached = entry["features"][art_key] = {
+                kind: np.load(os.path.join(feat_dir, f"{kind}.npy"), mmap_mode="r")
+                for kind in ("encoded", "scaled")
+            }
+        return cached[name]
+
+
+def _build_features(columns: dict, feat_dir: str, artifacts: dict):
+    part_enc  = artifacts["participation_encoder"]
+    extra_enc = artifacts["extra_encoder"]
+    scaler    = artifacts["scaler"]
+
+    encoders = {"Participation Level": part_enc, "Extra Curricular": extra_enc}
+    encoded  = np.empty((len(next(iter(columns.values()))), len(config.FEATURE_COLUMNS)))
+    for i, name in enumerate(config.FEATURE_COLUMNS):
+        values = columns[name]
+        encoded[:, i] = encoders[name].transform(values) if name in encoders else values
+
+    def fill(tmp):
+        np.save(os.path.join(tmp, "encoded.npy"), encoded)
+        np.save(os.path.join(tmp, "scaled.npy"), scaler.transform(encoded))
+
+    _write_atomic(feat_dir, fill)
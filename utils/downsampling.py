@@ -0,0 +1,135 @@
+# ============================================================
+#  utils/downsampling.py — AckVision Scatter Downsampling
+#  Reduces the cluster scatter (one point per student) to a
+#  bounded number of points before it is sent to the browser.
+#  Modes:
+#    - stratified → random sample per cluster, proportional to
+#                   cluster size (fixed seed)
+#    - grid       → 2D binning per cluster; one point per
+#                   non-empty cell at the cell mean, with counts
+#    - lttb       → Largest-Triangle-Three-Buckets per cluster,
+#                   ordered by study hours; keeps outline/outliers
+#    - full       → no reduction
+# ============================================================
+
+import numpy as np
+
+MODES = ("stratified", "grid", "lttb", "full")
+
+
+def _quota(cluster_ids: np.ndarray, max_points: int) -> dict:
+    """Points allowed per cluster, proportional to size, at least 1 each."""
+    clusters, sizes = np.unique(cluster_ids, return_counts=True)
+    share = np.maximum(1, np.floor(sizes / sizes.sum() * max_points)).astype(int)
+    return dict(zip(clusters.tolist(), np.minimum(share, sizes).tolist()))
+
+
+def stratified_indices(cluster_ids, max_points: int, seed: int = 42) -> np.ndarray:
+    """Row indices of a per-cluster random sample, in original order."""
+    rng  = np.random.RandomState(seed)
+    keep = []
+    for cluster, quota in _quota(cluster_ids, max_points).items():
+        rows = np.flatnonzero(cluster_ids == cluster)
+        keep.append(rng.choice(rows, quota, replace=False))
+    return np.sort(np.concatenate(keep)) if keep else np.empty(0, dtype=int)
+
+
+def lttb_indices(x, y, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets over points sorted by x.
+    Returns indices into x/y of the n_out points kept.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n) if n_out >= n else np.argsort(x, kind="stable")[:n_out]
+
+    order   = np.argsort(x, kind="stable")
+    xs, ys  = x[order], y[order]
+    edges   = np.linspace(1, n - 1, n_out - 1).astype(int)   # n_out − 2 inner buckets
+    kept    = [0]
+    prev    = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        # Average of the NEXT bucket (or the last point) is the third vertex
+        nlo, nhi = hi, edges[b + 2] if b + 2 < len(edges) else n
+        ax, ay   = xs[nlo:nhi].mean(), ys[nlo:nhi].mean()
+        px, py   = xs[prev], ys[prev]
+        area = np.abs((px - ax) * (ys[lo:hi] - py) - (px - xs[lo:hi]) * (ay - py))
+        prev = lo + int(area.argmax())
+        kept.append(prev)
+    kept.append(n - 1)
+    return order[np.asarray(kept)]
+
+
+def downsample(cluster_ids, labels, x, y, max_points: int, mode: str = "stratified") -> dict:
+    """
+    Reduces the scatter to at most ~max_points points.
+
+    Args:
+        cluster_ids, labels : per-student cluster id / risk label
+        x, y                : study hours / attendance per student
+        max_points          : point budget for the response
+        mode                : one of MODES
+
+    Returns:
+        dict with cluster_ids, labels, study_hours, attendance (and counts for
+        "grid"), plus a "sampling" block describing what was done.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown downsampling mode '{mode}'. Use one of {MODES}.")
+
+    cluster_ids = np.asarray(cluster_ids)
+    labels      = np.asarray(labels, dtype=object)
+    x, y        = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    total       = len(cluster_ids)
+    counts      = None
+
+    if mode == "full" or total <= max_points:
+        mode, idx = "full", np.arange(total)
+    elif mode == "stratified":
+        idx = stratified_indices(cluster_ids, max_points)
+    elif mode == "lttb":
+        parts = []
+        for cluster, quota in _quota(cluster_ids, max_points).items():
+            rows = np.flatnonzero(cluster_ids == cluster)
+            parts.append(rows[lttb_indices(x[rows], y[rows], quota)])
+        idx = np.sort(np.concatenate(parts))
+    else:
+        return _grid(cluster_ids, labels, x, y, max_points, total)
+
+    result = {
+        "cluster_ids": cluster_ids[idx].tolist(),
+        "labels":      labels[idx].tolist(),
+        "attendance":  y[idx].tolist(),
+        "study_hours": x[idx].tolist(),
+    }
+    result["sampling"] = {"mode": mode, "total_points": total, "returned_points": len(idx)}
+    return result
+
+
+def _grid(cluster_ids, labels, x, y, max_points: int, total: int) -> dict:
+    """2D grid binning per cluster: one point per non-empty (cluster, cell)."""
+    n_clusters = len(np.unique(cluster_ids))
+    side = max(1, int(np.sqrt(max_points / max(n_clusters, 1))))
+
+    def cell(v):
+        lo, hi = v.min(), v.max()
+        span = hi - lo if hi > lo else 1.0
+        return np.minimum(((v - lo) / span * side).astype(int), side - 1)
+
+    key = (cluster_ids.astype(np.int64) * side + cell(x)) * side + cell(y)
+    uniq, first, inverse, counts = np.unique(
+        key, return_index=True, return_inverse=True, return_counts=True
+    )
+    mean_x = np.bincount(inverse, weights=x) / counts
+    mean_y = np.bincount(inverse, weights=y) / counts
+
+    return {
+        "cluster_ids": cluster_ids[first].tolist(),
+        "labels":      labels[first].tolist(),
+        "attendance":  np.round(mean_y, 2).tolist(),
+        "study_hours": np.round(mean_x, 2).tolist(),
+        "counts":      counts.tolist(),
+        "sampling":    {"mode": "grid", "total_points": total,
+                        "returned_points": len(uniq), "grid_size": side},
+    }
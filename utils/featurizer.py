@@ -0,0 +1,119 @@
+# ============================================================
+#  utils/featurizer.py — AckVision Compiled Featurizer
+#  Pandas-free fast path for turning ONE form dict into the
+#  scaled feature row the models expect.
+#  Built from the fitted scaler + encoders: categories become
+#  plain dict lookups and scaling uses the precomputed
+#  mean_/scale_ vectors — same float64 ops as StandardScaler,
+#  so the output is bit-for-bit identical.
+#  One featurizer is built per model_loader.ModelSet.
+# ============================================================
+
+import numpy as np
+from utils import model_loader
+
+# (form key, cast) in config.FEATURE_COLUMNS order.
+# Casts mirror preprocessing.get_feature_array_reference().
+_FIELDS = [
+    ("attendance",          float),
+    ("study_hours",         float),
+    ("assignment_score",    float),
+    ("previous_gpa",        float),
+    ("participation_level", "participation_encoder"),
+    ("internet_usage",      float),
+    ("sleep_hours",         float),
+    ("family_support",      int),
+    ("extra_curricular",    "extra_encoder"),
+]
+
+
+class CompiledFeaturizer:
+    """
+    Form dict → scaled float64 row of shape (1, n_features).
+
+    Usage:
+        fz  = CompiledFeaturizer(scaler, part_enc, extra_enc)
+        row = fz.transform(form_data)             # fresh array
+        fz.transform(form_data, out=buffer)       # reuse a preallocated row
+    """
+
+    def __init__(self, scaler, participation_encoder, extra_encoder):
+        encoders = {
+            "participation_encoder": participation_encoder,
+            "extra_encoder":         extra_encoder,
+        }
+        self.n_features = len(_FIELDS)
+        self.mean_  = np.asarray(scaler.mean_, dtype=np.float64) if scaler.with_mean else None
+        self.scale_ = np.asarray(scaler.scale_, dtype=np.float64) if scaler.with_std else None
+
+        # Per-column converter: a cast for numerics, a {label: code} dict for categoricals
+        self._converters = []
+        for key, kind in _FIELDS:
+            if isinstance(kind, str):
+                classes = encoders[kind].classes_
+                lookup  = {label: float(code) for code, label in enumerate(classes.tolist())}
+                self._converters.append((key, lookup))
+            else:
+                self._converters.append((key, kind))
+
+    def transform(self, form_data: dict, out: np.ndarray = None) -> np.ndarray:
+        """
+        Encode + scale one record.
+        Raises KeyError for a missing key and ValueError for an unseen category,
+        like the LabelEncoder path does.
+        """
+        row = np.empty((1, self.n_features), dtype=np.float64) if out is None else out
+        values = row[0]
+        for i, (key, conv) in enumerate(self._converters):
+            raw = form_data[key]
+            if isinstance(conv, dict):
+                try:
+                    values[i] = conv[raw]
+                except (KeyError, TypeError):
+                    raise ValueError(f"y contains previously unseen labels: {[raw]}")
+            else:
+                values[i] = conv(raw)
+
+        # Same in-place ops, same order as StandardScaler.transform
+        if self.mean_ is not None:
+            values -= self.mean_
+        if self.scale_ is not None:
+            values /= self.scale_
+        return row
+
+
+    def transform_frame(self, frame) -> np.ndarray:
+        """
+        Vectorized version of transform() for a whole DataFrame whose
+        columns are config.INPUT_KEYS. Returns an (n_rows, n_features) array
+        identical, row for row, to calling transform() on each record.
+        """
+        X = np.empty((len(frame), self.n_features), dtype=np.float64)
+        for i, (key, conv) in enumerate(self._converters):
+            column = frame[key]
+            if isinstance(conv, dict):
+                codes  = column.map(conv)
+                unseen = codes.isna()
+                if unseen.any():
+                    raise ValueError(
+                        f"y contains previously unseen labels: {sorted(map(str, column[unseen].unique()))}"
+                    )
+                X[:, i] = codes.to_numpy(dtype=np.float64)
+            else:
+                values = column.to_numpy(dtype=np.float64)
+                X[:, i] = np.trunc(values) if conv is int else values
+
+        if self.mean_ is not None:
+            X -= self.mean_
+        if self.scale_ is not None:
+            X /= self.scale_
+        return X
+
+
+def get_featurizer() -> CompiledFeaturizer:
+    """Returns the featurizer compiled from the artifacts of the model set in use."""
+    return model_loader.active().derive("featurizer", lambda models: CompiledFeaturizer(
+        models.artifacts["scaler"],
+        models.artifacts["participation_encoder"],
+        models.artifacts["extra_encoder"],
+    ))
@@ -0,0 +1,80 @@
+# ============================================================
+#  utils/inference_pipeline.py — AckVision Inference Pipeline
+#  Validates and featurizes one student record ONCE, then fans
+#  the same scaled array out to all 4 models:
+#    - Linear Regression  → Final Exam Score
+#    - Decision Tree      → Pass / Fail
+#    - KNN                → Performance Category
+#    - K-Means            → Academic Risk Group
+# ============================================================
+
+import numpy as np
+import config
+from utils.preprocessing import get_feature_array
+from utils.prediction_service import (
+    exam_score_from_features, pass_fail_from_features, performance_from_features,
+)
+from utils.clustering_service import risk_cluster_from_features
+from utils.prediction_cache import cached_predict
+
+
+class InputValidationError(ValueError):
+    """Raised when a student record is missing required input keys."""
+
+    def __init__(self, missing: list):
+        self.missing = missing
+        super().__init__(f"Missing fields: {missing}")
+
+
+class InferencePipeline:
+    """
+    Single-pass inference for one student record.
+
+    Usage:
+        result = pipeline.run(form_data)
+        # → {"exam_score": 61.2, "pass_fail": "Pass",
+        #    "performance": "Medium", "risk_cluster": "Low Risk"}
+    """
+
+    def __init__(self, input_keys=None):
+        self.input_keys = list(input_keys or config.INPUT_KEYS)
+
+    def validate(self, form_data: dict) -> dict:
+        """Raises InputValidationError if any required key is absent."""
+        missing = [k for k in self.input_keys if k not in form_data]
+        if missing:
+            raise InputValidationError(missing)
+        return form_data
+
+    def featurize(self, form_data: dict) -> np.ndarray:
+        """Raw input dict → scaled (1, n_features) array."""
+        return get_feature_array(form_data)
+
+    def predict_features(self, features: np.ndarray) -> dict:
+        """Runs all 4 models on an already-scaled feature array."""
+        return {
+            "exam_score":   exam_score_from_features(features),
+            "pass_fail":    pass_fail_from_features(features),
+            "performance":  performance_from_features(features),
+            "risk_cluster": risk_cluster_from_features(features),
+        }
+
+    def run(self, form_data: dict) -> dict:
+        """
+        Validate → featurize once → predict with every model.
+        Repeated records are answered from utils/prediction_cache.py;
+        with config.COALESCE_ENABLED the prediction step is batched
+        together with concurrent requests (utils/coalescer.py).
+        """
+        self.validate(form_data)
+        return cached_predict(self.featurize(form_data), self._predict)
+
+    def _predict(self, features: np.ndarray) -> dict:
+        if config.COALESCE_ENABLED:
+            from utils.coalescer import get_coalescer
+            return get_coalescer().predict(features)
+        return self.predict_features(features)
+
+
+# Shared instance used by app.py and prediction_service.run_all_predictions()
+pipeline = InferencePipeline()
@@ -0,0 +1,247 @@
+# ============================================================
+#  utils/jobs.py — AckVision Background Scoring Jobs
+#  /upload?async=1 turns a roster into a job instead of scoring
+#  it inside the request:
+#    submit()  → saves the CSV to JOBS_DIR/<id>/input.csv and
+#                starts a dispatcher thread in this process
+#    dispatcher→ reads JOBS_CHUNK_ROWS-row chunks and hands them
+#                to a local process pool; idle pool processes
+#                pull the next chunk, score it and write
+#                part-<n>.ndjson themselves
+#    finish    → parts are joined into result.ndjson (+ trailer)
+#
+#  Job state lives in JOBS_DIR/<id>/state.json, so any gunicorn
+#  worker can answer GET /jobs/<id>, not only the one running it.
+#  The pool is utils/scoring_pool.py's: its processes already
+#  hold the model set the job started with (chunks a stale pool
+#  process refuses are scored in the dispatcher thread instead).
+# ============================================================
+
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, wait
+
+import config
+from utils import model_loader, scoring_pool
+
+_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+_lock  = threading.Lock()
+_stats = {"submitted": 0, "done": 0, "failed": 0, "rows": 0}
+
+
+class JobNotFound(KeyError):
+    """Unknown (or expired) job id."""
+
+
+# ── On-disk job store ───────────────────────────────────────
+
+def _job_dir(job_id: str) -> str:
+    if not _ID_RE.match(job_id or ""):
+        raise JobNotFound(job_id)
+    return os.path.join(config.JOBS_DIR, job_id)
+
+
+def _write_state(job_dir: str, state: dict):
+    tmp = os.path.join(job_dir, f"state.json.tmp-{os.getpid()}-{threading.get_ident()}")
+    with open(tmp, "w") as fh:
+        json.dump(state, fh)
+    os.replace(tmp, os.path.join(job_dir, "state.json"))
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def get(job_id: str) -> dict:
+    """
+    Current state of a job: status (queued | running | done | failed),
+    rows_done / rows_total, rows_per_second, model_version, error.
+    Raises JobNotFound.
+    """
+    try:
+        with open(os.path.join(_job_dir(job_id), "state.json")) as fh:
+            state = json.load(fh)
+    except FileNotFoundError:
+        raise JobNotFound(job_id)
+    if state["status"] in ("queued", "running") and not _pid_alive(state["owner_pid"]):
+        state.update(status="failed", error="the worker running this job exited")
+    return state
+
+
+def result_path(job_id: str) -> str:
+    """Path of a finished job's result.ndjson. Raises JobNotFound."""
+    path = os.path.join(_job_dir(job_id), "result.ndjson")
+    if not os.path.isfile(path):
+        get(job_id)                     # JobNotFound if the job itself is unknown
+        return None
+    return path
+
+
+def prune(ttl_hours: float = None):
+    """Deletes jobs that finished (or were created) more than ttl_hours ago."""
+    ttl_hours = config.JOBS_TTL_HOURS if ttl_hours is None else ttl_hours
+    if not os.path.isdir(config.JOBS_DIR):
+        return 0
+    cutoff, removed = time.time() - ttl_hours * 3600, 0
+    for job_id in os.listdir(config.JOBS_DIR):
+        try:
+            state = get(job_id)
+        except (JobNotFound, ValueError):
+            continue
+        if state["status"] in ("done", "failed") and (state.get("finished_at") or state["created_at"]) < cutoff:
+            shutil.rmtree(_job_dir(job_id), ignore_errors=True)
+            removed += 1
+    return removed
+
+
+def _count_rows(path: str) -> int:
+    """Data rows in a CSV (newlines minus the header; quoted newlines are rare in rosters)."""
+    lines, last = 0, b"\n"
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    return max(0, lines + (last != b"\n") - 1)
+
+
+# ── Pool task ───────────────────────────────────────────────
+
+def _score_chunk(job_dir: str, index: int, frame, models=None) -> int:
+    """
+    Runs in a pool process (or inline with models given): scores one chunk
+    with the job's model set and writes part-<index>.ndjson.
+    Returns the number of rows.
+    """
+    from utils import batch_service
+
+    with model_loader.pinned(models or scoring_pool.worker_models()):
+        rows = batch_service.score_frame(frame)
+    part = os.path.join(job_dir, f"part-{index:06d}.ndjson")
+    with open(part + ".tmp", "w") as fh:
+        # Same encoding as Flask's JSON provider (sorted keys) used by /upload?stream=1
+        fh.write("".join(json.dumps(r, sort_keys=True, default=str) + "\n" for r in rows))
+    os.replace(part + ".tmp", part)
+    return len(rows)
+
+
+# ── Jobs ────────────────────────────────────────────────────
+
+def submit(fileobj, filename: str) -> dict:
+    """
+    Stores an uploaded CSV as a new job and starts scoring it in the
+    background. Raises ValueError (job removed) if required columns are missing.
+    Returns the initial state.
+    """
+    from utils import batch_service
+    import pandas as pd
+
+    prune()
+    job_id  = uuid.uuid4().hex
+    job_dir = os.path.join(config.JOBS_DIR, job_id)
+    os.makedirs(job_dir)
+    input_path = os.path.join(job_dir, "input.csv")
+    try:
+        with open(input_path, "wb") as out:
+            shutil.copyfileobj(fileobj, out, 1 << 20)
+        missing = batch_service.prepare_frame(pd.read_csv(input_path, nrows=0))
+        if missing:
+            raise ValueError(f"CSV missing columns: {missing}")
+    except Exception:
+        shutil.rmtree(job_dir, ignore_errors=True)
+        raise
+
+    models = model_loader.current()
+    state  = {
+        "id":              job_id,
+        "filename":        filename,
+        "status":          "queued",
+        "created_at":      time.time(),
+        "started_at":      None,
+        "finished_at":     None,
+        "rows_total":      _count_rows(input_path),
+        "rows_done":       0,
+        "rows_per_second": 0.0,
+        "model_version":   models.version,
+        "owner_pid":       os.getpid(),
+        "error":           None,
+    }
+    _write_state(job_dir, state)
+    with _lock:
+        _stats["submitted"] += 1
+    # _run owns (and mutates) its own copy; the caller gets the queued snapshot
+    threading.Thread(target=_run, args=(job_dir, dict(state), models), name=f"job-{job_id[:8]}", daemon=True).start()
+    return state
+
+
+def _run(job_dir: str, state: dict, models):
+    """Dispatcher thread: feeds chunks to the pool, tracks progress, joins the parts."""
+    from utils import batch_service
+
+    state.update(status="running", started_at=time.time())
+    _write_state(job_dir, state)
+    try:
+        with scoring_pool.acquire(models) as pool:
+            pending, index = {}, 0           # future → (index, frame), for the inline fallback
+            with open(os.path.join(job_dir, "input.csv"), "rb") as fh:
+                for frame in batch_service.iter_csv_chunks(fh, config.JOBS_CHUNK_ROWS):
+                    # At most 2 chunks per process in flight: bounded memory, no idle workers
+                    while len(pending) >= 2 * scoring_pool.n_workers():
+                        _collect(pending, job_dir, state, models)
+                    pending[pool.submit(_score_chunk, job_dir, index, frame)] = (index, frame)
+                    index += 1
+            while pending:
+                _collect(pending, job_dir, state, models)
+
+        parts = sorted(p for p in os.listdir(job_dir) if p.startswith("part-") and p.endswith(".ndjson"))
+        result = os.path.join(job_dir, "result.ndjson")
+        with open(result + ".tmp", "wb") as out:
+            for part in parts:
+                with open(os.path.join(job_dir, part), "rb") as src:
+                    shutil.copyfileobj(src, out, 1 << 20)
+            trailer = {"count": state["rows_done"], "model_version": models.version}
+            out.write((json.dumps(trailer, sort_keys=True) + "\n").encode())
+        os.replace(result + ".tmp", result)
+        for part in parts:
+            os.remove(os.path.join(job_dir, part))
+        os.remove(os.path.join(job_dir, "input.csv"))
+        state.update(status="done", rows_total=state["rows_done"])
+        outcome = "done"
+    except Exception as e:
+        state.update(status="failed", error=str(e))
+        outcome = "failed"
+        print(f"[jobs] ✗ Job {state['id']} failed: {e}")
+
+    state["finished_at"] = time.time()
+    _write_state(job_dir, state)
+    with _lock:
+        _stats[outcome] += 1
+        _stats["rows"]  += state["rows_done"]
+
+
+def _collect(pending: dict, job_dir: str, state: dict, models):
+    """Waits for at least one chunk (removed from pending), adds its rows to the progress in state.json."""
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        index, frame = pending.pop(future)
+        state["rows_done"] += scoring_pool.result(future, lambda: _score_chunk(job_dir, index, frame, models))
+    elapsed = time.time() - state["started_at"]
+    state["rows_per_second"] = round(state["rows_done"] / elapsed, 1) if elapsed > 0 else 0.0
+    _write_state(job_dir, state)
+
+
+def stats() -> dict:
+    """Job counters of this process for /api/stats."""
+    with _lock:
+        return dict(_stats)
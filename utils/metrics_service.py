@@ -2,47 +2,114 @@
 #  utils/metrics_service.py — AckVision Model Metrics Service
 #  Calculates and returns evaluation metrics for all 4 models.
 #  Called by the /api/metrics route in app.py.
+#  Results are cached per model version (model_loader) and
+#  dataset, and computed on one pinned ModelSet, so a hot
+#  reload is reflected immediately and never mixes versions.
 # ============================================================
 
-import pandas as pd
+import threading
+import time
+from datetime import datetime, timezone
+
 import numpy as np
-import joblib
 import config
-from utils import model_loader
-from utils.preprocessing import get_feature_array
-from sklearn.metrics import (
-    mean_absolute_error, mean_squared_error, r2_score,
-    accuracy_score, f1_score, precision_score, recall_score,
-    silhouette_score, classification_report
-)
+from utils import model_loader, artifact_cache, dataset_store
+from utils.silhouette import silhouette
+
+
+# Files the metrics depend on besides the ModelSet (dataset + label encoders)
+METRICS_INPUT_PATHS = [
+    config.DATA_PATH,
+    config.PASS_ENCODER_PATH,
+    config.PERFORMANCE_ENCODER_PATH,
+]
+
+# Single cached entry: {"model_version", "fingerprint", "result", "computed_at", "duration_ms"}
+_cache = {}
+_lock  = threading.Lock()
+
+
+def metrics_fingerprint() -> str:
+    """Content fingerprint of the dataset + label encoders."""
+    return artifact_cache.fingerprint(METRICS_INPUT_PATHS)
 
 
 def get_all_metrics() -> dict:
     """
-    Load the dataset and evaluate all 4 models.
+    Returns the metrics for all 4 models of the live ModelSet, computing
+    them only if the model version or the dataset changed since the last
+    computation.
+
+    The response carries the model version, when the cached entry was
+    computed, how long it took and whether this call was served from cache.
+    """
+    with model_loader.pinned() as models:
+        if models is None:
+            return {"status": "error", "message": "Models are not loaded."}
+        try:
+            key = metrics_fingerprint()
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+        with _lock:   # one computation at a time; concurrent callers wait for it
+            cached = _cache.get("model_version") == models.version and _cache.get("fingerprint") == key
+            if not cached:
+                start  = time.perf_counter()
+                result = compute_all_metrics()
+                if result["status"] != "ok":
+                    return result            # errors are never cached
+                _cache.update(
+                    model_version = models.version,
+                    fingerprint   = key,
+                    result        = result,
+                    computed_at   = datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    duration_ms   = round((time.perf_counter() - start) * 1000, 1),
+                )
+            entry = dict(_cache)
+
+    return {
+        **entry.pop("result"),
+        "model_version": entry.pop("model_version"),
+        "cache": {**entry, "hit": cached},
+    }
+
+
+def warm_cache():
+    """Compute metrics ahead of the first request (config.METRICS_WARM_ON_STARTUP)."""
+    result = get_all_metrics()
+    if result["status"] == "ok":
+        print(f"[metrics_service] ✓ Metrics cached in {result['cache']['duration_ms']} ms")
+    else:
+        print(f"[metrics_service] ✗ Metrics warm-up failed: {result['message']}")
+
+
+def compute_all_metrics() -> dict:
+    """
+    Load the dataset and evaluate all 4 models of the ModelSet in use
+    (model_loader.active()), on the matrix built with its scaler.
     Returns a structured dict of metrics for each model.
 
     Note:
-        This runs predictions on the full dataset.
-        Results are re-computed each time — add caching if needed for production.
+        This runs predictions on the full dataset — call get_all_metrics()
+        instead, which caches the result.
     """
-    try:
-        df      = pd.read_csv(config.DATA_PATH)
-        scaler  = joblib.load(config.SCALER_PATH)
-        part_enc = joblib.load(config.PARTICIPATION_ENCODER_PATH)
-        extra_enc = joblib.load(config.EXTRA_ENCODER_PATH)
+    # Deferred: sklearn.metrics is only needed here, not at app startup
+    from sklearn.metrics import (
+        mean_absolute_error, mean_squared_error, r2_score,
+        accuracy_score, f1_score, precision_score, recall_score,
+        classification_report
+    )
 
-        # Encode categorical input features BEFORE scaling (same as training)
-        df["Participation Level"] = part_enc.transform(df["Participation Level"])
-        df["Extra Curricular"]    = extra_enc.transform(df["Extra Curricular"])
-
-        X       = scaler.transform(df[config.FEATURE_COLUMNS].values)
+    try:
+        # Memory-mapped columns + cached encoded/scaled matrix (dataset_store)
+        df      = dataset_store.load_columns()
+        X       = dataset_store.get_feature_matrix(scaled=True)
 
         metrics = {}
 
         # ── Linear Regression ────────────────────────────────────────────
-        if "Final Exam Score" in df.columns:
-            y_true = df["Final Exam Score"].values
+        if "Final Exam Score" in df:
+            y_true = df["Final Exam Score"]
             y_pred = model_loader.get_linear().predict(X)
             metrics["linear_regression"] = {
                 "name":  "Linear Regression",
@@ -53,9 +120,9 @@ def get_all_metrics() -> dict:
             }
 
         # ── Decision Tree ─────────────────────────────────────────────────
-        if "Pass/Fail" in df.columns:
-            pass_enc = joblib.load(config.PASS_ENCODER_PATH)
-            y_true   = pass_enc.transform(df["Pass/Fail"].values)
+        if "Pass/Fail" in df:
+            pass_enc = artifact_cache.get("pass_encoder")
+            y_true   = pass_enc.transform(df["Pass/Fail"])
             y_pred = model_loader.get_decision_tree().predict(X)
             metrics["decision_tree"] = {
                 "name":      "Decision Tree",
@@ -67,9 +134,9 @@ def get_all_metrics() -> dict:
             }
 
         # ── KNN ──────────────────────────────────────────────────────
-        if "Performance Category" in df.columns:
-            perf_enc = joblib.load(config.PERFORMANCE_ENCODER_PATH)
-            y_true   = perf_enc.transform(df["Performance Category"].values)
+        if "Performance Category" in df:
+            perf_enc = artifact_cache.get("performance_encoder")
+            y_true   = perf_enc.transform(df["Performance Category"])
             y_pred = model_loader.get_knn().predict(X)
             metrics["knn"] = {
                 "name":      "K-Nearest Neighbours",
@@ -81,14 +148,20 @@ def get_all_metrics() -> dict:
             }
 
         # ── K-Means ──────────────────────────────────────────
-        cluster_labels = model_loader.get_kmeans().predict(X)
+        kmeans         = model_loader.get_kmeans()
+        cluster_labels = kmeans.predict(X)
+        sil            = silhouette(X, cluster_labels, centers=kmeans.cluster_centers_)
         metrics["kmeans"] = {
             "name":             "K-Means Clustering",
             "task":             "Clustering (Academic Risk Groups)",
-            "silhouette_score": round(silhouette_score(X, cluster_labels), 4),
-            "inertia":          round(float(model_loader.get_kmeans().inertia_), 4),
-            "n_clusters":       int(model_loader.get_kmeans().n_clusters),
+            "silhouette_score": round(sil["score"], 4),
+            "silhouette_mode":  sil["mode"],
+            "inertia":          round(float(kmeans.inertia_), 4),
+            "n_clusters":       int(kmeans.n_clusters),
         }
+        if "ci95" in sil:
+            metrics["kmeans"]["silhouette_ci95"]        = [round(v, 4) for v in sil["ci95"]]
+            metrics["kmeans"]["silhouette_sample_size"] = sil["sample_size"]
 
         return {"status": "ok", "metrics": metrics}
 
@@ -2,37 +2,212 @@
 #  utils/model_loader.py — AckVision Model Loader
 #  Loads all 4 trained .pkl models once at app startup.
 #  All service modules call the getter functions here.
+#
+#  The models + the featurization artifacts (scaler, encoders)
+#  form one immutable, versioned ModelSet. A hot reload
+#  (utils/model_registry.py) builds a new set next to the live
+#  one and swaps it in with install(); requests that pinned the
+#  old set (pinned()) finish on it.
+#
+#  config.MODEL_LOAD_MODE: "eager" (one by one), "parallel"
+#  (thread pool) or "lazy" (each pickle on first access).
 # ============================================================
 
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
 import joblib
 import config
+from utils import artifact_cache
+
+# Model registry key → .pkl path
+MODEL_PATHS = {
+    "linear":  config.LINEAR_MODEL_PATH,
+    "dt":      config.DT_MODEL_PATH,
+    "knn":     config.KNN_MODEL_PATH,
+    "kmeans":  config.KMEANS_MODEL_PATH,
+}
+
+# artifact_cache names captured in each set (everything featurization needs)
+SET_ARTIFACTS = ("scaler", "participation_encoder", "extra_encoder")
+
+# Every file whose content defines a model version
+ARTIFACT_SET_PATHS = [artifact_cache.ARTIFACT_PATHS[name] for name in SET_ARTIFACTS]
+VERSION_PATHS      = [*MODEL_PATHS.values(), *ARTIFACT_SET_PATHS]
+
+
+class ModelSet:
+    """
+    One loaded, versioned set of models and preprocessing artifacts.
+    Objects derived from it (compiled evaluators, neighbour index,
+    featurizer) are cached on the set, so they are dropped with it.
+    """
+
+    def __init__(self, models: dict, artifacts: dict, version: str, fingerprints: dict,
+                 artifact_version: str = None):
+        self.models           = models
+        self.artifacts        = artifacts
+        self.version          = version
+        self.fingerprints     = fingerprints     # model key → fingerprint of its .pkl
+        self.artifact_version = artifact_version # fingerprint of the SET_ARTIFACTS files
+        self.loaded_at    = time.time()
+        self._derived     = {}
+        self._lock        = threading.Lock()
+
+    def derive(self, key, build):
+        """Returns build(self), computed once per set and key."""
+        with self._lock:
+            if key not in self._derived:
+                self._derived[key] = build(self)
+            return self._derived[key]
+
+
+# The live set, the set pinned by the current request (if any), and
+# callbacks run after every install() (e.g. prediction_cache clearing itself)
+_current   = None
+_pinned    = contextvars.ContextVar("ackvision_model_set", default=None)
+_listeners = []
+
+
+class _LazyDict(dict):
+    """dict whose values are produced by loaders[key]() on first access."""
+
+    def __init__(self, loaders: dict):
+        super().__init__()
+        self._loaders = loaders
+        self._lock    = threading.Lock()
+
+    def __missing__(self, key):
+        loader = self._loaders[key]
+        with self._lock:
+            if not dict.__contains__(self, key):
+                self[key] = loader()
+            return dict.__getitem__(self, key)
+
+    def __contains__(self, key):
+        return key in self._loaders
+
+    def __len__(self):
+        return len(self._loaders)
+
+
+def _load_model(name: str, path: str, expected_fp: str = None):
+    try:
+        model = joblib.load(path, mmap_mode=config.MODEL_MMAP_MODE)
+    except FileNotFoundError:
+        raise FileNotFoundError(
+            f"[model_loader] ✗ Model file not found: {path}\n"
+            f"  → Make sure Dev 1 has trained and saved all models first."
+        )
+    if expected_fp is not None and artifact_cache.fingerprint([path]) != expected_fp:
+        raise RuntimeError(f"[model_loader] ✗ {path} changed after this model set was created — reload it.")
+    print(f"[model_loader] ✓ Loaded '{name}' from {path}")
+    return model
+
+
+def load_set(mode: str = None) -> ModelSet:
+    """
+    Loads a fresh ModelSet from disk without touching the live one
+    (mode defaults to config.MODEL_LOAD_MODE).
+    Raises FileNotFoundError with a clear message if any model is missing,
+    and RuntimeError if the files changed while they were being read.
+    """
+    mode         = mode or config.MODEL_LOAD_MODE
+    version      = artifact_cache.fingerprint(VERSION_PATHS)
+    fingerprints = {name: artifact_cache.fingerprint([path]) for name, path in MODEL_PATHS.items()}
+    art_version  = artifact_cache.fingerprint(ARTIFACT_SET_PATHS)
+
+    if mode == "lazy":
+        # Version the files as they are now; each pickle is read (and checked
+        # against that version) the first time something asks for it.
+        models = _LazyDict({
+            name: (lambda name=name, path=path: _load_model(name, path, fingerprints[name]))
+            for name, path in MODEL_PATHS.items()
+        })
+        art_paths = {name: artifact_cache.ARTIFACT_PATHS[name] for name in SET_ARTIFACTS}
+        art_fps   = {name: artifact_cache.fingerprint([path]) for name, path in art_paths.items()}
+        artifacts = _LazyDict({
+            name: (lambda name=name, path=path: _load_model(name, path, art_fps[name]))
+            for name, path in art_paths.items()
+        })
+        return ModelSet(models, artifacts, version, fingerprints, art_version)
+
+    if mode == "parallel":
+        with ThreadPoolExecutor(config.MODEL_LOAD_WORKERS) as pool:
+            cached  = pool.submit(artifact_cache.load_all, True)
+            futures = {name: pool.submit(_load_model, name, path) for name, path in MODEL_PATHS.items()}
+            models  = {name: future.result() for name, future in futures.items()}
+            cached.result()
+    elif mode == "eager":
+        models = {name: _load_model(name, path) for name, path in MODEL_PATHS.items()}
+        artifact_cache.load_all(revalidate=True)
+    else:
+        raise ValueError(f"Unknown MODEL_LOAD_MODE '{mode}'. Use 'eager', 'parallel' or 'lazy'.")
+    artifacts = {name: artifact_cache.get(name) for name in SET_ARTIFACTS}
+
+    if artifact_cache.fingerprint(VERSION_PATHS) != version:
+        raise RuntimeError("[model_loader] ✗ Model files changed while loading — retry once they are written.")
+    return ModelSet(models, artifacts, version, fingerprints, art_version)
+
 
-# Internal model registry — populated by load_all()
-_models = {}
+def install(model_set: ModelSet):
+    """Makes model_set the live set (one reference swap) and notifies listeners."""
+    global _current
+    _current = model_set
+    for callback in _listeners:
+        callback()
 
 
 def load_all():
     """
-    Load all 4 ML models from disk into memory.
+    Load all 4 ML models from disk into memory, together with the
+    preprocessing artifacts (scaler + encoders) held by artifact_cache.
     Called once when Flask app starts (in app.py).
     Raises FileNotFoundError with a clear message if any model is missing.
     """
-    model_paths = {
-        "linear":  config.LINEAR_MODEL_PATH,
-        "dt":      config.DT_MODEL_PATH,
-        "knn":     config.KNN_MODEL_PATH,
-        "kmeans":  config.KMEANS_MODEL_PATH,
-    }
-
-    for name, path in model_paths.items():
-        try:
-            _models[name] = joblib.load(path)
-            print(f"[model_loader] ✓ Loaded '{name}' from {path}")
-        except FileNotFoundError:
-            raise FileNotFoundError(
-                f"[model_loader] ✗ Model file not found: {path}\n"
-                f"  → Make sure Dev 1 has trained and saved all models first."
-            )
+    install(load_set())
+
+
+def current() -> ModelSet:
+    """Returns the live ModelSet (None before load_all())."""
+    return _current
+
+
+def active() -> ModelSet:
+    """Returns the set pinned by the running request, else the live set."""
+    return _pinned.get() or _current
+
+
+@contextmanager
+def pinned(model_set: ModelSet = None):
+    """
+    Pins a ModelSet (default: the live one) for the enclosed block, so a
+    hot reload in the middle of a request does not mix versions.
+
+    Usage:
+        with model_loader.pinned() as models:
+            result = pipeline.run(data)      # always models.version
+    """
+    model_set = model_set or active()
+    token = _pinned.set(model_set)
+    try:
+        yield model_set
+    finally:
+        _pinned.reset(token)
+
+
+def model_version():
+    """Version of the set in use by the running request (None before load_all())."""
+    model_set = active()
+    return model_set.version if model_set else None
+
+
+def on_reload(callback):
+    """Registers a no-argument callback to run after every install()."""
+    _listeners.append(callback)
 
 
 # ── Getters ─────────────────────────────────────────────────
@@ -40,12 +215,18 @@ def load_all():
 # Raises RuntimeError if load_all() was never called.
 
 def _get(key):
-    if key not in _models:
+    model_set = active()
+    if model_set is None or key not in model_set.models:
         raise RuntimeError(
             f"[model_loader] Model '{key}' not loaded. "
             "Call model_loader.load_all() before accessing models."
         )
-    return _models[key]
+    return model_set.models[key]
+
+
+def get_model(name):
+    """Returns a loaded model by registry key: "linear", "dt", "knn" or "kmeans"."""
+    return _get(name)
 
 
 def get_linear():
@@ -68,6 +249,14 @@ def get_kmeans():
     return _get("kmeans")
 
 
+def get_artifact(name):
+    """Returns a preprocessing artifact of the set in use ("scaler", "participation_encoder", ...)."""
+    model_set = active()
+    if model_set is None:
+        raise RuntimeError("[model_loader] Call model_loader.load_all() before accessing artifacts.")
+    return model_set.artifacts[name]
+
+
 def is_loaded():
     """Returns True if all 4 models have been loaded successfully."""
-    return len(_models) == 4
+    return _current is not None and len(_current.models) == 4
@@ -0,0 +1,179 @@
+# ============================================================
+#  utils/model_registry.py — AckVision Model Hot Reload
+#  Rolls out newly trained models/*.pkl without restarting
+#  the gunicorn workers:
+#    1. load the new set next to the live one (model_loader.load_set)
+#    2. smoke-test it on a few dataset rows
+#    3. pre-build its compiled evaluators / KNN index / featurizer
+#    4. swap it in atomically (model_loader.install)
+#  Requests pinned to the old set finish on it.
+#
+#  Triggers:
+#    - a watcher thread polling the model files (MODEL_WATCH_ENABLED)
+#    - POST /admin/models/reload, which also touches
+#      MODEL_RELOAD_TRIGGER_PATH so every worker's watcher follows
+#      (with ?force=1 written into it, so they force-reload too)
+# ============================================================
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import config
+from utils import model_loader, artifact_cache
+
+# Last reload attempts, newest last
+_history = deque(maxlen=10)
+_reload_lock = threading.Lock()
+_watcher     = None
+
+
+def smoke_test(model_set: model_loader.ModelSet):
+    """
+    Scores the first MODEL_SMOKE_ROWS dataset rows with the candidate set,
+    through both the batch and the single-record path.
+    Raises RuntimeError if anything fails or the two paths disagree.
+    """
+    from utils import batch_service, dataset_store
+    from utils.inference_pipeline import pipeline
+
+    frame = dataset_store.load_frame().head(config.MODEL_SMOKE_ROWS).copy()
+    batch_service.prepare_frame(frame)
+    with model_loader.pinned(model_set):
+        X     = batch_service.featurize_frame(frame)
+        preds = batch_service.predict_matrix(X)
+        first = pipeline.predict_features(X[:1])
+
+    if not np.isfinite(preds["exam_score"]).all():
+        raise RuntimeError("smoke test: non-finite exam scores")
+    for key in ("pass_fail", "performance", "risk_cluster"):
+        if "Unknown" in preds[key]:
+            raise RuntimeError(f"smoke test: unmapped {key} label")
+    if first != {key: values[0] for key, values in preds.items()}:
+        raise RuntimeError("smoke test: single-record and batch predictions disagree")
+
+
+def warm(model_set: model_loader.ModelSet):
+    """Builds the set's derived objects so the first requests after the swap are fast."""
+    from utils import compiled_models
+    from utils.featurizer import get_featurizer
+    from utils.compiled_models import predictor
+
+    with model_loader.pinned(model_set):
+        get_featurizer()
+        if config.COMPILED_INFERENCE:
+            compiled_models.compile_all()
+        predictor("knn")
+
+
+def reload(reason: str = "manual", force: bool = False) -> dict:
+    """
+    Loads, validates and installs the model files currently on disk.
+    Skips the swap when their version equals the live one (unless force).
+    Never raises: the outcome is returned and kept in status()["history"].
+    """
+    with _reload_lock:
+        started  = time.perf_counter()
+        previous = model_loader.current()
+        record   = {"reason": reason, "started_at": time.time(), "previous": previous.version if previous else None}
+        try:
+            if not force and previous and artifact_cache.fingerprint(model_loader.VERSION_PATHS) == previous.version:
+                record.update(status="unchanged", version=previous.version)
+            else:
+                candidate = model_loader.load_set()
+                smoke_test(candidate)
+                warm(candidate)
+                model_loader.install(candidate)
+                record.update(status="installed", version=candidate.version)
+                print(f"[model_registry] ✓ Installed model version {candidate.version} ({reason})")
+        except Exception as e:
+            record.update(status="failed", error=str(e))
+            print(f"[model_registry] ✗ Reload failed, keeping {record['previous']}: {e}")
+        record["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        _history.append(record)
+        return record
+
+
+def reload_in_background(reason: str = "admin", force: bool = False) -> bool:
+    """Starts reload(reason, force) in a thread. Returns False if a reload is already running."""
+    if _reload_lock.locked():
+        return False
+    threading.Thread(target=reload, args=(reason, force), name="model-reload", daemon=True).start()
+    return True
+
+
+def touch_trigger(force: bool = False):
+    """
+    Bumps MODEL_RELOAD_TRIGGER_PATH so the watchers of all workers reload,
+    with force when force is set (except in this process, which reloads itself).
+    """
+    with open(config.MODEL_RELOAD_TRIGGER_PATH, "w") as fh:
+        json.dump({"at": time.time(), "force": bool(force), "pid": os.getpid()}, fh)
+
+
+def _trigger_force() -> bool:
+    """True if the trigger file asks other processes for a forced reload."""
+    try:
+        with open(config.MODEL_RELOAD_TRIGGER_PATH) as fh:
+            trigger = json.load(fh)
+    except (OSError, ValueError):
+        return False
+    return isinstance(trigger, dict) and bool(trigger.get("force")) and trigger.get("pid") != os.getpid()
+
+
+def _disk_state():
+    """What the watcher compares between polls: model file versions + trigger mtime."""
+    try:
+        trigger = os.stat(config.MODEL_RELOAD_TRIGGER_PATH).st_mtime_ns
+    except FileNotFoundError:
+        trigger = None
+    return artifact_cache.fingerprint(model_loader.VERSION_PATHS), trigger
+
+
+def _watch(interval: float):
+    try:
+        handled = _disk_state()
+    except FileNotFoundError:
+        handled = None
+    pending = None
+    while True:
+        time.sleep(interval)
+        try:
+            state = _disk_state()
+        except FileNotFoundError:           # a file is being rewritten right now
+            pending = None
+            continue
+        if state == handled:
+            pending = None
+        elif state != pending:              # changed — wait one more poll for writes to settle
+            pending = state
+        else:
+            triggered = handled is None or state[1] != handled[1]
+            reload(reason="watcher", force=triggered and _trigger_force())
+            handled, pending = state, None
+
+
+def start_watcher(interval: float = None):
+    """Starts the model-file watcher thread for this process (once)."""
+    global _watcher
+    if _watcher is None or not _watcher.is_alive():
+        _watcher = threading.Thread(
+            target=_watch, args=(interval or config.MODEL_WATCH_INTERVAL,),
+            name="model-watcher", daemon=True,
+        )
+        _watcher.start()
+
+
+def status() -> dict:
+    """Live model version, load time, watcher state and recent reload attempts."""
+    live = model_loader.current()
+    return {
+        "version":   live.version if live else None,
+        "loaded_at": live.loaded_at if live else None,
+        "watching":  bool(_watcher and _watcher.is_alive()),
+        "reloading": _reload_lock.locked(),
+        "history":   list(_history),
+    }
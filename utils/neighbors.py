@@ -0,0 +1,204 @@
+# ============================================================
+#  utils/neighbors.py — AckVision Neighbour-Index Backends
+#  Pluggable nearest-neighbour search for the KNN performance
+#  model (config.KNN_BACKEND):
+#    - sklearn   → the pickled KNeighborsClassifier as-is
+#    - brute     → float32 BLAS matrix product over all rows
+#    - kd_tree   → sklearn.neighbors.KDTree   (exact)
+#    - ball_tree → sklearn.neighbors.BallTree (exact)
+#    - ivf       → approximate: inverted lists around NumPy
+#                  k-means centroids, probing the nearest
+#                  n_lists/16 buckets by default
+#  Every backend votes like KNeighborsClassifier (uniform
+#  weights, ties → lowest class index).
+#  train_models.py saves the index to config.KNN_INDEX_PATH;
+#  otherwise it is built from knn.pkl at first use (once per
+#  model_loader.ModelSet).
+# ============================================================
+
+import abc
+
+import joblib
+import numpy as np
+import config
+from utils import model_loader
+
+BACKENDS = ("sklearn", "brute", "kd_tree", "ball_tree", "ivf")
+
+
+class NeighborIndex(abc.ABC):
+    """Base class: stores labels and does the majority vote. Backends implement _build and kneighbors."""
+
+    backend = None
+
+    def __init__(self, n_neighbors: int, classes):
+        self.n_neighbors = int(n_neighbors)
+        self.classes_    = np.asarray(classes)
+        self.source_fingerprint = None    # fingerprint of knn.pkl it was built from
+
+    def fit(self, X, y):
+        self._y = np.asarray(y, dtype=np.intp)
+        self._build(np.asarray(X, dtype=np.float64))
+        return self
+
+    @abc.abstractmethod
+    def _build(self, X: np.ndarray):
+        """Builds the search structure over the (float64) training rows."""
+
+    @abc.abstractmethod
+    def kneighbors(self, Q, k: int = None) -> np.ndarray:
+        """Returns the (n_queries, k) row indices of the nearest training rows."""
+
+    def predict(self, Q) -> np.ndarray:
+        labels = self._y[self.kneighbors(np.asarray(Q, dtype=np.float64))]
+        votes  = (labels[:, :, None] == np.arange(len(self.classes_))).sum(axis=1)
+        return self.classes_[votes.argmax(axis=1)]
+
+
+class BruteIndex(NeighborIndex):
+    """Exhaustive search with one float32 GEMM per query block."""
+
+    backend = "brute"
+
+    def _build(self, X):
+        self._X32 = np.ascontiguousarray(X, dtype=np.float32)
+        self._sq  = np.einsum("ij,ij->i", self._X32, self._X32)
+
+    def kneighbors(self, Q, k=None):
+        k     = k or self.n_neighbors
+        Q32   = np.asarray(Q, dtype=np.float32)
+        block = max(1, (1 << 24) // max(len(self._X32), 1))   # ≈64 MB of distances
+        out   = np.empty((len(Q32), k), dtype=np.intp)
+        for start in range(0, len(Q32), block):
+            q  = Q32[start:start + block]
+            d2 = self._sq[None, :] - 2.0 * (q @ self._X32.T)   # ‖q‖² is constant per row
+            part = np.argpartition(d2, k - 1, axis=1)[:, :k]
+            order = np.take_along_axis(d2, part, axis=1).argsort(axis=1, kind="stable")
+            out[start:start + block] = np.take_along_axis(part, order, axis=1)
+        return out
+
+
+class TreeIndex(NeighborIndex):
+    """Exact search with sklearn's KDTree or BallTree."""
+
+    def __init__(self, n_neighbors, classes, kind: str = "kd_tree", leaf_size: int = 30):
+        super().__init__(n_neighbors, classes)
+        self.backend, self.leaf_size = kind, leaf_size
+
+    def _build(self, X):
+        from sklearn.neighbors import KDTree, BallTree
+        tree_cls   = KDTree if self.backend == "kd_tree" else BallTree
+        self._tree = tree_cls(X, leaf_size=self.leaf_size)
+
+    def kneighbors(self, Q, k=None):
+        return self._tree.query(Q, k=k or self.n_neighbors, return_distance=False)
+
+
+class IVFIndex(NeighborIndex):
+    """
+    Approximate search: rows are bucketed by their nearest of `n_lists`
+    k-means centroids; a query scans only the `n_probe` nearest buckets.
+    """
+
+    backend = "ivf"
+
+    def __init__(self, n_neighbors, classes, n_lists: int = None, n_probe: int = None, seed: int = 42):
+        super().__init__(n_neighbors, classes)
+        self.n_lists, self.n_probe, self.seed = n_lists, n_probe, seed
+
+    def _build(self, X):
+        rng     = np.random.RandomState(self.seed)
+        n_lists = self.n_lists or max(1, int(np.sqrt(len(X))))
+        sample  = X[rng.choice(len(X), min(len(X), 50 * n_lists), replace=False)]
+        centers = sample[rng.choice(len(sample), n_lists, replace=False)]
+        for _ in range(10):                               # a few Lloyd iterations
+            assign = self._nearest(sample, centers, 1)[:, 0]
+            counts = np.bincount(assign, minlength=n_lists)[:, None]
+            sums   = np.column_stack([
+                np.bincount(assign, weights=sample[:, j], minlength=n_lists)
+                for j in range(sample.shape[1])
+            ])
+            centers = np.where(counts > 0, sums / np.maximum(counts, 1), centers)
+
+        block  = max(1, (1 << 22) // n_lists)            # ≈32 MB of distances per block
+        assign = np.concatenate([
+            self._nearest(X[s:s + block], centers, 1)[:, 0] for s in range(0, len(X), block)
+        ])
+        self._order   = np.argsort(assign, kind="stable")
+        self._offsets = np.searchsorted(assign[self._order], np.arange(n_lists + 1))
+        self._X       = X[self._order]
+        self._centers = centers
+        self.n_lists  = n_lists
+        self.n_probe  = self.n_probe or max(1, n_lists // 16)
+
+    @staticmethod
+    def _nearest(Q, C, k):
+        d2 = np.einsum("ij,ij->i", C, C)[None, :] - 2.0 * (Q @ C.T)
+        if k == 1:
+            return d2.argmin(axis=1)[:, None]
+        return np.argsort(d2, axis=1, kind="stable")[:, :k]
+
+    def kneighbors(self, Q, k=None):
+        k      = k or self.n_neighbors
+        probes = self._nearest(Q, self._centers, min(self.n_probe, self.n_lists))
+        out    = np.empty((len(Q), k), dtype=np.intp)
+        lo, hi = self._offsets[:-1], self._offsets[1:]
+        for i, q in enumerate(Q):
+            rows = np.concatenate([np.arange(lo[c], hi[c]) for c in probes[i]])
+            if len(rows) < k:                             # too few candidates → scan all
+                rows = np.arange(len(self._X))
+            cand = self._X[rows]
+            d2   = np.einsum("ij,ij->i", cand, cand) - 2.0 * (cand @ q)
+            part = np.argpartition(d2, k - 1)[:k]
+            best = rows[part[np.argsort(d2[part], kind="stable")]]
+            out[i] = self._order[best]
+        return out
+
+
+def build_index(backend: str, X, y, classes, n_neighbors: int) -> NeighborIndex:
+    """Creates and fits a neighbour index of the given backend."""
+    if backend == "brute":
+        index = BruteIndex(n_neighbors, classes)
+    elif backend in ("kd_tree", "ball_tree"):
+        index = TreeIndex(n_neighbors, classes, kind=backend)
+    elif backend == "ivf":
+        index = IVFIndex(n_neighbors, classes, n_lists=config.KNN_IVF_LISTS, n_probe=config.KNN_IVF_PROBE)
+    else:
+        raise ValueError(f"Unknown KNN backend '{backend}'. Use one of {BACKENDS}.")
+    return index.fit(X, y)
+
+
+def index_from_knn(knn, backend: str) -> NeighborIndex:
+    """Builds an index from a fitted KNeighborsClassifier's training data."""
+    return build_index(backend, knn._fit_X, knn._y, knn.classes_, knn.n_neighbors)
+
+
+def get_index() -> NeighborIndex:
+    """
+    Returns the index for config.KNN_BACKEND over the KNN model of the set
+    in use, built once per model set. Uses the index persisted at
+    config.KNN_INDEX_PATH when it matches the backend and that set's
+    knn.pkl; otherwise builds one in memory.
+    """
+    backend = config.KNN_BACKEND
+    return model_loader.active().derive(("knn_index", backend), lambda models: _load_or_build(models, backend))
+
+
+def _load_or_build(models, backend: str) -> NeighborIndex:
+    knn       = models.models["knn"]
+    source_fp = models.fingerprints["knn"]
+    try:
+        saved = joblib.load(config.KNN_INDEX_PATH, mmap_mode=config.MODEL_MMAP_MODE)
+        if (isinstance(saved, NeighborIndex) and getattr(saved, "backend", None) == backend
+                and getattr(saved, "source_fingerprint", None) == source_fp):
+            print(f"[neighbors] ✓ Loaded '{backend}' index from {config.KNN_INDEX_PATH}")
+            return saved
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        # Only a derived cache: a truncated / corrupt / incompatible file is rebuilt
+        print(f"[neighbors] ✗ Ignoring unreadable {config.KNN_INDEX_PATH}: {e!r}")
+    index = index_from_knn(knn, backend)
+    index.source_fingerprint = source_fp
+    print(f"[neighbors] ✓ Built '{backend}' index over {len(knn._fit_X)} rows")
+    return index
@@ -0,0 +1,205 @@
+# ============================================================
+#  utils/prediction_cache.py — AckVision Prediction Cache
+#  LRU + TTL cache in front of the 4 model calls, so repeated
+#  student profiles (counsellor resubmits, retries, duplicate
+#  roster rows) skip inference entirely.
+#
+#  Key   → bytes of the scaled feature row (the normalized form
+#          of get_feature_array's inputs: "75", "75.0" and 75
+#          collide; a changed scaler/encoder changes the key)
+#  Scope → the live model version + config.KNN_BACKEND; the
+#          whole cache is dropped when either changes. Requests
+#          still pinned to an older model set bypass the cache, and
+#          results computed across a reload are not stored.
+#  Bound → PREDICTION_CACHE_MAX_ENTRIES and PREDICTION_CACHE_MAX_MB
+# ============================================================
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import config
+from utils import model_loader
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache of prediction dicts with per-entry expiry.
+
+    Usage:
+        cache  = PredictionCache(max_entries=100_000, max_bytes=64 << 20, ttl=3600)
+        result = cache.get(features)            # None on a miss
+        cache.put(features, result)
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float = None):
+        self.max_entries = int(max_entries)
+        self.max_bytes   = int(max_bytes)
+        self.ttl         = ttl
+        self._entries    = OrderedDict()     # key → (result, expires_at, n_bytes)
+        self._bytes      = 0
+        self._scope      = None
+        self._lock       = threading.Lock()
+        self._stats      = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    @staticmethod
+    def _current_scope() -> tuple:
+        return (model_loader.current().version, config.KNN_BACKEND)
+
+    @staticmethod
+    def active_scope() -> tuple:
+        """Scope of the model set the caller predicts with (pass it to put/put_many)."""
+        return (model_loader.active().version, config.KNN_BACKEND)
+
+    def _check_scope(self):
+        """Drops every entry when the models (or the KNN backend) changed. Needs _lock."""
+        scope = self._current_scope()
+        if scope != self._scope:
+            if self._entries:
+                self._stats["invalidations"] += 1
+            self._entries.clear()
+            self._bytes, self._scope = 0, scope
+
+    def clear(self):
+        """Drops every entry (model_loader calls this after installing a new set)."""
+        with self._lock:
+            if self._entries:
+                self._stats["invalidations"] += 1
+            self._entries.clear()
+            self._bytes, self._scope = 0, None
+
+    def get(self, features: np.ndarray):
+        """Returns a copy of the cached result for a (1, n_features) row, or None."""
+        return self.get_many([features.tobytes()])[0]
+
+    def get_many(self, keys: list) -> list:
+        """Looks up several row keys (feature bytes) under one lock; None for each miss."""
+        now, out = time.monotonic(), []
+        with self._lock:
+            self._check_scope()
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] is not None and entry[1] < now:
+                    self._drop(key)
+                    self._stats["expirations"] += 1
+                    entry = None
+                if entry is None:
+                    self._stats["misses"] += 1
+                    out.append(None)
+                else:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    out.append(dict(entry[0]))
+        return out
+
+    def put(self, features: np.ndarray, result: dict, scope: tuple = None):
+        self.put_many([features.tobytes()], [result], scope)
+
+    def put_many(self, keys: list, results: list, scope: tuple = None):
+        """
+        Stores several (row key, result) pairs under one lock, then evicts LRU
+        entries. `scope` is active_scope() taken before predicting: results of
+        a model set that was replaced meanwhile are not stored.
+        """
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._check_scope()
+            if scope is not None and scope != self._scope:
+                return
+            for key, result in zip(keys, results):
+                n_bytes = (sys.getsizeof(key) + sys.getsizeof(result)
+                           + sum(sys.getsizeof(v) for v in result.values()))
+                if key in self._entries:
+                    self._drop(key)
+                self._entries[key] = (dict(result), expires, n_bytes)
+                self._bytes += n_bytes
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._drop(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def _drop(self, key):
+        self._bytes -= self._entries.pop(key)[2]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate":    round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+                "entries":     len(self._entries),
+                "bytes":       self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes":   self.max_bytes,
+                "ttl_seconds": self.ttl,
+            }
+
+
+_cache = PredictionCache(
+    config.PREDICTION_CACHE_MAX_ENTRIES,
+    config.PREDICTION_CACHE_MAX_MB * 1024 * 1024,
+    config.PREDICTION_CACHE_TTL_SECONDS,
+)
+model_loader.on_reload(_cache.clear)
+
+
+def get_cache() -> PredictionCache:
+    return _cache
+
+
+def _usable() -> bool:
+    """False when disabled, or while the request is pinned to a replaced model set."""
+    return config.PREDICTION_CACHE_ENABLED and model_loader.active() is model_loader.current()
+
+
+def cached_predict(features: np.ndarray, predict) -> dict:
+    """
+    One-row lookup: returns the cached result for `features`, or calls
+    predict(features), stores and returns its result.
+    """
+    if not _usable():
+        return predict(features)
+    scope  = _cache.active_scope()
+    result = _cache.get(features)
+    if result is None:
+        result = predict(features)
+        _cache.put(features, result, scope)     # skipped if a reload landed meanwhile
+    return result
+
+
+def cached_predict_matrix(X: np.ndarray, predict_matrix) -> dict:
+    """
+    Batch lookup for a scaled (n_rows, n_features) matrix: only the rows
+    not in the cache (deduplicated) are passed to predict_matrix(X_missing).
+    Returns the same dict of equal-length lists as predict_matrix(X).
+    """
+    if not _usable() or len(X) == 0:
+        return predict_matrix(X)
+
+    scope   = _cache.active_scope()
+    keys    = [row.tobytes() for row in X]
+    results = _cache.get_many(keys)
+
+    first_seen = {}                    # key → index into the miss batch
+    miss_rows, miss_slot = [], []
+    for i, (key, result) in enumerate(zip(keys, results)):
+        if result is None:
+            if key not in first_seen:
+                first_seen[key] = len(miss_rows)
+                miss_rows.append(i)
+            miss_slot.append((i, first_seen[key]))
+
+    if miss_rows:
+        preds = predict_matrix(X[miss_rows])
+        fresh = [dict(zip(preds, values)) for values in zip(*preds.values())]
+        _cache.put_many([keys[i] for i in miss_rows], fresh, scope)   # skipped if a reload landed meanwhile
+        for i, j in miss_slot:
+            results[i] = fresh[j]
+
+    return {key: [r[key] for r in results] for key in results[0]}
+
+
+def stats() -> dict:
+    """Cache counters for /api/stats."""
+    return {"enabled": bool(config.PREDICTION_CACHE_ENABLED), **_cache.stats()}
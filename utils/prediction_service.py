@@ -8,7 +8,7 @@
 
 import numpy as np
 import config
-from utils import model_loader
+from utils.compiled_models import predictor
 from utils.preprocessing import get_feature_array
 
 
@@ -23,10 +23,7 @@ def predict_exam_score(form_data: dict) -> float:
         Predicted score as a float, rounded to 2 decimal places.
         Clamped to [0, 100] to avoid out-of-range outputs.
     """
-    features = get_feature_array(form_data)
-    model    = model_loader.get_linear()
-    score    = model.predict(features)[0]
-    return round(float(np.clip(score, 0, 100)), 2)
+    return exam_score_from_features(get_feature_array(form_data))
 
 
 def predict_pass_fail(form_data: dict) -> str:
@@ -39,10 +36,7 @@ def predict_pass_fail(form_data: dict) -> str:
     Returns:
         "Pass" or "Fail" (decoded using config.PASS_FAIL_LABELS)
     """
-    features   = get_feature_array(form_data)
-    model      = model_loader.get_decision_tree()
-    prediction = int(model.predict(features)[0])
-    return config.PASS_FAIL_LABELS.get(prediction, "Unknown")
+    return pass_fail_from_features(get_feature_array(form_data))
 
 
 def predict_performance(form_data: dict) -> str:
@@ -56,24 +50,42 @@ def predict_performance(form_data: dict) -> str:
         One of: "Excellent", "Good", "Average", "Poor"
         (decoded using config.PERFORMANCE_LABELS)
     """
-    features   = get_feature_array(form_data)
-    model      = model_loader.get_knn()
-    prediction = int(model.predict(features)[0])
+    return performance_from_features(get_feature_array(form_data))
+
+
+# ── Feature-level predictors ────────────────────────────────
+# Same models as above, but take an already-scaled feature array
+# (from get_feature_array) so callers can featurize once and reuse it.
+
+def exam_score_from_features(features: np.ndarray) -> float:
+    """Linear Regression on a scaled (1, n_features) array → clamped score."""
+    score = predictor("linear").predict(features)[0]
+    return round(float(np.clip(score, 0, 100)), 2)
+
+
+def pass_fail_from_features(features: np.ndarray) -> str:
+    """Decision Tree on a scaled (1, n_features) array → "Pass" / "Fail"."""
+    prediction = int(predictor("dt").predict(features)[0])
+    return config.PASS_FAIL_LABELS.get(prediction, "Unknown")
+
+
+def performance_from_features(features: np.ndarray) -> str:
+    """KNN on a scaled (1, n_features) array → performance label."""
+    prediction = int(predictor("knn").predict(features)[0])
     return config.PERFORMANCE_LABELS.get(prediction, "Unknown")
 
 
 def run_all_predictions(form_data: dict) -> dict:
     """
-    Convenience function — runs all three supervised predictions at once.
+    Convenience function — runs every model on one student at once.
+    Thin wrapper over utils.inference_pipeline, which featurizes the
+    input a single time and fans it out to all 4 models.
 
     Args:
-        form_data: dict with keys matching config.FEATURE_COLUMNS
+        form_data: dict with keys matching config.INPUT_KEYS
 
     Returns:
-        dict with keys: exam_score, pass_fail, performance
+        dict with keys: exam_score, pass_fail, performance, risk_cluster
     """
-    return {
-        "exam_score":  predict_exam_score(form_data),
-        "pass_fail":   predict_pass_fail(form_data),
-        "performance": predict_performance(form_data),
-    }
+    from utils.inference_pipeline import pipeline
+    return pipeline.run(form_data)
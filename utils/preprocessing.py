@@ -1,10 +1,11 @@
 import os
-import pandas as pd
 import numpy as np
 import joblib
 
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.model_selection import train_test_split
+# pandas / sklearn are imported inside the training + reference helpers only,
+# so the serving path (get_feature_array) starts without them.
+from utils import artifact_cache, dataset_store
+from utils.featurizer import get_featurizer
 
 # =========================================
 # Absolute Path Setup
@@ -13,26 +14,44 @@ BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 DATA_PATH = os.path.join(BASE_DIR, "data", "student_synthetic_data.csv")
 
 # =========================================
-# Global Objects
+# Training Objects (created on first use)
 # =========================================
-scaler = StandardScaler()
-participation_encoder = LabelEncoder()
-extra_encoder = LabelEncoder()
-pass_encoder = LabelEncoder()
-performance_encoder = LabelEncoder()
+_training_objects = None
+
+
+def get_training_objects() -> dict:
+    """
+    Returns the scaler + encoders that preprocess_and_split() fits:
+    {"scaler", "participation_encoder", "extra_encoder", "pass_encoder",
+    "performance_encoder"}. Created on the first call (sklearn is imported
+    then, not with this module); the same objects on every later call.
+    """
+    global _training_objects
+    if _training_objects is None:
+        from sklearn.preprocessing import StandardScaler, LabelEncoder
+        _training_objects = {
+            "scaler":                StandardScaler(),
+            "participation_encoder": LabelEncoder(),
+            "extra_encoder":         LabelEncoder(),
+            "pass_encoder":          LabelEncoder(),
+            "performance_encoder":   LabelEncoder(),
+        }
+    return _training_objects
 
 
 # =========================================
 # Load CSV + Handle Nulls
 # =========================================
 def load_data():
-    df = pd.read_csv(DATA_PATH)
+    # Memory-mapped columnar copy of the CSV (see utils/dataset_store.py)
+    df = dataset_store.load_frame(DATA_PATH)
 
-    # Fill numeric nulls
-    df.fillna(df.mean(numeric_only=True), inplace=True)
+    # Fill numeric nulls (not in place: filling the store's frame in
+    # place raises pandas dtype FutureWarnings on every call)
+    df = df.fillna(df.mean(numeric_only=True))
 
     # Fill categorical nulls
-    df.fillna("Medium", inplace=True)
+    df = df.fillna("Medium")
 
     return df
 
@@ -41,6 +60,14 @@ def load_data():
 # Train/Test Split Utility
 # =========================================
 def preprocess_and_split(test_size=0.2, random_state=42):
+    from sklearn.model_selection import train_test_split
+
+    objects               = get_training_objects()
+    scaler                = objects["scaler"]
+    participation_encoder = objects["participation_encoder"]
+    extra_encoder         = objects["extra_encoder"]
+    pass_encoder          = objects["pass_encoder"]
+    performance_encoder   = objects["performance_encoder"]
     df = load_data()
 
     # Encode categorical input features
@@ -94,8 +121,8 @@ def preprocess_and_split(test_size=0.2, random_state=42):
 # SCALER ACCESSOR (used by clustering_service & metrics_service)
 # =========================================
 def get_scaler():
-    """Returns the saved StandardScaler from models/scaler.pkl."""
-    return joblib.load(os.path.join(BASE_DIR, "models", "scaler.pkl"))
+    """Returns the saved StandardScaler from models/scaler.pkl (cached in memory)."""
+    return artifact_cache.get("scaler")
 
 
 # =========================================
@@ -104,11 +131,22 @@ def get_scaler():
 def get_feature_array(form_data: dict) -> np.ndarray:
     """
     Takes raw user input dict → returns scaled array ready for model.predict()
+    Uses the compiled, pandas-free featurizer (utils/featurizer.py).
+    """
+    return get_featurizer().transform(form_data)
+
+
+def get_feature_array_reference(form_data: dict) -> np.ndarray:
+    """
+    Reference implementation of get_feature_array() using pandas +
+    LabelEncoder.transform + StandardScaler.transform.
+    Kept for parity checks (tests/test_featurizer.py, benchmarks/bench_featurizer.py).
     """
+    import pandas as pd
 
-    scaler = joblib.load(os.path.join(BASE_DIR, "models", "scaler.pkl"))
-    participation_encoder = joblib.load(os.path.join(BASE_DIR, "models", "participation_encoder.pkl"))
-    extra_encoder = joblib.load(os.path.join(BASE_DIR, "models", "extra_encoder.pkl"))
+    scaler = artifact_cache.get("scaler")
+    participation_encoder = artifact_cache.get("participation_encoder")
+    extra_encoder = artifact_cache.get("extra_encoder")
 
     input_df = pd.DataFrame([{
         "Attendance (%)": float(form_data["attendance"]),
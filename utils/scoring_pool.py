@@ -0,0 +1,193 @@
+# ============================================================
+#  utils/scoring_pool.py — AckVision Parallel Batch Scoring
+#  A persistent process pool for the batch path, so a large
+#  roster is scored on every core instead of one:
+#    predict_matrix() splits the scaled feature matrix into
+#    shards, scores them in the pool (batch_service.predict_matrix
+#    in each process) and joins the results in row order.
+#
+#  Pool processes get their ModelSet once, in the initializer:
+#  loaded from disk in a fresh (spawned) process — not forked, as
+#  this process runs threads whose locks a fork could copy held.
+#  If the files on disk are already a newer version (retrain not
+#  yet hot-reloaded here), the process stays up but refuses its
+#  tasks with StaleModelsError and the caller scores them inline
+#  (result()). Tasks only carry the shard. There is one pool per model version; after
+#  a hot reload new work gets a new pool and the old one is
+#  shut down as soon as nothing uses it.
+#  Also used by the background jobs (utils/jobs.py).
+# ============================================================
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+import config
+from utils import model_loader
+
+# (model version, n_workers) → {"pool", "users"}
+_pools = {}
+_lock  = threading.Lock()
+_stats = {"parallel_calls": 0, "inline_calls": 0, "inline_fallbacks": 0, "shards": 0, "rows": 0}
+
+# Set in pool processes by _init_worker (_worker_stale instead when the pool's version is gone)
+_worker_models = None
+_worker_stale  = None
+
+
+class StaleModelsError(RuntimeError):
+    """A pool process could not load its pool's model version from disk."""
+
+
+def _init_worker(key):
+    """Pool initializer: pins the pool's ModelSet and builds its derived objects once."""
+    global _worker_models, _worker_stale
+    from utils import model_registry
+
+    try:
+        models = model_loader.load_set()
+        if models.version != key[0]:
+            raise RuntimeError(f"model files changed: pool is {key[0]}, disk has {models.version}")
+    except Exception as e:
+        # Raising here would break the whole pool; refuse tasks instead
+        _worker_stale = str(e)
+        print(f"[scoring_pool] ✗ Pool process {os.getpid()} has no models, its tasks run inline: {e}")
+        return
+    model_registry.warm(models)
+    _worker_models = models
+
+
+def worker_models():
+    """
+    The ModelSet of the pool process this runs in (None outside the pool).
+    Raises StaleModelsError in a pool process that could not load it.
+    """
+    if _worker_stale is not None:
+        raise StaleModelsError(_worker_stale)
+    return _worker_models
+
+
+def result(future, inline):
+    """future.result(), or inline() when the task hit a StaleModelsError."""
+    try:
+        return future.result()
+    except StaleModelsError:
+        with _lock:
+            _stats["inline_fallbacks"] += 1
+        return inline()
+
+
+def n_workers() -> int:
+    return config.SCORING_POOL_WORKERS or os.cpu_count() or 1
+
+
+@contextmanager
+def acquire(models=None, workers: int = None):
+    """
+    Yields the pool for `models` (default: the set in use), creating it on
+    first use. Pools of replaced model sets are shut down once released.
+
+    Usage:
+        with scoring_pool.acquire(models) as pool:
+            future = pool.submit(fn, ...)     # fn runs with worker_models() pinned
+    """
+    models = models or model_loader.active()
+    key    = (models.version, workers or n_workers())
+    with _lock:
+        entry = _pools.get(key)
+        if entry is None:
+            entry = _pools[key] = {
+                "pool": ProcessPoolExecutor(
+                    key[1], mp_context=multiprocessing.get_context(config.SCORING_POOL_START_METHOD),
+                    initializer=_init_worker, initargs=(key,),
+                ),
+                "users": 0,
+            }
+        entry["users"] += 1
+    try:
+        yield entry["pool"]
+    finally:
+        with _lock:
+            entry["users"] -= 1
+        _shutdown_idle()
+
+
+def _shutdown_idle():
+    """Shuts down unused pools whose model set is no longer the live one."""
+    live = model_loader.current()
+    with _lock:
+        stale = [k for k, e in _pools.items() if e["users"] == 0 and (live is None or k[0] != live.version)]
+        pools = [_pools.pop(k)["pool"] for k in stale]
+    for pool in pools:
+        pool.shutdown(wait=False)
+
+
+model_loader.on_reload(_shutdown_idle)
+
+
+def _predict_shard(X: np.ndarray) -> dict:
+    from utils import batch_service
+
+    with model_loader.pinned(worker_models()):
+        return batch_service.predict_matrix(X)
+
+
+def score_chunk(frame) -> tuple:
+    """
+    Pool task for whole chunks (score_students.py): runs
+    batch_service.score_columns on an app-style DataFrame and returns
+    (frame with the prediction columns added, advisory codes, stage timings).
+    The advice travels back as codes; the caller renders it when writing.
+    """
+    from utils import batch_service
+
+    timings = {}
+    with model_loader.pinned(worker_models()):
+        columns = batch_service.score_columns(frame, timings)
+    advice = columns.pop("advisory")
+    return frame.assign(**columns), advice, timings
+
+
+def predict_matrix(X: np.ndarray, workers: int = None) -> dict:
+    """
+    Same result as batch_service.predict_matrix(X), computed in the pool
+    when config.PARALLEL_SCORING is on and X has at least
+    PARALLEL_MIN_ROWS rows (inline otherwise, always inside the pool, and
+    for shards refused by a stale pool process).
+    """
+    from utils import batch_service
+
+    workers = workers or n_workers()
+    if (not config.PARALLEL_SCORING or _worker_models is not None
+            or workers < 2 or len(X) < config.PARALLEL_MIN_ROWS):
+        with _lock:
+            _stats["inline_calls"] += 1
+        return batch_service.predict_matrix(X)
+
+    n_shards = max(workers, -(-len(X) // config.PARALLEL_SHARD_ROWS))
+    bounds   = np.linspace(0, len(X), n_shards + 1).astype(int)
+    with acquire(workers=workers) as pool:
+        shards = [(pool.submit(_predict_shard, X[a:b]), X[a:b]) for a, b in zip(bounds[:-1], bounds[1:])]
+        out = {}
+        for future, shard in shards:            # submission order = row order
+            part = result(future, lambda: batch_service.predict_matrix(shard))
+            for key, values in part.items():
+                out.setdefault(key, []).extend(values)
+    with _lock:
+        _stats["parallel_calls"] += 1
+        _stats["shards"] += n_shards
+        _stats["rows"]   += len(X)
+    return out
+
+
+def stats() -> dict:
+    """Pool counters for /api/stats."""
+    with _lock:
+        return {
+            "enabled": bool(config.PARALLEL_SCORING),
+            **_stats,
+            "pools": [{"version": k[0], "workers": k[1], "users": e["users"]} for k, e in _pools.items()],
+        }
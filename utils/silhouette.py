@@ -0,0 +1,104 @@
+# ============================================================
+#  utils/silhouette.py — AckVision Silhouette Estimators
+#  The exact silhouette score is O(n²) in time, so it cannot be
+#  computed on large datasets. Modes:
+#    - exact    → sklearn.metrics.silhouette_score on every row
+#    - sampled  → exact silhouette on a fixed-seed random sample,
+#                 with a 95% confidence interval
+#    - centroid → simplified silhouette from KMeans.cluster_centers_
+#                 (distance to own vs. nearest other centroid), O(n·k);
+#                 a different measure — reads higher than exact, use it
+#                 for trends rather than absolute comparisons
+#    - auto     → exact up to SILHOUETTE_EXACT_MAX_ROWS, else sampled
+# ============================================================
+
+import numpy as np
+import config
+
+MODES = ("auto", "exact", "sampled", "centroid")
+
+
+def exact_silhouette(X, labels) -> dict:
+    """Full O(n²) silhouette score."""
+    from sklearn.metrics import silhouette_score
+    return {"score": float(silhouette_score(X, labels)), "mode": "exact"}
+
+
+def sampled_silhouette(X, labels, sample_size: int = None, seed: int = None) -> dict:
+    """
+    Silhouette on a random subsample of `sample_size` rows.
+    The per-point values give a normal-approximation 95% CI for the mean.
+    """
+    from sklearn.metrics import silhouette_samples
+
+    sample_size = sample_size or config.SILHOUETTE_SAMPLE_SIZE
+    seed        = config.SILHOUETTE_SEED if seed is None else seed
+    n           = len(X)
+
+    if sample_size < n:
+        idx = np.random.RandomState(seed).choice(n, sample_size, replace=False)
+        X, labels = X[idx], np.asarray(labels)[idx]
+
+    values = silhouette_samples(X, labels)
+    mean   = float(values.mean())
+    half   = 1.96 * float(values.std(ddof=1)) / np.sqrt(len(values))
+    return {
+        "score":       mean,
+        "mode":        "sampled",
+        "sample_size": int(len(values)),
+        "seed":        int(seed),
+        "ci95":        [mean - half, mean + half],
+    }
+
+
+def centroid_silhouette(X, labels, centers) -> dict:
+    """
+    Simplified silhouette: a = distance to the assigned centroid,
+    b = distance to the nearest other centroid, s = (b − a) / max(a, b).
+    """
+    centers = np.asarray(centers, dtype=np.float64)
+    labels  = np.asarray(labels)
+    # Squared distances via ‖x‖² − 2x·c + ‖c‖², then sqrt — O(n·k) memory
+    d2 = (
+        np.einsum("ij,ij->i", X, X)[:, None]
+        - 2.0 * X @ centers.T
+        + np.einsum("ij,ij->i", centers, centers)[None, :]
+    )
+    dist = np.sqrt(np.maximum(d2, 0.0))
+
+    rows  = np.arange(len(X))
+    a     = dist[rows, labels]
+    dist[rows, labels] = np.inf
+    b     = dist.min(axis=1)
+    denom = np.maximum(a, b)
+    s     = np.divide(b - a, denom, out=np.zeros_like(a), where=denom > 0)
+    return {"score": float(s.mean()), "mode": "centroid"}
+
+
+def silhouette(X, labels, mode: str = None, centers=None) -> dict:
+    """
+    Dispatches to one of the estimators above.
+
+    Args:
+        X       : scaled feature matrix
+        labels  : cluster id per row
+        mode    : one of MODES (defaults to config.SILHOUETTE_MODE)
+        centers : KMeans.cluster_centers_, required for mode="centroid"
+
+    Returns:
+        dict with at least "score" and "mode" (the mode actually used)
+    """
+    mode = mode or config.SILHOUETTE_MODE
+    if mode not in MODES:
+        raise ValueError(f"Unknown silhouette mode '{mode}'. Use one of {MODES}.")
+
+    if mode == "auto":
+        mode = "exact" if len(X) <= config.SILHOUETTE_EXACT_MAX_ROWS else "sampled"
+
+    if mode == "exact":
+        return exact_silhouette(X, labels)
+    if mode == "sampled":
+        return sampled_silhouette(X, labels)
+    if centers is None:
+        raise ValueError("mode='centroid' needs the fitted cluster centers.")
+    return centroid_silhouette(X, labels, centers)
@@ -0,0 +1,558 @@
+# ============================================================
+#  utils/training.py — AckVision Training Stages
+#  Building blocks for train_models.py:
+#    - prepare()      → encoders + scaler + ONE scaled matrix and
+#                       train/test split, stored as .npy files
+#    - fit_model()    → fits one of the 4 models on that matrix
+#                       (runs in a worker process)
+#    - publish()      → copies results into models/*.pkl, only
+#                       touching files whose bytes changed
+#    - stream_fit()   → all of the above in bounded memory, reading
+#                       the CSV in chunks (datasets larger than RAM)
+#  Every stage output lives in a content-addressed cache
+#  (config.TRAIN_CACHE_DIR): its key hashes the stage inputs
+#  (dataset fingerprint, hyperparameters, sklearn version), so
+#  an unchanged stage is loaded instead of recomputed.
+# ============================================================
+
+import hashlib
+import importlib.metadata
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import config
+from utils import artifact_cache, dataset_store
+
+# Files written to models/ — registry key → path
+MODEL_OUTPUTS = {
+    "linear": config.LINEAR_MODEL_PATH,
+    "dt":     config.DT_MODEL_PATH,
+    "knn":    config.KNN_MODEL_PATH,
+    "kmeans": config.KMEANS_MODEL_PATH,
+}
+PREP_OUTPUTS = {
+    "scaler":                config.SCALER_PATH,
+    "participation_encoder": config.PARTICIPATION_ENCODER_PATH,
+    "extra_encoder":         config.EXTRA_ENCODER_PATH,
+    "pass_encoder":          config.PASS_ENCODER_PATH,
+    "performance_encoder":   config.PERFORMANCE_ENCODER_PATH,
+}
+RISK_MAP_PATH = os.path.join(config.BASE_DIR, "models", "risk_map.pkl")
+
+# Bump when a stage's code changes in a way that changes its output
+STAGE_REVISION = 3
+
+
+def stage_key(*parts) -> str:
+    """Content address of a stage: sha256 over its JSON-serialised inputs."""
+    sklearn_version = importlib.metadata.version("scikit-learn")     # without importing sklearn
+    payload = json.dumps([STAGE_REVISION, sklearn_version, *parts], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def save(obj, path):
+    """
+    joblib.dump to a temp file, then rename over `path`. Running workers may
+    have the old file memory-mapped (config.MODEL_MMAP_MODE) — truncating it
+    in place would crash them, a rename leaves their mapping intact.
+    """
+    tmp = f"{path}.tmp-{os.getpid()}"
+    joblib.dump(obj, tmp)
+    os.replace(tmp, path)
+
+
+def cache_path(name: str) -> str:
+    return os.path.join(config.TRAIN_CACHE_DIR, name)
+
+
+def cache_hit(path: str, *siblings) -> bool:
+    """True if a cache entry exists; bumps its (and its siblings') mtime so pruning keeps them."""
+    if not os.path.exists(path):
+        return False
+    for p in (path, *siblings):
+        if os.path.exists(p):
+            os.utime(p)
+    return True
+
+
+# ── Stage 1: shared preprocessing ───────────────────────────
+
+def prepare(data_path: str = None, force: bool = False, split: str = "random") -> dict:
+    """
+    Fits the encoders + scaler and writes the scaled matrix, targets and
+    train/test indices once. Returns {"key", "dir", "status", "rows", "classes"}
+    (classes = encoder name → its classes_, so callers need not unpickle them).
+    Same encoding, scaling and split as the original training script;
+    split="hash" holds out the rows stream_fit() holds out instead, so an
+    in-memory baseline is evaluated on the same rows as a streaming run.
+    """
+    if split not in ("random", "hash"):
+        raise ValueError(f"Unknown split '{split}'. Use 'random' or 'hash'.")
+    data_path = data_path or config.DATA_PATH
+    key = stage_key("prepare", artifact_cache.fingerprint([data_path]),
+                    config.FEATURE_COLUMNS, config.TRAIN_TEST_SIZE, config.TRAIN_RANDOM_STATE, split)
+    out = cache_path(f"prepare-{key}")
+    if not force and cache_hit(out):
+        with open(os.path.join(out, "meta.json")) as fh:
+            meta = json.load(fh)
+        return {"key": key, "dir": out, "status": "cached", "rows": meta["rows"], "classes": meta["classes"]}
+
+    from sklearn.preprocessing import StandardScaler, LabelEncoder
+    from sklearn.model_selection import train_test_split
+
+    df = dataset_store.load_frame(data_path)
+    encoders = {
+        "participation_encoder": ("Participation Level",  LabelEncoder()),
+        "extra_encoder":         ("Extra Curricular",     LabelEncoder()),
+        "pass_encoder":          ("Pass/Fail",            LabelEncoder()),
+        "performance_encoder":   ("Performance Category", LabelEncoder()),
+    }
+    for column, encoder in encoders.values():
+        df[column] = encoder.fit_transform(df[column])
+
+    scaler   = StandardScaler()
+    X_scaled = scaler.fit_transform(df[config.FEATURE_COLUMNS])
+    if split == "hash":
+        test = _is_test(np.arange(len(df)))
+        train_idx, test_idx = np.flatnonzero(~test), np.flatnonzero(test)
+    else:
+        train_idx, test_idx = train_test_split(
+            np.arange(len(df)), test_size=config.TRAIN_TEST_SIZE, random_state=config.TRAIN_RANDOM_STATE,
+        )
+
+    os.makedirs(config.TRAIN_CACHE_DIR, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=config.TRAIN_CACHE_DIR, prefix=".building-")
+    try:
+        arrays = {
+            "X_scaled":  X_scaled,
+            "X_encoded": df[config.FEATURE_COLUMNS].to_numpy(dtype=np.float64),
+            "y_score":   df["Final Exam Score"].to_numpy(dtype=np.float64),
+            "y_pass":    df["Pass/Fail"].to_numpy(),
+            "y_perf":    df["Performance Category"].to_numpy(),
+            "train_idx": train_idx,
+            "test_idx":  test_idx,
+        }
+        for name, values in arrays.items():
+            np.save(os.path.join(tmp, f"{name}.npy"), values)
+        joblib.dump(scaler, os.path.join(tmp, "scaler.pkl"))
+        for name, (_, encoder) in encoders.items():
+            joblib.dump(encoder, os.path.join(tmp, f"{name}.pkl"))
+        classes = {name: [str(c) for c in encoder.classes_] for name, (_, encoder) in encoders.items()}
+        with open(os.path.join(tmp, "meta.json"), "w") as fh:
+            json.dump({"rows": len(df), "data_path": data_path, "classes": classes}, fh)
+        shutil.rmtree(out, ignore_errors=True)
+        os.replace(tmp, out)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return {"key": key, "dir": out, "status": "fitted", "rows": len(df), "classes": classes}
+
+
+def load_prepared(prep_dir: str) -> dict:
+    """The prepared arrays, memory-mapped (shared by every worker process)."""
+    return {
+        name: np.load(os.path.join(prep_dir, f"{name}.npy"), mmap_mode="r")
+        for name in ("X_scaled", "X_encoded", "y_score", "y_pass", "y_perf", "train_idx", "test_idx")
+    }
+
+
+# ── Stage 2: one model per worker ───────────────────────────
+
+def model_key(name: str, prep_key: str) -> str:
+    return stage_key("fit", name, prep_key, config.MODEL_PARAMS[name])
+
+
+def build_estimator(name: str, params: dict = None):
+    """Unfitted estimator for a registry key with config.MODEL_PARAMS (or `params`)."""
+    params = config.MODEL_PARAMS[name] if params is None else params
+    if name == "linear":
+        from sklearn.linear_model import LinearRegression
+        return LinearRegression(**params)
+    if name == "dt":
+        from sklearn.tree import DecisionTreeClassifier
+        return DecisionTreeClassifier(**params)
+    if name == "knn":
+        from sklearn.neighbors import KNeighborsClassifier
+        return KNeighborsClassifier(**params)
+    if name == "kmeans":
+        from sklearn.cluster import KMeans
+        return KMeans(**params)
+    raise ValueError(f"Unknown model '{name}'.")
+
+
+def fit_model(name: str, prep_dir: str, key: str) -> dict:
+    """
+    Fits model `name` on the prepared matrix and stores it as
+    TRAIN_CACHE_DIR/<name>-<key>.pkl with its test metrics alongside.
+    Module-level so ProcessPoolExecutor can pickle it.
+    """
+    from sklearn.metrics import mean_absolute_error, r2_score, accuracy_score, classification_report
+
+    started = time.perf_counter()
+    data    = load_prepared(prep_dir)
+    X, tr, te = data["X_scaled"], data["train_idx"], data["test_idx"]
+    X_train, X_test = X[tr], X[te]
+    model   = build_estimator(name)
+    metrics, extra = {}, {}
+
+    if name == "linear":
+        model.fit(X_train, data["y_score"][tr])
+        pred = model.predict(X_test)
+        metrics = {"mae": mean_absolute_error(data["y_score"][te], pred), "r2": r2_score(data["y_score"][te], pred)}
+    elif name == "dt":
+        model.fit(X_train, data["y_pass"][tr])
+        pred = model.predict(X_test)
+        classes = joblib.load(os.path.join(prep_dir, "pass_encoder.pkl")).classes_
+        metrics = {
+            "accuracy": accuracy_score(data["y_pass"][te], pred),
+            "report":   classification_report(data["y_pass"][te], pred, target_names=classes),
+        }
+    elif name == "knn":
+        model.fit(X_train, data["y_perf"][tr])
+        metrics = {"accuracy": accuracy_score(data["y_perf"][te], model.predict(X_test))}
+    elif name == "kmeans":
+        model.fit(np.asarray(X))
+        # Map clusters by mean score (0=lowest→High Risk, 2=highest→Low Risk)
+        y_score = data["y_score"]
+        cluster_means = {int(c): float(y_score[model.labels_ == c].mean()) for c in range(model.n_clusters)}
+        ordered = sorted(cluster_means, key=cluster_means.get)      # low→high score
+        extra["risk_map"] = {ordered[0]: 2, ordered[1]: 1, ordered[2]: 0}
+        metrics = {"cluster_means": cluster_means, "risk_map": extra["risk_map"]}
+
+    os.makedirs(config.TRAIN_CACHE_DIR, exist_ok=True)
+    save(model, cache_path(f"{name}-{key}.pkl"))
+    if extra:
+        save(extra, cache_path(f"{name}-{key}.extra.pkl"))
+    with open(cache_path(f"{name}-{key}.json"), "w") as fh:
+        json.dump(metrics, fh, default=float)
+    return {"name": name, "key": key, "status": "fitted", "seconds": time.perf_counter() - started}
+
+
+def cached_model(name: str, key: str):
+    """Returns the cached stage result for (name, key), or None when it must be fitted."""
+    path = cache_path(f"{name}-{key}.pkl")
+    if not cache_hit(path, cache_path(f"{name}-{key}.json"), cache_path(f"{name}-{key}.extra.pkl")):
+        return None
+    return {"name": name, "key": key, "status": "cached", "seconds": 0.0}
+
+
+def model_metrics(name: str, key: str) -> dict:
+    with open(cache_path(f"{name}-{key}.json")) as fh:
+        return json.load(fh)
+
+
+# ── Stage 3: publish into models/ ───────────────────────────
+
+def _same_bytes(a: str, b: str) -> bool:
+    return os.path.exists(b) and artifact_cache.file_hash(a) == artifact_cache.file_hash(b)
+
+
+def _copy(src: str, dst: str) -> bool:
+    """Atomic copy; skipped (False) when dst already holds the same bytes."""
+    if _same_bytes(src, dst):
+        return False
+    tmp = f"{dst}.tmp-{os.getpid()}"
+    shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+    return True
+
+
+def publish(prep_dir: str, model_keys: dict) -> dict:
+    """
+    Copies the prepared encoders/scaler and the fitted models into models/.
+    Unchanged files are left alone (no spurious hot reload). Also persists
+    the KNN neighbour index for config.KNN_BACKEND.
+    Returns {path: "written" | "unchanged"}.
+    """
+    written = {}
+    for name, path in PREP_OUTPUTS.items():
+        written[path] = _copy(os.path.join(prep_dir, f"{name}.pkl"), path)
+    for name, key in model_keys.items():
+        written[MODEL_OUTPUTS[name]] = _copy(cache_path(f"{name}-{key}.pkl"), MODEL_OUTPUTS[name])
+
+    # Save risk map so app can use proper cluster→label mapping
+    risk_map = joblib.load(cache_path(f"kmeans-{model_keys['kmeans']}.extra.pkl"))["risk_map"]
+    try:
+        unchanged = joblib.load(RISK_MAP_PATH) == risk_map
+    except FileNotFoundError:
+        unchanged = False
+    if not unchanged:
+        save(risk_map, RISK_MAP_PATH)
+    written[RISK_MAP_PATH] = not unchanged
+
+    # Persist the KNN neighbour index for the configured backend
+    if config.KNN_BACKEND != "sklearn":
+        written[config.KNN_INDEX_PATH] = _publish_knn_index(model_keys["knn"])
+    return {path: ("written" if w else "unchanged") for path, w in written.items()}
+
+
+def _publish_knn_index(knn_key: str) -> bool:
+    """Builds the index once per (knn model, backend) in the cache, then copies it like the models."""
+    from utils import neighbors
+
+    cached = cache_path(f"knn_index-{config.KNN_BACKEND}-{knn_key}.pkl")
+    if not cache_hit(cached):
+        index = neighbors.index_from_knn(joblib.load(cache_path(f"knn-{knn_key}.pkl")), config.KNN_BACKEND)
+        index.source_fingerprint = artifact_cache.fingerprint([config.KNN_MODEL_PATH])
+        save(index, cached)
+    return _copy(cached, config.KNN_INDEX_PATH)
+
+
+def prune_cache(max_age_days: float = None):
+    """Deletes cache entries not used (hit or written) for max_age_days."""
+    max_age_days = config.TRAIN_CACHE_MAX_AGE_DAYS if max_age_days is None else max_age_days
+    if not os.path.isdir(config.TRAIN_CACHE_DIR):
+        return 0
+    cutoff, removed = time.time() - max_age_days * 86400, 0
+    for entry in os.listdir(config.TRAIN_CACHE_DIR):
+        path = os.path.join(config.TRAIN_CACHE_DIR, entry)
+        if os.path.getmtime(path) < cutoff:
+            shutil.rmtree(path) if os.path.isdir(path) else os.remove(path)
+            removed += 1
+    return removed
+
+
+# ── Streaming mode: datasets larger than RAM ────────────────
+# config.TRAIN_MODE = "stream" (or train_models.py --stream) reads the
+# CSV in TRAIN_CHUNK_ROWS chunks over a few passes; peak memory is one
+# chunk + the TRAIN_STREAM_SAMPLE_ROWS reservoir, whatever the file size.
+#   pass 1    → encoder classes
+#   pass 2    → StandardScaler.partial_fit
+#   pass 3    → normal equations for the regression (exact OLS),
+#               reservoir sample for the tree + KNN, first KMeans epoch
+#   pass 3+i  → further MiniBatchKMeans epochs
+#   last pass → test metrics + cluster score means for the risk map
+# The train/test split hashes the row number, so it does not depend on
+# the chunk size (it is not the same split as train_test_split).
+
+_CATEGORICAL = {
+    "participation_encoder": "Participation Level",
+    "extra_encoder":         "Extra Curricular",
+    "pass_encoder":          "Pass/Fail",
+    "performance_encoder":   "Performance Category",
+}
+
+
+def _row_hash(rows: np.ndarray, seed: int) -> np.ndarray:
+    """splitmix64 of (row number, seed) → uniform floats in [0, 1)."""
+    with np.errstate(over="ignore"):
+        z = rows.astype(np.uint64) + np.uint64(seed) * np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z ^= z >> np.uint64(31)
+    return (z >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+
+def _chunks(data_path: str, encoders: dict = None, scaler=None):
+    """
+    Yields (row numbers, chunk) over the CSV. With `encoders`, categorical
+    columns are encoded in place; with `scaler` too, chunk["X"] holds the
+    scaled feature matrix.
+    """
+    import pandas as pd
+
+    start = 0
+    for df in pd.read_csv(data_path, chunksize=config.TRAIN_CHUNK_ROWS):
+        rows = np.arange(start, start + len(df))
+        start += len(df)
+        if encoders:
+            for name, column in _CATEGORICAL.items():
+                df[column] = encoders[name].transform(df[column])
+        chunk = {"df": df}
+        if scaler is not None:
+            chunk["X"] = scaler.transform(df[config.FEATURE_COLUMNS])
+        yield rows, chunk
+
+
+def _is_test(rows: np.ndarray) -> np.ndarray:
+    return _row_hash(rows, config.TRAIN_RANDOM_STATE) < config.TRAIN_TEST_SIZE
+
+
+def _keep_sample(sample: dict, rows, X, df, mask):
+    """Reservoir by random priority: keeps the TRAIN_STREAM_SAMPLE_ROWS lowest-priority training rows."""
+    fresh = {
+        "priority": _row_hash(rows[mask], config.TRAIN_RANDOM_STATE + 1),
+        "X":        X[mask],
+        "y_pass":   df["Pass/Fail"].to_numpy()[mask],
+        "y_perf":   df["Performance Category"].to_numpy()[mask],
+    }
+    merged = {k: np.concatenate([sample[k], fresh[k]]) if sample else fresh[k] for k in fresh}
+    if len(merged["priority"]) > config.TRAIN_STREAM_SAMPLE_ROWS:
+        keep   = np.argpartition(merged["priority"], config.TRAIN_STREAM_SAMPLE_ROWS - 1)[:config.TRAIN_STREAM_SAMPLE_ROWS]
+        merged = {k: v[keep] for k, v in merged.items()}
+    return merged
+
+
+def _report_from_confusion(confusion: np.ndarray, classes) -> str:
+    """classification_report text from an accumulated confusion matrix."""
+    from sklearn.metrics import classification_report
+
+    k = len(classes)
+    report = classification_report(
+        np.repeat(np.arange(k), k), np.tile(np.arange(k), k),
+        labels=np.arange(k), target_names=classes, sample_weight=confusion.ravel(),
+    )
+    # Weighted supports print as "161.0"; show them as the counts they are
+    return re.sub(r"(\s+)(\d+)\.0$", r"  \1\2", report, flags=re.M)
+
+
+def stream_key(data_path: str = None) -> str:
+    """Content address of a streaming run (every model is fitted in the same passes)."""
+    data_path = data_path or config.DATA_PATH
+    return stage_key(
+        "stream", artifact_cache.fingerprint([data_path]), config.FEATURE_COLUMNS, config.MODEL_PARAMS,
+        config.TRAIN_TEST_SIZE, config.TRAIN_RANDOM_STATE, config.TRAIN_CHUNK_ROWS,
+        config.TRAIN_STREAM_SAMPLE_ROWS, config.TRAIN_STREAM_KMEANS_EPOCHS, config.TRAIN_STREAM_KMEANS_BATCH,
+    )
+
+
+def stream_fit(data_path: str = None, force: bool = False) -> dict:
+    """
+    Out-of-core version of prepare() + fit_model() for every model. Writes
+    the same cache layout (a prepare-style dir + <name>-<key>.pkl/.json),
+    so publish(result["dir"], {name: result["key"]}) works unchanged.
+    Returns {"key", "dir", "status", "rows", "classes", "seconds", "passes"}.
+
+    The scaler, the regression (normal equations) and KMeans (MiniBatchKMeans,
+    whose inertia_ is recomputed over every row in the last pass) see all
+    training rows. The decision tree and KNN have no incremental fit: they are
+    fitted on a reservoir sample of at most config.TRAIN_STREAM_SAMPLE_ROWS
+    training rows (reported as "sample_rows" in their metrics).
+    """
+    data_path = data_path or config.DATA_PATH
+    key = stream_key(data_path)
+    out = cache_path(f"stream-{key}")
+    if not force and cache_hit(out, *(cache_path(f"{name}-{key}{ext}") for name in MODEL_OUTPUTS
+                                 for ext in (".pkl", ".json", ".extra.pkl"))):
+        with open(os.path.join(out, "meta.json")) as fh:
+            meta = json.load(fh)
+        return {"key": key, "dir": out, "status": "cached", "seconds": 0.0, **meta}
+
+    from sklearn.preprocessing import StandardScaler, LabelEncoder
+    from sklearn.linear_model import LinearRegression
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.metrics import accuracy_score
+
+    started, passes = time.perf_counter(), 0
+
+    # Pass 1: encoder classes (LabelEncoder.fit = sorted unique values)
+    values = {name: set() for name in _CATEGORICAL}
+    n_rows = 0
+    for rows, chunk in _chunks(data_path):
+        n_rows += len(rows)
+        for name, column in _CATEGORICAL.items():
+            values[name].update(chunk["df"][column].unique())
+    passes += 1
+    encoders = {}
+    for name, seen in values.items():
+        encoders[name] = LabelEncoder()
+        encoders[name].classes_ = np.array(sorted(seen), dtype=object)
+
+    # Pass 2: scaler statistics
+    scaler = StandardScaler()
+    for rows, chunk in _chunks(data_path, encoders):
+        scaler.partial_fit(chunk["df"][config.FEATURE_COLUMNS])
+    passes += 1
+
+    # Pass 3: normal equations + reservoir sample + first KMeans epoch
+    n_feat  = len(config.FEATURE_COLUMNS)
+    gram    = np.zeros((n_feat + 1, n_feat + 1))
+    moment  = np.zeros(n_feat + 1)
+    sample  = {}
+    kmeans  = MiniBatchKMeans(batch_size=config.TRAIN_STREAM_KMEANS_BATCH, **config.MODEL_PARAMS["kmeans"])
+    batch   = config.TRAIN_STREAM_KMEANS_BATCH
+
+    def kmeans_epoch(X):
+        for s in range(0, len(X), batch):
+            kmeans.partial_fit(X[s:s + batch])
+
+    for rows, chunk in _chunks(data_path, encoders, scaler):
+        X, df = chunk["X"], chunk["df"]
+        train = ~_is_test(rows)
+        A = np.column_stack([X[train], np.ones(train.sum())])
+        gram   += A.T @ A
+        moment += A.T @ df["Final Exam Score"].to_numpy(dtype=np.float64)[train]
+        sample  = _keep_sample(sample, rows, X, df, train)
+        kmeans_epoch(X)
+    passes += 1
+    for _ in range(config.TRAIN_STREAM_KMEANS_EPOCHS - 1):
+        for rows, chunk in _chunks(data_path, encoders, scaler):
+            kmeans_epoch(chunk["X"])
+        passes += 1
+
+    linear = LinearRegression(**config.MODEL_PARAMS["linear"])
+    solution = np.linalg.lstsq(gram, moment, rcond=None)[0]
+    linear.coef_, linear.intercept_ = solution[:-1], float(solution[-1])
+    linear.n_features_in_ = n_feat
+
+    dt  = build_estimator("dt").fit(sample["X"], sample["y_pass"])
+    knn = build_estimator("knn").fit(sample["X"], sample["y_perf"])
+
+    # Last pass: held-out metrics + KMeans cluster score means and inertia over every row
+    pass_classes = list(encoders["pass_encoder"].classes_)
+    k            = kmeans.n_clusters
+    confusion    = np.zeros((len(pass_classes), len(pass_classes)))
+    lin          = {"n": 0, "abs": 0.0, "sse": 0.0, "sum": 0.0, "sq": 0.0}
+    knn_hits     = 0
+    inertia      = 0.0
+    score_sum, score_n = np.zeros(k), np.zeros(k)
+    for rows, chunk in _chunks(data_path, encoders, scaler):
+        X, df = chunk["X"], chunk["df"]
+        y     = df["Final Exam Score"].to_numpy(dtype=np.float64)
+        test  = _is_test(rows)
+        if test.any():
+            err = y[test] - linear.predict(X[test])
+            lin["n"]   += int(test.sum())
+            lin["abs"] += float(np.abs(err).sum())
+            lin["sse"] += float(err @ err)
+            lin["sum"] += float(y[test].sum())
+            lin["sq"]  += float(y[test] @ y[test])
+            np.add.at(confusion, (df["Pass/Fail"].to_numpy()[test], dt.predict(X[test])), 1)
+            knn_hits += int((knn.predict(X[test]) == df["Performance Category"].to_numpy()[test]).sum())
+        labels = kmeans.predict(X)
+        score_sum += np.bincount(labels, weights=y, minlength=k)
+        score_n   += np.bincount(labels, minlength=k)
+        inertia   += float(((X - kmeans.cluster_centers_[labels]) ** 2).sum())
+    passes += 1
+    kmeans.inertia_ = inertia      # partial_fit leaves the last mini-batch's value
+
+    cluster_means = {c: float(score_sum[c] / score_n[c]) for c in range(k)}
+    ordered  = sorted(cluster_means, key=cluster_means.get)      # low→high score
+    risk_map = {ordered[0]: 2, ordered[1]: 1, ordered[2]: 0}
+    sst      = lin["sq"] - lin["sum"] ** 2 / lin["n"]
+    n_test   = lin["n"]
+    metrics = {
+        "linear": {"mae": lin["abs"] / n_test, "r2": 1.0 - lin["sse"] / sst},
+        "dt":     {"accuracy": float(np.trace(confusion) / n_test),
+                   "report":   _report_from_confusion(confusion, pass_classes),
+                   "sample_rows": len(sample["X"])},
+        "knn":    {"accuracy": knn_hits / n_test, "sample_rows": len(sample["X"])},
+        "kmeans": {"cluster_means": cluster_means, "risk_map": risk_map},
+    }
+
+    os.makedirs(config.TRAIN_CACHE_DIR, exist_ok=True)
+    for name, model in (("linear", linear), ("dt", dt), ("knn", knn), ("kmeans", kmeans)):
+        save(model, cache_path(f"{name}-{key}.pkl"))
+        with open(cache_path(f"{name}-{key}.json"), "w") as fh:
+            json.dump(metrics[name], fh, default=float)
+    save({"risk_map": risk_map}, cache_path(f"kmeans-{key}.extra.pkl"))
+
+    classes = {name: [str(c) for c in encoder.classes_] for name, encoder in encoders.items()}
+    meta    = {"rows": n_rows, "classes": classes, "passes": passes}
+    tmp = tempfile.mkdtemp(dir=config.TRAIN_CACHE_DIR, prefix=".building-")
+    try:
+        joblib.dump(scaler, os.path.join(tmp, "scaler.pkl"))
+        for name, encoder in encoders.items():
+            joblib.dump(encoder, os.path.join(tmp, f"{name}.pkl"))
+        with open(os.path.join(tmp, "meta.json"), "w") as fh:
+            json.dump({**meta, "data_path": data_path}, fh)
+        shutil.rmtree(out, ignore_errors=True)
+        os.replace(tmp, out)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return {"key": key, "dir": out, "status": "fitted", "seconds": time.perf_counter() - started, **meta}
@@ -0,0 +1,214 @@
+# ============================================================
+#  utils/tuning.py — AckVision Hyperparameter Search
+#  Cross-validated grid / random search over config.TUNE_GRID
+#  (python train_models.py tune):
+#    - folds()      → K folds over the training split; each
+#                     fold's scaler is fitted on its own train
+#                     part and the scaled matrices are cached
+#    - run_trial()  → one (model, params, fold) in a worker
+#                     process: score + fit time + latency of the
+#                     predictor the app would serve it with
+#    - search()     → every trial across a process pool, cached
+#                     per trial, aggregated per parameter set
+#    - frontier()   → the candidates no other one beats on both
+#                     score and single-row latency
+# ============================================================
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import config
+from utils import training
+
+# What each model is scored on (higher is better)
+SCORING = {
+    "linear": "r2",
+    "dt":     "accuracy",
+    "knn":    "accuracy",
+    "kmeans": "silhouette",
+}
+TARGETS = {"linear": "y_score", "dt": "y_pass", "knn": "y_perf", "kmeans": None}
+
+
+# ── Folds (preprocessing cached per fold) ───────────────────
+
+def folds(prep: dict, n_folds: int = None) -> list:
+    """
+    Splits the training rows of a prepare() result into n_folds folds and
+    writes, per fold, the rows and the matrices scaled by a scaler fitted on
+    that fold's train part only. Returns the fold directories.
+    """
+    from sklearn.model_selection import KFold
+    from sklearn.preprocessing import StandardScaler
+
+    n_folds = n_folds or config.TUNE_FOLDS
+    data    = training.load_prepared(prep["dir"])
+    rows    = np.asarray(data["train_idx"])
+    out     = []
+    splits  = KFold(n_folds, shuffle=True, random_state=config.TRAIN_RANDOM_STATE).split(rows)
+    for i, (fit_pos, val_pos) in enumerate(splits):
+        key  = training.stage_key("fold", prep["key"], n_folds, i, config.TRAIN_RANDOM_STATE)
+        path = training.cache_path(f"fold-{key}")
+        out.append(path)
+        if training.cache_hit(path):
+            continue
+        fit_rows, val_rows = rows[fit_pos], rows[val_pos]
+        scaler = StandardScaler().fit(data["X_encoded"][fit_rows])
+        os.makedirs(path + ".tmp", exist_ok=True)
+        np.save(os.path.join(path + ".tmp", "fit_rows.npy"), fit_rows)
+        np.save(os.path.join(path + ".tmp", "val_rows.npy"), val_rows)
+        np.save(os.path.join(path + ".tmp", "X_fit.npy"), scaler.transform(data["X_encoded"][fit_rows]))
+        np.save(os.path.join(path + ".tmp", "X_val.npy"), scaler.transform(data["X_encoded"][val_rows]))
+        os.replace(path + ".tmp", path)
+    return out
+
+
+# ── One trial (runs in a worker process) ────────────────────
+
+def _serving_predictor(name: str, model):
+    """What compiled_models.predictor() would serve this model with."""
+    from utils import compiled_models, neighbors
+
+    if name == "knn" and config.KNN_BACKEND != "sklearn":
+        return neighbors.index_from_knn(model, config.KNN_BACKEND)
+    if config.COMPILED_INFERENCE and name in compiled_models._COMPILERS:
+        return compiled_models._COMPILERS[name](model)
+    return model
+
+
+def _latency_us(predict, X: np.ndarray, repeats: int) -> float:
+    """Median wall time of predict() on a single row, in µs."""
+    times = []
+    for i in range(repeats):
+        row = X[i % len(X):i % len(X) + 1]
+        t0  = time.perf_counter()
+        predict(row)
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times) * 1e6)
+
+
+def run_trial(name: str, params: dict, prep_dir: str, fold_dir: str) -> dict:
+    """
+    Fits `name` with `params` on one fold and returns its validation score,
+    fit time, batch predict time per row and single-row serving latency.
+    Module-level so ProcessPoolExecutor can pickle it.
+    """
+    from sklearn.metrics import accuracy_score, r2_score
+    from utils.silhouette import silhouette
+
+    data  = training.load_prepared(prep_dir)
+    X_fit = np.load(os.path.join(fold_dir, "X_fit.npy"))
+    X_val = np.load(os.path.join(fold_dir, "X_val.npy"))
+    model = training.build_estimator(name, params)
+
+    t0 = time.perf_counter()
+    if TARGETS[name] is None:
+        model.fit(X_fit)
+    else:
+        model.fit(X_fit, data[TARGETS[name]][np.load(os.path.join(fold_dir, "fit_rows.npy"))])
+    fit_s = time.perf_counter() - t0
+
+    predictor = _serving_predictor(name, model)
+    t0   = time.perf_counter()
+    pred = predictor.predict(X_val)
+    batch_s = time.perf_counter() - t0
+
+    if TARGETS[name] is None:
+        # config.SILHOUETTE_MODE: exact silhouette is O(n²) per fold
+        score = (silhouette(X_val, pred, mode=config.SILHOUETTE_MODE, centers=model.cluster_centers_)["score"]
+                 if len(set(pred)) > 1 else -1.0)
+    else:
+        y_val = data[TARGETS[name]][np.load(os.path.join(fold_dir, "val_rows.npy"))]
+        score = (r2_score if name == "linear" else accuracy_score)(y_val, pred)
+
+    return {
+        "score":          float(score),
+        "fit_ms":         fit_s * 1000,
+        "batch_us_row":   batch_s / len(X_val) * 1e6,
+        "single_us":      _latency_us(predictor.predict, X_val, config.TUNE_LATENCY_REPEATS),
+    }
+
+
+# ── Search ──────────────────────────────────────────────────
+
+def candidates(name: str, search: str = "grid", n_iter: int = None) -> list:
+    """Parameter dicts to try for `name`: the full grid, or n_iter random draws from it."""
+    from sklearn.model_selection import ParameterGrid, ParameterSampler
+
+    grid = config.TUNE_GRID[name]
+    if search == "grid":
+        return list(ParameterGrid(grid))
+    if search == "random":
+        n_iter = min(n_iter or config.TUNE_N_ITER, len(ParameterGrid(grid)))
+        return list(ParameterSampler(grid, n_iter, random_state=config.TRAIN_RANDOM_STATE))
+    raise ValueError(f"Unknown search '{search}'. Use 'grid' or 'random'.")
+
+
+def _trial_path(name: str, params: dict, fold_dir: str) -> str:
+    scoring = (config.SILHOUETTE_MODE, config.SILHOUETTE_EXACT_MAX_ROWS, config.SILHOUETTE_SAMPLE_SIZE,
+               config.SILHOUETTE_SEED) if TARGETS[name] is None else None
+    key = training.stage_key("trial", name, params, os.path.basename(fold_dir),
+                             config.KNN_BACKEND, config.COMPILED_INFERENCE, scoring)
+    return training.cache_path(f"trial-{key}.json")
+
+
+def search(prep: dict, names: list, search: str = "grid", n_iter: int = None,
+           workers: int = None, force: bool = False) -> dict:
+    """
+    Runs every (model, candidate, fold) trial not already cached across a
+    process pool. Returns {model: [summary per candidate]}, each summary
+    holding the params, mean/std score and mean timings over the folds.
+    Latencies are measured while other trials run, so compare them
+    between candidates of one run rather than against production numbers.
+    """
+    fold_dirs = folds(prep)
+    trials    = [(name, params, fold) for name in names
+                 for params in candidates(name, search, n_iter) for fold in fold_dirs]
+    results, todo = {}, []
+    for trial in trials:
+        path = _trial_path(*trial)
+        if not force and training.cache_hit(path):
+            with open(path) as fh:
+                results[path] = json.load(fh)
+        else:
+            todo.append(trial)
+
+    if todo:
+        n_workers = min(len(todo), workers or config.TUNE_WORKERS or os.cpu_count() or 1)
+        with ProcessPoolExecutor(n_workers) as pool:
+            futures = {_trial_path(*t): pool.submit(run_trial, t[0], t[1], prep["dir"], t[2]) for t in todo}
+            for path, future in futures.items():
+                results[path] = future.result()
+                with open(path, "w") as fh:
+                    json.dump(results[path], fh)
+
+    summary = {}
+    for name in names:
+        summary[name] = []
+        for params in candidates(name, search, n_iter):
+            runs = [results[_trial_path(name, params, fold)] for fold in fold_dirs]
+            scores = [r["score"] for r in runs]
+            summary[name].append({
+                "params":       params,
+                "score":        float(np.mean(scores)),
+                "score_std":    float(np.std(scores)),
+                "fit_ms":       float(np.mean([r["fit_ms"] for r in runs])),
+                "batch_us_row": float(np.mean([r["batch_us_row"] for r in runs])),
+                "single_us":    float(np.median([r["single_us"] for r in runs])),
+            })
+        for entry in frontier(summary[name]):
+            entry["frontier"] = True
+    return {"trials_run": len(todo), "trials_cached": len(trials) - len(todo), "models": summary}
+
+
+def frontier(entries: list) -> list:
+    """Entries not dominated on (higher score, lower single-row latency)."""
+    best, out = -np.inf, []
+    for entry in sorted(entries, key=lambda e: (e["single_us"], -e["score"])):
+        if entry["score"] > best:
+            out.append(entry)
+            best = entry["score"]
+    return out
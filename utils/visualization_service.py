@@ -0,0 +1,125 @@
+# ============================================================
+#  utils/visualization_service.py — AckVision Visualization Snapshot
+#  Builds the /api/visualize payload ONCE per dataset/model
+#  version and keeps it as a pre-serialized JSON blob + ETag.
+#  Repeat requests cost one fingerprint check and, when the
+#  browser already has the blob, a 304 Not Modified.
+#  Snapshots are keyed on the model version (model_loader) and
+#  built on one pinned ModelSet, so a hot reload changes them.
+#  The scatter is downsampled server-side (utils/downsampling.py)
+#  so the payload stays bounded whatever the dataset size.
+# ============================================================
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import config
+from utils import artifact_cache, clustering_service, dataset_store, model_loader
+from utils.downsampling import downsample, MODES as DOWNSAMPLE_MODES
+
+# Files the chart data depends on besides the ModelSet — any change rebuilds the snapshot
+VIZ_INPUT_PATHS = [config.DATA_PATH]
+
+# Full-resolution payload for the current key: {"key", "payload"}
+_base = {}
+# ((model version, fingerprint), mode, max_points) → (blob, etag, model version), most recently used last
+_snapshots = OrderedDict()
+_MAX_VARIANTS = 16
+_lock = threading.Lock()
+
+
+def _value_counts(values) -> dict:
+    """Category → count for a mapped string column (empty = missing, skipped)."""
+    import numpy as np
+    labels, counts = np.unique(values[values != ""], return_counts=True)
+    return dict(zip(labels.tolist(), counts.tolist()))
+
+
+def build_payload() -> dict:
+    """Assembles the full-resolution chart data dict from the dataset store
+    and the ModelSet in use (model_loader.active())."""
+    columns = dataset_store.load_columns()
+
+    # Use actual CSV column names (Dev 1's headers with spaces)
+    performance_counts = _value_counts(columns["Performance Category"]) \
+        if "Performance Category" in columns else {}
+
+    pass_fail_counts = _value_counts(columns["Pass/Fail"]) \
+        if "Pass/Fail" in columns else {}
+
+    return {
+        "clusters":      clustering_service.get_cluster_data_for_visualization(),
+        "performance":   performance_counts,
+        "pass_fail":     pass_fail_counts,
+        "model_version": model_loader.model_version(),
+    }
+
+
+def serialize(payload: dict) -> tuple:
+    """dict → (compact UTF-8 JSON bytes, strong ETag of those bytes)."""
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return blob, hashlib.sha256(blob).hexdigest()[:32]
+
+
+def parse_options(max_points=None, mode=None) -> tuple:
+    """
+    Validates the ?max_points= / ?mode= query values.
+    Returns (max_points, mode); raises ValueError on bad input.
+    """
+    mode = mode or config.VIZ_DOWNSAMPLE_MODE
+    if mode not in DOWNSAMPLE_MODES:
+        raise ValueError(f"mode must be one of {list(DOWNSAMPLE_MODES)}")
+    try:
+        max_points = int(max_points) if max_points not in (None, "") else config.VIZ_MAX_POINTS
+    except (TypeError, ValueError):
+        raise ValueError("max_points must be an integer")
+    if max_points < 1:
+        raise ValueError("max_points must be positive")
+    return min(max_points, config.VIZ_MAX_POINTS_LIMIT), mode
+
+
+def _reduce(payload: dict, max_points: int, mode: str) -> dict:
+    clusters = payload["clusters"]
+    if "error" in clusters:
+        return payload
+    reduced = downsample(
+        clusters["cluster_ids"], clusters["labels"],
+        clusters["study_hours"], clusters["attendance"],
+        max_points=max_points, mode=mode,
+    )
+    return {**payload, "clusters": reduced}
+
+
+def get_snapshot(max_points: int = None, mode: str = None) -> tuple:
+    """
+    Returns (json_blob, etag, model_version) for the live model version and
+    the requested downsampling, rebuilding only when the model version or
+    one of VIZ_INPUT_PATHS changed. A payload whose cluster data failed is
+    served but never cached.
+    """
+    max_points, mode = parse_options(max_points, mode)
+
+    with model_loader.pinned() as models:
+        if models is None:
+            raise RuntimeError("Models are not loaded.")
+        key     = (models.version, artifact_cache.fingerprint(VIZ_INPUT_PATHS))
+        variant = (key, mode, max_points)
+
+        with _lock:
+            if variant in _snapshots:
+                _snapshots.move_to_end(variant)
+                return _snapshots[variant]
+
+            if _base.get("key") != key:
+                payload = build_payload()
+                if "error" in payload["clusters"]:
+                    return (*serialize(payload), models.version)
+                _base.update(key=key, payload=payload)
+                _snapshots.clear()
+
+            _snapshots[variant] = (*serialize(_reduce(_base["payload"], max_points, mode)), models.version)
+            while len(_snapshots) > _MAX_VARIANTS:
+                _snapshots.popitem(last=False)
+            return _snapshots[variant]